@@ -8,13 +8,26 @@ Provider priority (when auto-selecting):
 2. Groq (cloud) - if API key configured
 """
 
+import asyncio
 import logging
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, AsyncIterator, List, Optional, Sequence, Tuple, Union
 from .clients import OllamaClient, GroqClient
+from .circuit_breaker import AsyncCircuitBreaker
+from .response_cache import RESPONSE_CACHE
 from ..config import settings
 
 logger = logging.getLogger(__name__)
 
+# Weight of the newest sample in the per-provider latency average
+LATENCY_EWMA_ALPHA = 0.3
+
+NO_PROVIDER_MESSAGE = (
+    "No AI provider available. Options:\n"
+    "1. Start Ollama locally (recommended for privacy)\n"
+    "2. Set GROQ_API_KEY for Groq cloud analysis"
+)
+
 
 class AiAnalyzer:
     """
@@ -27,14 +40,39 @@ class AiAnalyzer:
         # Initialize clients with config settings
         self.ollama_client = OllamaClient(
             model=settings.OLLAMA_MODEL,
-            base_url=settings.OLLAMA_BASE_URL
+            base_url=settings.OLLAMA_BASE_URL,
+            max_inflight=settings.OLLAMA_MAX_INFLIGHT,
+            keep_alive=settings.OLLAMA_KEEP_ALIVE
         )
         self.groq_client = GroqClient(
             model=settings.GROQ_MODEL,
-            api_key=settings.GROQ_API_KEY
+            api_key=settings.GROQ_API_KEY,
+            max_inflight=settings.GROQ_MAX_INFLIGHT
         )
+        # Provider registry; fallback order is local-first
+        self._providers = {
+            "ollama": self.ollama_client,
+            "groq": self.groq_client,
+        }
+        self._fallback_order = ["ollama", "groq"]
+        # Smoothed full-response latency per provider (seconds)
+        self._latency: Dict[str, float] = {}
+        # One circuit breaker per provider so an outage fails fast
+        self.breakers = {
+            name: AsyncCircuitBreaker(
+                name,
+                failure_threshold=settings.AI_BREAKER_FAILURE_THRESHOLD,
+                cooldown=settings.AI_BREAKER_COOLDOWN,
+            )
+            for name in self._providers
+        }
+
+    async def aclose(self) -> None:
+        """Closes the pooled HTTP connections held by every provider client."""
+        for client in self._providers.values():
+            await client.aclose()
 
-    def get_status(self) -> Dict[str, Any]:
+    async def get_status(self) -> Dict[str, Any]:
         """
         Checks availability of all providers.
         
@@ -43,24 +81,35 @@ class AiAnalyzer:
         - model: configured model name
         - configured: whether API key is set (for cloud providers)
         """
-        ollama_status = self.ollama_client.is_available()
-        groq_status = self.groq_client.is_available()
+        ollama_status, groq_status = await asyncio.gather(
+            self.ollama_client.is_available_async(),
+            self.groq_client.is_available_async(),
+        )
         
         return {
             "ollama": {
                 "available": ollama_status,
                 "model": self.ollama_client.model,
-                "base_url": self.ollama_client.base_url
+                "base_url": self.ollama_client.base_url,
+                "metrics": self.ollama_client.get_metrics()
             },
             "groq": {
                 "available": groq_status,
                 "model": self.groq_client.model,
                 "configured": bool(self.groq_client.api_key),
-                "default": True  # Groq is the default cloud provider
-            }
+                "default": True,  # Groq is the default cloud provider
+                "metrics": self.groq_client.get_metrics()
+            },
+            "response_cache": RESPONSE_CACHE.stats()
         }
 
-    async def analyze(self, system_prompt: str, user_prompt: str, provider: Optional[str] = None) -> Any:
+    async def analyze(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        provider: Optional[str] = None,
+        stream: bool = True,
+    ) -> Any:
         """
         Sends prompts to the selected AI provider.
         
@@ -71,39 +120,169 @@ class AiAnalyzer:
             user_prompt: User/scan data prompt
             provider: Explicit provider selection (ollama, groq)
                      If None, tries Ollama first, then Groq.
+            stream: If False, issue a single non-streaming request and
+                    return the full response text instead of a generator.
         
         Returns:
-            Async generator yielding response chunks
+            Async generator yielding response chunks (or str if stream=False)
             
         Raises:
             ValueError: If no provider is available
+            CircuitOpenError: If the explicitly selected provider's circuit is open
         """
         # Explicit provider selection
-        if provider == "ollama":
-            return self.ollama_client.chat(system_prompt, user_prompt)
-        
-        if provider == "groq":
-            return self.groq_client.chat(system_prompt, user_prompt)
-            
-        # Default behavior: Try Ollama, fallback to Groq
+        if provider in self._providers:
+            return await self._dispatch(provider, system_prompt, user_prompt, stream)
+
+        # Default behavior: walk providers in fallback order
+        for name in self._provider_order():
+            client = self._providers[name]
+            breaker = self.breakers[name]
+            try:
+                if breaker.is_open():
+                    logger.info("%s circuit open, trying next provider", name)
+                    continue
+                if not await client.is_available_async():
+                    logger.info("%s unavailable, trying next provider", name)
+                    continue
+                logger.info("Using %s for analysis", name)
+                return await self._dispatch(name, system_prompt, user_prompt, stream)
+            except Exception as e:
+                logger.warning("%s failed: %s. Trying next provider", name, e)
+
+        raise ValueError(NO_PROVIDER_MESSAGE)
+
+    async def _dispatch(self, name: str, system_prompt: str, user_prompt: str, stream: bool) -> Any:
+        """Sends the request to one provider through its circuit breaker."""
+        client = self._providers[name]
+        if not stream:
+            start = time.monotonic()
+            text = await self.breakers[name].call(
+                lambda: client.chat_nonstream(system_prompt, user_prompt)
+            )
+            self._record_latency(name, time.monotonic() - start)
+            return text
+        guarded = await self.breakers[name].guard_stream(client.chat(system_prompt, user_prompt))
+        return self._timed(name, guarded)
+
+    async def analyze_race(self, system_prompt: str, user_prompt: str) -> Any:
+        """
+        Races every available provider and keeps the first to stream a chunk.
+
+        The losing streams are cancelled and closed as soon as a winner has
+        produced its first chunk.
+
+        Returns:
+            Async generator yielding the winner's response chunks
+
+        Raises:
+            ValueError: If no provider is available or all of them fail
+        """
+        names = [name for name in self._fallback_order if not self.breakers[name].is_open()]
+        available = await asyncio.gather(
+            *(self._providers[name].is_available_async() for name in names)
+        )
+        names = [name for name, ok in zip(names, available) if ok]
+        if not names:
+            raise ValueError(NO_PROVIDER_MESSAGE)
+
+        streams: Dict[str, AsyncIterator[str]] = {}
+
+        async def _first_chunk(name: str) -> Tuple[str, str]:
+            stream = self._timed(name, await self.breakers[name].guard_stream(
+                self._providers[name].chat(system_prompt, user_prompt)
+            ))
+            streams[name] = stream
+            chunk = await anext(stream, None)
+            if chunk is None:
+                raise ValueError(f"{name} returned an empty response")
+            return name, chunk
+
+        pending = {asyncio.create_task(_first_chunk(name)) for name in names}
+        winner: Optional[Tuple[str, str]] = None
+        errors: List[str] = []
+        while pending and winner is None:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    errors.append(str(task.exception()))
+                elif winner is None:
+                    winner = task.result()
+
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for name, stream in streams.items():
+            if winner is None or name != winner[0]:
+                await stream.aclose()
+
+        if winner is None:
+            raise ValueError(f"All AI providers failed: {'; '.join(errors)}")
+
+        name, first_chunk = winner
+        logger.info("Using %s for analysis (won provider race)", name)
+        return self._prepend(first_chunk, streams[name])
+
+    async def analyze_batch(
+        self,
+        items: Sequence[Tuple[str, str]],
+        provider: Optional[str] = None,
+        max_concurrency: int = 10,
+    ) -> List[Union[str, Exception]]:
+        """
+        Runs several (system_prompt, user_prompt) analyses concurrently.
+
+        Each item goes through analyze() (provider selection, breaker,
+        bulkhead) as a non-streaming request. At most
+        `max_concurrency` items are dispatched at once.
+
+        Returns:
+            One entry per item, in order: the response text, or the
+            exception raised for that item.
+        """
+        sem = asyncio.Semaphore(max_concurrency)
+
+        async def _one(system_prompt: str, user_prompt: str) -> str:
+            async with sem:
+                return await self.analyze(system_prompt, user_prompt, provider, stream=False)
+
+        return await asyncio.gather(
+            *(_one(system_prompt, user_prompt) for system_prompt, user_prompt in items),
+            return_exceptions=True,
+        )
+
+    def _provider_order(self) -> List[str]:
+        """
+        Fallback order for auto-selection.
+
+        Local-first by default; with AI_ADAPTIVE_PROVIDER_ORDER enabled,
+        providers are tried fastest-first by observed latency (providers
+        without samples keep their configured position at the front).
+        """
+        if not settings.AI_ADAPTIVE_PROVIDER_ORDER:
+            return self._fallback_order
+        return sorted(self._fallback_order, key=lambda name: self._latency.get(name, 0.0))
+
+    @staticmethod
+    async def _prepend(first_chunk: str, stream: AsyncIterator[str]) -> AsyncIterator[str]:
+        yield first_chunk
+        async for chunk in stream:
+            yield chunk
+
+    async def _timed(self, name: str, stream: AsyncIterator[str]) -> AsyncIterator[str]:
+        """Passes chunks through and records the full-response latency (EWMA)."""
+        start = time.monotonic()
         try:
-            if self.ollama_client.is_available():
-                logger.info("Using Ollama for analysis (local inference)")
-                return self.ollama_client.chat(system_prompt, user_prompt)
-            else:
-                logger.info("Ollama unavailable, checking Groq")
-        except Exception as e:
-            logger.warning(f"Ollama failed: {e}. Checking Groq")
-        
-        # Fallback to Groq
-        if self.groq_client.is_available():
-            logger.info("Using Groq for analysis (cloud provider)")
-            return self.groq_client.chat(system_prompt, user_prompt)
-        
-        raise ValueError(
-            "No AI provider available. Options:\n"
-            "1. Start Ollama locally (recommended for privacy)\n"
-            "2. Set GROQ_API_KEY for Groq cloud analysis"
+            async for chunk in stream:
+                yield chunk
+        finally:
+            await stream.aclose()
+        self._record_latency(name, time.monotonic() - start)
+
+    def _record_latency(self, name: str, elapsed: float) -> None:
+        previous = self._latency.get(name)
+        self._latency[name] = elapsed if previous is None else (
+            LATENCY_EWMA_ALPHA * elapsed + (1 - LATENCY_EWMA_ALPHA) * previous
         )
 
 
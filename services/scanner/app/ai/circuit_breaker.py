@@ -0,0 +1,144 @@
+"""
+AI Provider Circuit Breaker
+===========================
+Lightweight in-process circuit breaker for AI provider calls.
+
+After `failure_threshold` consecutive failures the breaker OPENS and every
+call fails immediately with CircuitOpenError until `cooldown` seconds have
+elapsed. A single probe is then let through (HALF_OPEN): success closes the
+breaker, failure re-opens it for another cooldown.
+
+Usage:
+    breaker = AsyncCircuitBreaker("groq")
+    result = await breaker.call(lambda: client.fetch())
+    stream = await breaker.guard_stream(client.chat(system_prompt, user_prompt))
+"""
+
+import asyncio
+import logging
+import time
+from enum import Enum
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    """Breaker states."""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the provider circuit is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(
+            f"AI provider '{name}' is temporarily unavailable "
+            f"(circuit open, retry in {retry_after:.0f}s)"
+        )
+
+
+class AsyncCircuitBreaker:
+    """Per-provider circuit breaker guarded by an asyncio.Lock."""
+
+    def __init__(self, name: str, failure_threshold: int = 5, cooldown: float = 60.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = CircuitState.CLOSED
+        self.failure_count = 0
+        self.opened_at: Optional[float] = None
+        self.half_open_inflight = False
+        self._lock = asyncio.Lock()
+
+    def is_open(self) -> bool:
+        """Returns True if calls would currently be rejected (no state change)."""
+        if self.state == CircuitState.OPEN:
+            return time.monotonic() - self.opened_at < self.cooldown
+        return self.state == CircuitState.HALF_OPEN and self.half_open_inflight
+
+    async def acquire(self) -> None:
+        """
+        Admits a call or raises CircuitOpenError.
+
+        Moves OPEN -> HALF_OPEN once the cooldown has elapsed and reserves
+        the single probe slot.
+        """
+        async with self._lock:
+            if self.state == CircuitState.OPEN:
+                elapsed = time.monotonic() - self.opened_at
+                if elapsed < self.cooldown:
+                    raise CircuitOpenError(self.name, self.cooldown - elapsed)
+                logger.info("Circuit for %s half-open, sending probe", self.name)
+                self.state = CircuitState.HALF_OPEN
+                self.half_open_inflight = False
+
+            if self.state == CircuitState.HALF_OPEN:
+                if self.half_open_inflight:
+                    raise CircuitOpenError(self.name, 0)
+                self.half_open_inflight = True
+
+    async def record_success(self) -> None:
+        async with self._lock:
+            if self.state != CircuitState.CLOSED:
+                logger.info("Circuit for %s closed", self.name)
+            self.state = CircuitState.CLOSED
+            self.failure_count = 0
+            self.opened_at = None
+            self.half_open_inflight = False
+
+    async def record_failure(self) -> None:
+        async with self._lock:
+            self.failure_count += 1
+            self.half_open_inflight = False
+            if self.state == CircuitState.HALF_OPEN or self.failure_count >= self.failure_threshold:
+                if self.state != CircuitState.OPEN:
+                    logger.warning(
+                        "Circuit for %s opened after %d consecutive failures",
+                        self.name, self.failure_count
+                    )
+                self.state = CircuitState.OPEN
+                self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """Frees the probe slot without recording an outcome (e.g. client disconnect)."""
+        self.half_open_inflight = False
+
+    async def call(self, coro_factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Runs `coro_factory()` through the breaker."""
+        await self.acquire()
+        try:
+            result = await coro_factory()
+        except Exception:
+            await self.record_failure()
+            raise
+        await self.record_success()
+        return result
+
+    async def guard_stream(self, stream: AsyncIterator[str]) -> AsyncIterator[str]:
+        """
+        Admits a streaming call and returns a wrapped generator.
+
+        The admission check runs eagerly so an open circuit fails before any
+        response is returned. Errors raised while iterating count as failures;
+        clean exhaustion counts as a success.
+        """
+        await self.acquire()
+        return self._guarded(stream)
+
+    async def _guarded(self, stream: AsyncIterator[str]) -> AsyncIterator[str]:
+        try:
+            async for chunk in stream:
+                yield chunk
+        except (GeneratorExit, asyncio.CancelledError):
+            self.release()
+            await stream.aclose()
+            raise
+        except Exception:
+            await self.record_failure()
+            raise
+        await self.record_success()
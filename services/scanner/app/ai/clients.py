@@ -8,167 +8,495 @@ Supported providers:
 - Groq (cloud provider - default)
 """
 
+import asyncio
+import atexit
 import httpx
 import logging
-from typing import Optional, Dict, List, Any
+import orjson
+import random
+import statistics
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from functools import lru_cache
+from typing import Optional, Dict, List, Any, AsyncIterator, Tuple
+
+from .response_cache import RESPONSE_CACHE
 
 logger = logging.getLogger(__name__)
 
+# Connection pool limits shared by all provider clients. Analyses are often
+# minutes apart, so idle connections (and their TLS sessions) are kept for
+# 60s instead of httpx's 5s default.
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=64, keepalive_expiry=60.0)
 
-class OllamaClient:
-    """Client for local Ollama LLM inference."""
-    
-    def __init__(self, model: str, base_url: str = "http://localhost:11434"):
+# Shared sync client for blocking callers (status endpoint health probes)
+_HTTP_CLIENT = httpx.Client(
+    http2=True,
+    limits=httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=30.0),
+)
+atexit.register(_HTTP_CLIENT.close)
+
+JSON_CONTENT_TYPE = "application/json"
+JSON_HEADERS = {"Content-Type": JSON_CONTENT_TYPE}
+
+# Ollama retry backoff: RETRY_BASE_DELAY * 2**attempt plus up to RETRY_JITTER seconds
+RETRY_BASE_DELAY = 0.5
+RETRY_JITTER = 0.25
+
+
+def retry_delay(attempt: int) -> float:
+    """Exponential backoff with jitter for the given (0-based) attempt."""
+    return RETRY_BASE_DELAY * (2 ** attempt) + random.uniform(0, RETRY_JITTER)
+
+
+def is_retryable_status(status_code: int) -> bool:
+    """Server errors and rate limiting are transient; other 4xx are not."""
+    return status_code == 429 or status_code >= 500
+
+
+@lru_cache(maxsize=8)
+def _system_message(system_prompt: str) -> bytes:
+    """Serialized system message; the same prompt is reused across scans."""
+    return orjson.dumps({"role": "system", "content": system_prompt})
+
+
+def build_chat_body(
+    model: str,
+    system_prompt: str,
+    user_prompt: str,
+    stream: bool = True,
+    keep_alive: Optional[str] = None,
+) -> bytes:
+    """
+    Serializes an OpenAI/Ollama-style chat request body once.
+
+    The system message bytes are cached and spliced in, so only the
+    per-scan user prompt is encoded on each call. The system prompt is
+    always messages[0] and must stay free of per-scan data: an identical
+    prefix is what lets the server reuse its prompt (KV) cache.
+
+    `keep_alive` is Ollama-specific (how long the model stays loaded).
+    """
+    return b"".join((
+        b'{"model":', orjson.dumps(model),
+        b',"messages":[', _system_message(system_prompt),
+        b",", orjson.dumps({"role": "user", "content": user_prompt}),
+        b'],"stream":', b"true" if stream else b"false",
+        b',"keep_alive":' + orjson.dumps(keep_alive) if keep_alive else b"",
+        b"}",
+    ))
+
+
+# Consumed prefix size after which the NDJSON buffer is compacted
+NDJSON_COMPACT_THRESHOLD = 32768
+
+
+async def iter_ndjson_lines(byte_stream: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    Splits a byte stream into non-empty lines.
+
+    Uses a single bytearray with a moving read offset, so many small
+    NDJSON records arriving in one network chunk are sliced out without
+    re-copying the remaining buffer for each line.
+    """
+    buf = bytearray()
+    start = 0
+    async for chunk in byte_stream:
+        buf.extend(chunk)
+        while True:
+            nl = buf.find(b"\n", start)
+            if nl < 0:
+                break
+            if nl > start:
+                yield bytes(buf[start:nl])
+            start = nl + 1
+        if start == len(buf):
+            buf.clear()
+            start = 0
+        elif start > NDJSON_COMPACT_THRESHOLD:
+            del buf[:start]
+            start = 0
+    if start < len(buf):
+        yield bytes(buf[start:])
+
+
+class LatencyTracker:
+    """Rolling window of successful request latencies used to size timeouts."""
+
+    MIN_SAMPLES = 5
+
+    def __init__(self, window: int = 64):
+        self.samples: deque = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, q: int) -> Optional[float]:
+        """Returns the q-th percentile, or None until enough samples exist."""
+        if len(self.samples) < self.MIN_SAMPLES:
+            return None
+        return statistics.quantiles(self.samples, n=100)[q - 1]
+
+    def timeout(self, default: float) -> httpx.Timeout:
+        """
+        Per-request timeout: read budget of 1.5x observed p99 (min 5s,
+        capped at `default`); falls back to `default` while warming up.
+        """
+        p99 = self.percentile(99)
+        if p99 is None:
+            return httpx.Timeout(default)
+        read = min(default, max(5.0, p99 * 1.5))
+        return httpx.Timeout(connect=2.0, read=read, write=5.0, pool=2.0)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "samples": len(self.samples),
+            "p50_s": self.percentile(50),
+            "p99_s": self.percentile(99),
+        }
+
+
+class BaseChatClient(ABC):
+    """
+    Shared plumbing for provider clients: pooled HTTP client, latency
+    tracking and a bulkhead around chat streams.
+
+    Subclasses implement `_chat_stream()` and availability checks.
+    """
+
+    provider_name = "provider"
+
+    def __init__(self, model: str, base_url: str, max_inflight: int, timeout: float = 120.0):
         self.model = model
         self.base_url = base_url.rstrip("/")
-        self.timeout = 120.0  # Increased to 120s for larger models
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+        self._latency = LatencyTracker()
+        # Bulkhead: cap concurrent in-flight chat streams
+        self.max_inflight = max_inflight
+        self._sem = asyncio.Semaphore(max_inflight)
+        self._inflight = 0
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Returns the long-lived pooled client, creating it on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=self.timeout, http2=True, limits=HTTP_LIMITS)
+        return self._client
+
+    async def aclose(self) -> None:
+        """Closes the pooled client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Observed latency stats (seconds) and current in-flight load."""
+        return {
+            **self._latency.metrics(),
+            "inflight": self._inflight,
+            "max_inflight": self.max_inflight,
+        }
+
+    def _cache_key(self, system_prompt: str, user_prompt: str) -> str:
+        return RESPONSE_CACHE.make_key(self.provider_name, self.model, system_prompt, user_prompt)
+
+    async def chat(self, system_prompt: str, user_prompt: str) -> Any:
+        """
+        Streams a chat completion, holding a bulkhead slot until the
+        stream is exhausted or closed.
+
+        A cached response is yielded as a single chunk; a stream is only
+        cached once it has been read to the end.
+        """
+        key = self._cache_key(system_prompt, user_prompt)
+        cached = RESPONSE_CACHE.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        async with self._sem:
+            self._inflight += 1
+            try:
+                parts: List[str] = []
+                async for chunk in self._chat_stream(system_prompt, user_prompt):
+                    parts.append(chunk)
+                    yield chunk
+                RESPONSE_CACHE.set(key, "".join(parts))
+            finally:
+                self._inflight -= 1
+
+    async def chat_nonstream(self, system_prompt: str, user_prompt: str) -> str:
+        """
+        Returns the full completion from a single non-streaming request.
+
+        Cheaper than chat() when the caller only concatenates the chunks.
+        """
+        key = self._cache_key(system_prompt, user_prompt)
+        cached = RESPONSE_CACHE.get(key)
+        if cached is not None:
+            return cached
+
+        async with self._sem:
+            self._inflight += 1
+            try:
+                start = time.monotonic()
+                content = await self._chat_complete(system_prompt, user_prompt)
+                self._latency.record(time.monotonic() - start)
+                RESPONSE_CACHE.set(key, content)
+                return content
+            finally:
+                self._inflight -= 1
+
+    async def chat_batch(self, system_prompt: str, user_prompts: List[str]) -> List[str]:
+        """
+        Returns one completion per user prompt, sharing the system prompt.
+
+        Requests are pipelined over the pooled connection (HTTP/2 streams
+        where supported) and bounded by the bulkhead; the identical system
+        prefix lets the server reuse its prompt cache across items.
+        """
+        return list(await asyncio.gather(
+            *(self.chat_nonstream(system_prompt, user_prompt) for user_prompt in user_prompts)
+        ))
+
+    async def _post_json(self, url: str, body: bytes, headers: Dict[str, str]) -> Dict[str, Any]:
+        client = self._get_client()
+        response = await client.post(url, content=body, headers=headers, timeout=self._latency.timeout(self.timeout))
+        response.raise_for_status()
+        return orjson.loads(response.content)
+
+    @abstractmethod
+    def _chat_stream(self, system_prompt: str, user_prompt: str) -> AsyncIterator[str]:
+        """Sends a streaming chat request and yields content deltas."""
+
+    @abstractmethod
+    async def _chat_complete(self, system_prompt: str, user_prompt: str) -> str:
+        """Sends a non-streaming chat request and returns the full content."""
+
+
+class OllamaClient(BaseChatClient):
+    """Client for local Ollama LLM inference."""
+
+    provider_name = "Ollama"
+
+    def __init__(
+        self,
+        model: str,
+        base_url: str = "http://localhost:11434",
+        max_inflight: int = 2,
+        keep_alive: Optional[str] = None,
+    ):
+        # 120s timeout for larger models
+        super().__init__(model, base_url, max_inflight)
+        # Keeps the model (and its cached system-prompt prefix) loaded between scans
+        self.keep_alive = keep_alive
+        # Health probe cache: (monotonic timestamp, available)
+        self._avail_cache: Optional[Tuple[float, bool]] = None
+        self._avail_ttl = 10.0
+
+    def _cached_availability(self) -> Optional[bool]:
+        if self._avail_cache and time.monotonic() - self._avail_cache[0] < self._avail_ttl:
+            return self._avail_cache[1]
+        return None
+
+    def _store_availability(self, available: bool) -> bool:
+        self._avail_cache = (time.monotonic(), available)
+        return available
 
     def is_available(self) -> bool:
-        """Checks if Ollama is reachable."""
+        """Checks if Ollama is reachable (result cached for a few seconds)."""
+        cached = self._cached_availability()
+        if cached is not None:
+            return cached
         try:
-            response = httpx.get(f"{self.base_url}/api/tags", timeout=5.0)
-            return response.status_code == 200
+            response = _HTTP_CLIENT.get(f"{self.base_url}/api/tags", timeout=5.0)
+            return self._store_availability(response.status_code == 200)
         except Exception as e:
-            logger.debug(f"Ollama health check failed: {e}")
-            return False
+            logger.debug("Ollama health check failed: %s", e)
+            return self._store_availability(False)
 
-    async def chat(self, system_prompt: str, user_prompt: str) -> Any:
+    async def is_available_async(self) -> bool:
+        """Non-blocking variant of is_available() using the pooled client."""
+        cached = self._cached_availability()
+        if cached is not None:
+            return cached
+        try:
+            response = await self._get_client().get(f"{self.base_url}/api/tags", timeout=5.0)
+            return self._store_availability(response.status_code == 200)
+        except Exception as e:
+            logger.debug("Ollama health check failed: %s", e)
+            return self._store_availability(False)
+
+    async def _chat_stream(self, system_prompt: str, user_prompt: str) -> Any:
         """
         Sends a chat request to Ollama.
         Retries connection a few times if Ollama is warming up.
         """
-        import json
-        import asyncio
-        
         url = f"{self.base_url}/api/chat"
-        payload = {
-            "model": self.model,
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            "stream": True
-        }
+        body = build_chat_body(self.model, system_prompt, user_prompt, keep_alive=self.keep_alive)
         
-        logger.info(f"Sending request to Ollama at {url} with model {self.model}")
+        logger.info("Sending request to Ollama at %s with model %s", url, self.model)
         
-        # Retry logic: Try 3 times with 2s delay
+        # Retry logic: up to 3 attempts with exponential backoff, only
+        # while nothing has been yielded (a retry would duplicate output)
         max_retries = 3
+        yielded = False
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            for attempt in range(max_retries):
-                try:
-                    logger.debug(f"Starting stream request to {url}")
-                    async with client.stream("POST", url, json=payload) as response:
-                        logger.debug(f"Response status: {response.status_code}")
-                        response.raise_for_status()
-                        
-                        buffer = b""
-                        async for chunk in response.aiter_bytes():
-                            buffer += chunk
-                            while b"\n" in buffer:
-                                line, buffer = buffer.split(b"\n", 1)
-                                if not line:
-                                    continue
-                                try:
-                                    chunk_data = json.loads(line)
-                                    chunk_content = chunk_data.get("message", {}).get("content", "")
-                                    if chunk_content:
-                                        yield chunk_content
-                                    
-                                    if chunk_data.get("done"):
-                                        break
-                                except json.JSONDecodeError:
-                                    continue
-                                    
-                    return
-
-                except (httpx.ConnectError, httpx.ReadTimeout) as e:
-                    if attempt < max_retries - 1:
-                        logger.warning(f"Ollama connection failed (attempt {attempt+1}/{max_retries}). Retrying in 2s... Error: {e}")
-                        await asyncio.sleep(2)
-                    else:
-                        logger.error(f"Ollama connection failed after {max_retries} attempts: {e}")
-                        raise
-                except httpx.HTTPError as e:
-                    logger.error(f"Ollama HTTP error: {e}")
+        client = self._get_client()
+        for attempt in range(max_retries):
+            try:
+                logger.debug("Starting stream request to %s", url)
+                start = time.monotonic()
+                timeout = self._latency.timeout(self.timeout)
+                async with client.stream("POST", url, content=body, headers=JSON_HEADERS, timeout=timeout) as response:
+                    logger.debug("Response status: %s", response.status_code)
+                    response.raise_for_status()
+                    
+                    # NDJSON: one JSON object per line
+                    async for line in iter_ndjson_lines(response.aiter_bytes()):
+                        try:
+                            chunk_data = orjson.loads(line)
+                        except orjson.JSONDecodeError:
+                            continue
+                        chunk_content = chunk_data.get("message", {}).get("content", "")
+                        if chunk_content:
+                            yielded = True
+                            yield chunk_content
+                        if chunk_data.get("done"):
+                            break
+
+                self._latency.record(time.monotonic() - start)
+                return
+
+            except (httpx.ConnectError, httpx.ReadTimeout) as e:
+                if attempt < max_retries - 1 and not yielded:
+                    delay = retry_delay(attempt)
+                    logger.warning("Ollama connection failed (attempt %d/%d). Retrying in %.1fs... Error: %s", attempt + 1, max_retries, delay, e)
+                    await asyncio.sleep(delay)
+                else:
+                    logger.error("Ollama connection failed after %d attempts: %s", attempt + 1, e)
                     raise
-                except Exception as e:
-                    logger.error(f"Ollama unexpected error: {e}")
+            except httpx.HTTPStatusError as e:
+                status = e.response.status_code
+                if is_retryable_status(status) and attempt < max_retries - 1:
+                    delay = retry_delay(attempt)
+                    logger.warning("Ollama returned %d (attempt %d/%d). Retrying in %.1fs...", status, attempt + 1, max_retries, delay)
+                    await asyncio.sleep(delay)
+                else:
+                    logger.error("Ollama HTTP error: %s", e)
                     raise
+            except httpx.HTTPError as e:
+                logger.error("Ollama HTTP error: %s", e)
+                raise
+            except Exception as e:
+                logger.error("Ollama unexpected error: %s", e)
+                raise
 
+    async def _chat_complete(self, system_prompt: str, user_prompt: str) -> str:
+        """Sends a non-streaming chat request to Ollama."""
+        body = build_chat_body(self.model, system_prompt, user_prompt, stream=False, keep_alive=self.keep_alive)
+        data = await self._post_json(f"{self.base_url}/api/chat", body, JSON_HEADERS)
+        return data.get("message", {}).get("content", "")
 
-class GroqClient:
-    """Client for Groq AI API (default cloud provider)."""
-    
-    def __init__(self, model: str, api_key: str):
-        self.model = model
-        self.api_key = api_key
-        self.base_url = "https://api.groq.com/openai/v1"
-        self.timeout = 120.0
 
-    def is_available(self) -> bool:
-        """Checks if Groq is configured (API key present)."""
-        return bool(self.api_key and self.api_key.strip())
+class BaseOpenAICompatibleClient(BaseChatClient):
+    """
+    Client for OpenAI-compatible `/chat/completions` APIs streaming SSE.
 
-    async def chat(self, system_prompt: str, user_prompt: str) -> Any:
-        """Sends a chat request to Groq."""
-        if not self.is_available():
-            raise ValueError("Groq API key is missing. Set GROQ_API_KEY environment variable.")
+    Subclasses provide `base_url` and authentication via `_headers()`.
+    """
 
-        import json
-        
-        url = f"{self.base_url}/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
-        payload = {
-            "model": self.model,
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            "stream": True
-        }
+    def _url(self) -> str:
+        return f"{self.base_url}/chat/completions"
+
+    def _headers(self) -> Dict[str, str]:
+        return JSON_HEADERS
+
+    async def _chat_stream(self, system_prompt: str, user_prompt: str) -> Any:
+        """Sends a streaming chat request and yields content deltas."""
+        url = self._url()
+        body = build_chat_body(self.model, system_prompt, user_prompt)
 
-        logger.info(f"Sending request to Groq with model {self.model}")
+        logger.info("Sending request to %s with model %s", self.provider_name, self.model)
 
         try:
-            logger.debug(f"Starting Groq stream request to {url}")
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                async with client.stream("POST", url, headers=headers, json=payload) as response:
-                    logger.debug(f"Groq Response status: {response.status_code}")
-                    response.raise_for_status()
-                    
-                    buffer = b""
-                    async for chunk in response.aiter_bytes():
-                        buffer += chunk
-                        while b"\n" in buffer:
-                            line, buffer = buffer.split(b"\n", 1)
-                            line = line.strip()
-                            if not line:
-                                continue
-                            if line.startswith(b"data: "):
-                                data_str = line[6:]  # Strip "data: "
-                                if data_str.strip() == b"[DONE]":
-                                    break
-                                try:
-                                    chunk_data = json.loads(data_str)
-                                    choices = chunk_data.get("choices", [])
-                                    if choices:
-                                        delta = choices[0].get("delta", {})
-                                        content = delta.get("content", "")
-                                        if content:
-                                            yield content
-                                except json.JSONDecodeError:
-                                    continue
-            
+            logger.debug("Starting %s stream request to %s", self.provider_name, url)
+            client = self._get_client()
+            start = time.monotonic()
+            timeout = self._latency.timeout(self.timeout)
+            async with client.stream("POST", url, content=body, headers=self._headers(), timeout=timeout) as response:
+                logger.debug("%s Response status: %s", self.provider_name, response.status_code)
+                response.raise_for_status()
+
+                # SSE: only "data: ..." lines carry payloads
+                async for line in response.aiter_lines():
+                    if not line.startswith("data: "):
+                        continue
+                    data_str = line[6:]  # Strip "data: "
+                    if data_str == "[DONE]":
+                        break
+                    try:
+                        chunk_data = orjson.loads(data_str)
+                    except orjson.JSONDecodeError:
+                        continue
+                    choices = chunk_data.get("choices", [])
+                    if choices:
+                        content = choices[0].get("delta", {}).get("content", "")
+                        if content:
+                            yield content
+
+            self._latency.record(time.monotonic() - start)
             return
 
         except httpx.HTTPError as e:
-            logger.error(f"Groq HTTP error: {e}")
+            logger.error("%s HTTP error: %s", self.provider_name, e)
             raise
         except Exception as e:
-            logger.error(f"Groq unexpected error: {e}")
+            logger.error("%s unexpected error: %s", self.provider_name, e)
             raise
+
+    async def _chat_complete(self, system_prompt: str, user_prompt: str) -> str:
+        """Sends a non-streaming chat request and returns the message content."""
+        body = build_chat_body(self.model, system_prompt, user_prompt, stream=False)
+        data = await self._post_json(self._url(), body, self._headers())
+        choices = data.get("choices") or [{}]
+        return choices[0].get("message", {}).get("content", "")
+
+
+class GroqClient(BaseOpenAICompatibleClient):
+    """Client for Groq AI API (default cloud provider)."""
+
+    provider_name = "Groq"
+
+    def __init__(self, model: str, api_key: str, max_inflight: int = 8):
+        super().__init__(model, "https://api.groq.com/openai/v1", max_inflight)
+        self.api_key = api_key.strip() if api_key else ""
+        self._configured = bool(self.api_key)
+        self._auth_headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": JSON_CONTENT_TYPE,
+        }
+
+    def _headers(self) -> Dict[str, str]:
+        return self._auth_headers
+
+    def is_available(self) -> bool:
+        """Checks if Groq is configured (API key present)."""
+        return self._configured
+
+    async def is_available_async(self) -> bool:
+        """Async counterpart of is_available() (no network probe needed)."""
+        return self.is_available()
+
+    async def _chat_stream(self, system_prompt: str, user_prompt: str) -> Any:
+        """Sends a chat request to Groq."""
+        if not self.is_available():
+            raise ValueError("Groq API key is missing. Set GROQ_API_KEY environment variable.")
+        async for chunk in super()._chat_stream(system_prompt, user_prompt):
+            yield chunk
+
+    async def _chat_complete(self, system_prompt: str, user_prompt: str) -> str:
+        if not self.is_available():
+            raise ValueError("Groq API key is missing. Set GROQ_API_KEY environment variable.")
+        return await super()._chat_complete(system_prompt, user_prompt)
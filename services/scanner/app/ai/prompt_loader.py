@@ -2,7 +2,8 @@
 Prompt Loader Utility for AI System Prompts.
 
 This module provides a simple, cached loader for versioned AI prompt files.
-Prompts are stored in the `prompts/` subdirectory as plain text files.
+Prompts are stored in the `prompts/` subdirectory as plain text files and
+are read once at import time.
 
 Usage:
     from app.ai.prompt_loader import load_prompt
@@ -11,8 +12,8 @@ Usage:
 """
 
 import logging
-from functools import lru_cache
 from pathlib import Path
+from typing import Dict
 
 logger = logging.getLogger(__name__)
 
@@ -25,28 +26,8 @@ class PromptLoadError(Exception):
     pass
 
 
-@lru_cache(maxsize=32)
-def load_prompt(prompt_name: str) -> str:
-    """
-    Load a prompt file by name.
-    
-    The prompt file is expected to be located at:
-        <module_dir>/prompts/<prompt_name>.txt
-    
-    Args:
-        prompt_name: Name of the prompt (without .txt extension).
-                     Example: "security_report_system_v1"
-    
-    Returns:
-        The content of the prompt file as a string.
-    
-    Raises:
-        PromptLoadError: If the file is missing, unreadable, or empty.
-    
-    Note:
-        Results are cached in-memory to avoid repeated disk I/O.
-        Use `load_prompt.cache_clear()` to invalidate the cache if needed.
-    """
+def _read_prompt(prompt_name: str) -> str:
+    """Reads and validates a single prompt file from disk."""
     prompt_path = PROMPTS_DIR / f"{prompt_name}.txt"
     
     if not prompt_path.exists():
@@ -83,6 +64,51 @@ def load_prompt(prompt_name: str) -> str:
     return content
 
 
+def _scan_prompts() -> Dict[str, str]:
+    """Reads every non-empty `*.txt` file in PROMPTS_DIR."""
+    prompts: Dict[str, str] = {}
+    for path in PROMPTS_DIR.glob("*.txt"):
+        try:
+            prompts[path.stem] = _read_prompt(path.stem)
+        except PromptLoadError:
+            continue
+    return prompts
+
+
+# Eagerly loaded prompt set: load_prompt() is a dict lookup on the hot path
+_PROMPTS: Dict[str, str] = _scan_prompts()
+
+
+def load_prompt(prompt_name: str) -> str:
+    """
+    Load a prompt file by name.
+    
+    The prompt file is expected to be located at:
+        <module_dir>/prompts/<prompt_name>.txt
+    
+    Args:
+        prompt_name: Name of the prompt (without .txt extension).
+                     Example: "security_report_system_v1"
+    
+    Returns:
+        The content of the prompt file as a string.
+    
+    Raises:
+        PromptLoadError: If the file is missing, unreadable, or empty.
+    
+    Note:
+        All prompts are read once at import time. A name that was not
+        preloaded is looked up on disk (and cached) before giving up.
+        Use `clear_cache()` to rescan the prompts directory.
+    """
+    try:
+        return _PROMPTS[prompt_name]
+    except KeyError:
+        content = _read_prompt(prompt_name)
+        _PROMPTS[prompt_name] = content
+        return content
+
+
 def get_prompt_path(prompt_name: str) -> Path:
     """
     Get the filesystem path for a prompt file.
@@ -100,9 +126,10 @@ def get_prompt_path(prompt_name: str) -> Path:
 
 def clear_cache() -> None:
     """
-    Clear the prompt cache.
+    Clear the prompt cache and reload the prompts directory.
     
     Useful during development or testing when prompt files may change.
     """
-    load_prompt.cache_clear()
-    logger.debug("Prompt cache cleared")
+    _PROMPTS.clear()
+    _PROMPTS.update(_scan_prompts())
+    logger.debug("Prompt cache reloaded (%d prompts)", len(_PROMPTS))
@@ -0,0 +1,75 @@
+"""
+AI Response Cache
+=================
+Exact-match LRU cache for AI provider responses.
+
+Re-running the analysis of an unchanged scan produces the same
+(model, system prompt, user prompt) triple; serving it from memory skips
+the LLM round trip entirely.
+
+Usage:
+    from app.ai.response_cache import RESPONSE_CACHE
+
+    key = RESPONSE_CACHE.make_key(provider, model, system_prompt, user_prompt)
+    cached = RESPONSE_CACHE.get(key)
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class ResponseCache:
+    """Bounded LRU mapping of request hash -> response text, with TTL."""
+
+    def __init__(self, max_entries: int = 1000, ttl: float = 86400.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(provider: str, model: str, system_prompt: str, user_prompt: str) -> str:
+        digest = hashlib.sha256()
+        for part in (provider, model, system_prompt, user_prompt):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] >= self.ttl:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, content: str) -> None:
+        if self.ttl <= 0 or not content:
+            return
+        self._entries[key] = (time.monotonic(), content)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# Shared by all provider clients
+RESPONSE_CACHE = ResponseCache()
@@ -8,4 +8,4 @@ async def get_ai_providers_status():
     """
     Returns the availability status of AI providers (Ollama, OpenRouter).
     """
-    return analyzer.get_status()
+    return await analyzer.get_status()
@@ -1,5 +1,8 @@
+import logging
 from typing import Dict, Any, List, Optional
 
+logger = logging.getLogger(__name__)
+
 def build_ai_scan_view(raw: Dict[str, Any]) -> Dict[str, Any]:
     """
     Constructs a simplified view of the scan result optimized for AI analysis.
@@ -7,10 +10,10 @@ def build_ai_scan_view(raw: Dict[str, Any]) -> Dict[str, Any]:
     Robustly handles missing fields and varying data structures.
     """
     if not raw:
-        print("DEBUG: build_ai_scan_view received empty raw input")
+        logger.debug("build_ai_scan_view received empty raw input")
         return {}
         
-    print(f"DEBUG: build_ai_scan_view input keys: {list(raw.keys())}")
+    logger.debug("build_ai_scan_view input keys: %s", raw.keys())
 
     ai_view = {}
 
@@ -183,7 +186,11 @@ def build_ai_scan_view(raw: Dict[str, Any]) -> Dict[str, Any]:
     try:
         traffic = raw.get("http_traffic", [])
         if traffic and isinstance(traffic, list):
-            latencies = [t.get("latency", 0) for t in traffic if isinstance(t, dict)]
+            # Stored results hold dicts; in-memory results (CLI) hold RequestRecords
+            latencies = [
+                t.get("latency", 0) if isinstance(t, dict) else getattr(t, "latency", 0)
+                for t in traffic
+            ]
             if latencies:
                 avg_latency = sum(latencies) / len(latencies)
                 ai_view["performance"] = {
@@ -1,59 +1,67 @@
-import json
 import logging
-from typing import Dict, Any
+import re
+import orjson
+from typing import Dict, Any, Union
 
 logger = logging.getLogger(__name__)
 
-def parse_ai_json(text: str) -> Dict[str, Any]:
+# Object between the first ``` fence (any language tag) and the last closing fence.
+# Matching runs on UTF-8 bytes: both orjson and pydantic parse bytes natively.
+_FENCE_RE = re.compile(rb"```[\w-]*\s*(\{.*\})\s*```", re.DOTALL)
+
+def extract_ai_json(text: Union[str, bytes]) -> bytes:
     """
-    Parses a JSON string from an AI response, handling markdown code blocks
-    and potential extra text.
+    Extracts the JSON object from an AI response, handling markdown
+    code blocks and potential extra text.
     
     Args:
-        text: The raw text response from the AI.
+        text: The raw response from the AI (str, or UTF-8 bytes).
         
     Returns:
-        The parsed JSON dictionary.
+        The UTF-8 bytes between the first '{' and the last '}' (not yet parsed).
         
     Raises:
-        ValueError: If the text cannot be parsed as JSON.
+        ValueError: If the text contains no JSON object.
     """
-    cleaned_text = text.strip()
+    data = text.encode("utf-8") if isinstance(text, str) else text
     
-    # Remove markdown code blocks if present
-    if "```" in cleaned_text:
-        # Try to extract content between first ```json (or just ```) and last ```
-        lines = cleaned_text.splitlines()
-        start_idx = -1
-        end_idx = -1
-        
-        for i, line in enumerate(lines):
-            if line.strip().startswith("```"):
-                if start_idx == -1:
-                    start_idx = i
-                else:
-                    end_idx = i
-        
-        if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
-            # Extract content between the markers
-            # We skip the start line (e.g. ```json) and end line (```)
-            cleaned_text = "\n".join(lines[start_idx+1 : end_idx])
+    # Extract the JSON object from a markdown code block if present
+    match = _FENCE_RE.search(data)
+    if match:
+        data = match.group(1)
     
     # Further cleanup: find the first '{' and last '}'
-    start_brace = cleaned_text.find("{")
-    end_brace = cleaned_text.rfind("}")
+    start_brace = data.find(b"{")
+    end_brace = data.rfind(b"}")
     
-    if start_brace != -1 and end_brace != -1:
-        cleaned_text = cleaned_text[start_brace : end_brace + 1]
-    else:
+    if start_brace == -1 or end_brace == -1:
         # If no braces found, it's likely not a JSON object
         logger.error(f"No JSON object found in AI response: {text[:200]}...")
         raise ValueError("No JSON object found in AI response")
+    
+    return data[start_brace : end_brace + 1]
+
+
+def parse_ai_json(text: Union[str, bytes]) -> Dict[str, Any]:
+    """
+    Parses a JSON string from an AI response, handling markdown code blocks
+    and potential extra text.
+    
+    Args:
+        text: The raw response from the AI (str, or UTF-8 bytes).
+        
+    Returns:
+        The parsed JSON dictionary.
+        
+    Raises:
+        ValueError: If the text cannot be parsed as JSON.
+    """
+    cleaned_text = extract_ai_json(text)
 
     try:
-        return json.loads(cleaned_text)
-    except json.JSONDecodeError as e:
+        return orjson.loads(cleaned_text)
+    except orjson.JSONDecodeError as e:
         logger.error(f"Failed to parse AI JSON. Error: {e}")
-        logger.error(f"Cleaned text was: {cleaned_text}")
+        logger.error(f"Cleaned text was: {cleaned_text.decode('utf-8', 'replace')}")
         logger.error(f"Original text was: {text}")
         raise ValueError(f"Invalid JSON format: {e}")
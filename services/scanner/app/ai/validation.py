@@ -12,11 +12,13 @@ Usage:
         # Handle fallback case
 """
 
+import hashlib
 import logging
+from collections import OrderedDict
 from typing import Dict, Any, Tuple, Optional
 from pydantic import ValidationError
 
-from .utils import parse_ai_json
+from .utils import extract_ai_json
 from .models import AIReport
 
 
@@ -43,6 +45,11 @@ FALLBACK_REPORT: Dict[str, Any] = {
 }
 
 
+# Validated reports keyed by sha256(raw_text), for retry/replay of the same AI output
+VALIDATION_CACHE_SIZE = 256
+_VALIDATION_CACHE: "OrderedDict[bytes, AIReport]" = OrderedDict()
+
+
 def validate_ai_report(
     raw_text: str,
     scan_id: str,
@@ -52,8 +59,9 @@ def validate_ai_report(
     Validates AI-generated text against the AIReport schema.
     
     This function:
-    1. Parses JSON from raw text (handles markdown fencing)
-    2. Validates against strict Pydantic schema
+    1. Extracts the JSON object from raw text (handles markdown fencing)
+    2. Parses and validates it against the strict Pydantic schema in a
+       single pass (model_validate_json, no intermediate dict)
     3. Returns fallback on any error (never raises)
     
     Args:
@@ -69,13 +77,24 @@ def validate_ai_report(
     Note:
         This function NEVER raises exceptions. All errors result in
         fallback report with is_valid=False.
+        Successful validations are cached by content hash; each call
+        still returns a fresh dict.
     """
     try:
-        # Step 1: Parse JSON from raw text
-        parsed_data = parse_ai_json(raw_text)
-        
-        # Step 2: Validate against Pydantic schema
-        report = AIReport.model_validate(parsed_data)
+        raw_bytes = raw_text.encode("utf-8")
+        cache_key = hashlib.sha256(raw_bytes).digest()
+        report = _VALIDATION_CACHE.get(cache_key)
+        if report is not None:
+            _VALIDATION_CACHE.move_to_end(cache_key)
+        else:
+            # Step 1: Extract the JSON object from raw text
+            json_bytes = extract_ai_json(raw_bytes)
+            
+            # Step 2: Parse + validate against Pydantic schema
+            report = AIReport.model_validate_json(json_bytes)
+            _VALIDATION_CACHE[cache_key] = report
+            if len(_VALIDATION_CACHE) > VALIDATION_CACHE_SIZE:
+                _VALIDATION_CACHE.popitem(last=False)
         
         # Step 3: Convert to dict and inject model name if provided
         report_dict = report.model_dump()
@@ -84,15 +103,18 @@ def validate_ai_report(
             
         return report_dict, True
         
-    except ValueError as e:
-        # JSON parsing failed (from parse_ai_json)
-        _log_validation_error(scan_id, "JSON_PARSE_ERROR", str(e))
-        return _create_fallback(model_name), False
-        
     except ValidationError as e:
-        # Pydantic validation failed
+        # Pydantic validation failed (malformed JSON is reported as json_invalid)
+        error_type = "SCHEMA_VALIDATION_ERROR"
+        if any(err.get("type") == "json_invalid" for err in e.errors()):
+            error_type = "JSON_PARSE_ERROR"
         error_summary = _summarize_validation_errors(e)
-        _log_validation_error(scan_id, "SCHEMA_VALIDATION_ERROR", error_summary)
+        _log_validation_error(scan_id, error_type, error_summary)
+        return _create_fallback(model_name), False
+        
+    except ValueError as e:
+        # No JSON object found (from extract_ai_json)
+        _log_validation_error(scan_id, "JSON_PARSE_ERROR", str(e))
         return _create_fallback(model_name), False
         
     except Exception as e:
@@ -101,6 +123,11 @@ def validate_ai_report(
         return _create_fallback(model_name), False
 
 
+def clear_validation_cache() -> None:
+    """Clears the cache of validated reports."""
+    _VALIDATION_CACHE.clear()
+
+
 def _log_validation_error(scan_id: str, error_type: str, error_summary: str) -> None:
     """
     Logs a structured validation error.
@@ -145,16 +172,16 @@ def _create_fallback(model_name: Optional[str]) -> Dict[str, Any]:
     """
     Creates a fallback report dict.
     
-    Uses deepcopy-like behavior to ensure FALLBACK_REPORT isn't mutated.
+    Callers add keys (e.g. `ai_valid`) and persist the result, so every
+    call returns a new dict. Only the mutable containers are rebuilt;
+    the string fields are shared with FALLBACK_REPORT.
     """
     fallback = {
-        "global_score": FALLBACK_REPORT["global_score"].copy(),
-        "overall_risk_level": FALLBACK_REPORT["overall_risk_level"],
-        "executive_summary": FALLBACK_REPORT["executive_summary"],
+        **FALLBACK_REPORT,
+        "global_score": dict(FALLBACK_REPORT["global_score"]),
         "key_vulnerabilities": [],
-        "site_map": FALLBACK_REPORT["site_map"].copy(),
-        "infrastructure": FALLBACK_REPORT["infrastructure"].copy(),
-        "model_name": FALLBACK_REPORT["model_name"],
+        "site_map": {"total_pages": 0, "pages": []},
+        "infrastructure": {},
     }
     if model_name:
         fallback["model_name"] = f"{model_name} (validation_failed)"
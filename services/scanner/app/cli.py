@@ -19,7 +19,7 @@ from .ai.prompt_loader import load_prompt
 from .ai.schema import build_ai_scan_view
 from .ai.utils import parse_ai_json
 from .ai.analyzer import analyzer
-import json
+import orjson
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
@@ -27,11 +27,23 @@ from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich import print as rprint
 from rich.layout import Layout
 from rich.align import Align
+from rich.text import Text
 from rich.prompt import Prompt, Confirm
 
+try:
+    import uvloop
+except ImportError:  # uvloop is unavailable on Windows
+    uvloop = None
+
 app = typer.Typer(help="Relic - AI-Assisted Web Security Auditor CLI")
 console = Console()
 
+# Styled prefixes for scan log lines echoed to the console (other levels are hidden)
+LOG_PREFIXES = {
+    "ERROR": Text("[ERROR] ", style="red"),
+    "WARNING": Text("[WARN]  ", style="yellow"),
+}
+
 # Authorization warning message
 AUTHORIZATION_WARNING = """
 [bold red]⚠️  AUTHORIZATION REQUIRED[/bold red]
@@ -102,10 +114,9 @@ async def run_scan_async(target: str, json_out: Optional[Path], pdf_out: Optiona
     console.print("[dim]Initializing scan engine...[/dim]\n")
     
     async def log_callback(entry: ScanLogEntry):
-        if entry.level == "ERROR":
-            console.print(f"[red][ERROR][/red] {entry.message}")
-        elif entry.level == "WARNING":
-            console.print(f"[yellow][WARN][/yellow]  {entry.message}")
+        prefix = LOG_PREFIXES.get(entry.level)
+        if prefix is not None:
+            console.print(Text.assemble(prefix, entry.message), highlight=False)
 
     try:
         with Progress(
@@ -118,41 +129,22 @@ async def run_scan_async(target: str, json_out: Optional[Path], pdf_out: Optiona
             result_dataclass = await engine.run_scan(target, log_callback)
             progress.update(task, completed=True)
 
-        # Convert to Pydantic model for reporting
-        findings_dicts = [
-            {
-                "title": f.title,
-                "severity": f.severity,
-                "category": f.category,
-                "description": f.description,
-                "recommendation": f.recommendation,
-                "evidence": f.evidence
-            } for f in result_dataclass.findings
-        ]
-        
-        logs_dicts = [
-            {
-                "timestamp": l.timestamp,
-                "level": l.level,
-                "message": l.message
-            } for l in result_dataclass.logs
-        ]
-        
-        result = ScanResult(
-            scan_id="cli-scan",
-            target=result_dataclass.target,
-            status="done",
-            score=result_dataclass.score,
-            grade=result_dataclass.grade,
-            findings=findings_dicts,
-            logs=logs_dicts,
-            timestamp=result_dataclass.scanned_at,
-            response_time_ms=result_dataclass.response_time_ms,
-            debug_info=result_dataclass.debug_info,
-            scan_status=result_dataclass.scan_status,
-            blocking_mechanism=result_dataclass.blocking_mechanism,
-            visibility_level=result_dataclass.visibility_level
-        )
+        # Convert to Pydantic model for reporting (nested dataclasses are read by attribute)
+        result = ScanResult.model_validate({
+            "scan_id": "cli-scan",
+            "target": result_dataclass.target,
+            "status": "done",
+            "score": result_dataclass.score,
+            "grade": result_dataclass.grade,
+            "findings": result_dataclass.findings,
+            "logs": result_dataclass.logs,
+            "timestamp": result_dataclass.scanned_at,
+            "response_time_ms": result_dataclass.response_time_ms,
+            "debug_info": result_dataclass.debug_info,
+            "scan_status": result_dataclass.scan_status,
+            "blocking_mechanism": result_dataclass.blocking_mechanism,
+            "visibility_level": result_dataclass.visibility_level
+        })
         
         # Display Summary Table
         table = Table(title="Scan Summary", show_header=True, header_style="bold magenta")
@@ -191,13 +183,9 @@ async def run_scan_async(target: str, json_out: Optional[Path], pdf_out: Optiona
                 ai_view = build_ai_scan_view(ai_input)
                 
                 system_prompt = load_prompt("security_report_system_v1")
-                user_prompt = f"Here is the scan result for {ai_input.get('target')}:\n{json.dumps(ai_view, indent=2)}\n\nAnalyze this data and provide the security report in the requested JSON format.\nIMPORTANT: Ensure all backslashes in strings are double-escaped (e.g. use '\\\\' for a literal backslash). Do not output invalid JSON escape sequences."
+                user_prompt = f"Here is the scan result for {ai_input.get('target')}:\n{orjson.dumps(ai_view, option=orjson.OPT_INDENT_2).decode()}\n\nAnalyze this data and provide the security report in the requested JSON format.\nIMPORTANT: Ensure all backslashes in strings are double-escaped (e.g. use '\\\\' for a literal backslash). Do not output invalid JSON escape sequences."
                 
-                response_generator = await analyzer.analyze(system_prompt, user_prompt, provider)
-                
-                full_response = ""
-                async for chunk in response_generator:
-                    full_response += chunk
+                full_response = await analyzer.analyze(system_prompt, user_prompt, provider, stream=False)
                     
                 ai_summary = parse_ai_json(full_response)
                 result.ai_analysis = ai_summary
@@ -236,6 +224,13 @@ async def run_scan_async(target: str, json_out: Optional[Path], pdf_out: Optiona
         raise typer.Exit(code=1)
 
 
+def run_async(coro):
+    """Runs a coroutine on uvloop when installed, else the default asyncio loop."""
+    if uvloop is not None:
+        return uvloop.run(coro)
+    return asyncio.run(coro)
+
+
 def get_grade_color(grade):
     if grade in ["A", "B"]: return "green"
     if grade in ["C", "D"]: return "yellow"
@@ -276,7 +271,7 @@ def scan(
     if not check_authorization(target, authorized):
         raise typer.Exit(code=0)  # User cancelled, not an error
     
-    asyncio.run(run_scan_async(target, json_out, pdf_out, markdown_out, provider))
+    run_async(run_scan_async(target, json_out, pdf_out, markdown_out, provider))
 
 
 if __name__ == "__main__":
@@ -7,57 +7,77 @@ All settings are loaded from environment variables with secure defaults.
 """
 
 import os
+from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import List
-from pydantic import BaseModel, Field
 
 
-class Settings(BaseModel):
+@dataclass(slots=True)
+class Settings:
     """Application settings with sensible defaults."""
     
     # HTTP Client Settings
-    DEFAULT_TIMEOUT: float = Field(default=10.0, description="Default HTTP timeout in seconds")
-    MAX_RETRIES: int = Field(default=2, description="Max retries for HTTP requests")
-    USER_AGENT: str = Field(default="AuditAI-Security-Scanner/1.0", description="User-Agent string")
+    DEFAULT_TIMEOUT: float = 10.0  # Default HTTP timeout in seconds
+    MAX_RETRIES: int = 2  # Max retries for HTTP requests
+    USER_AGENT: str = "AuditAI-Security-Scanner/1.0"  # User-Agent string
+    SHARE_HTTP_POOL: bool = True  # Scans share one connection pool (cookies stay per scan)
+    HTTP2: bool = True  # Negotiate HTTP/2 with targets that support it
+    HTTP_MAX_CONNECTIONS: int = 100  # Shared pool size
+    HTTP_MAX_KEEPALIVE: int = 50  # Idle connections kept open in the shared pool
     
     # Port Scanning
-    SCAN_PORTS: List[int] = Field(
-        default=[21, 22, 25, 80, 110, 143, 443, 3306, 5432, 6379, 8080, 8443], 
-        description="Ports to scan"
-    )
-    PORT_SCAN_TIMEOUT: float = Field(default=1.0, description="Timeout for port scan in seconds")
+    SCAN_PORTS: List[int] = field(
+        default_factory=lambda: [21, 22, 25, 80, 110, 143, 443, 3306, 5432, 6379, 8080, 8443]
+    )  # Ports to scan
+    PORT_SCAN_TIMEOUT: float = 1.0  # Timeout for port scan in seconds
     
     # Crawling
-    MAX_CRAWL_URLS: int = Field(default=20, description="Max URLs to crawl")
-    RATE_LIMIT_DELAY: float = Field(default=0.3, description="Delay between requests in seconds")
-    RESPECT_ROBOTS: bool = Field(default=False, description="Whether to respect robots.txt")
-    CRAWL_SCOPE: str = Field(default="subdomains", description="Crawl scope: 'host', 'subdomains', 'path'")
-    STATIC_EXTENSIONS: List[str] = Field(
-        default=["css", "js", "png", "jpg", "jpeg", "gif", "svg", "ico", "woff", "woff2", "ttf", "eot", "mp4", "webm", "mp3", "pdf", "zip", "tar", "gz"],
-        description="Extensions to skip during crawl"
-    )
+    MAX_CRAWL_URLS: int = 20  # Max URLs to crawl
+    CRAWL_CONCURRENCY: int = 8  # Max crawl candidates probed at once
+    RATE_LIMIT_DELAY: float = 0.3  # Delay between requests in seconds
+    RESPECT_ROBOTS: bool = False  # Whether to respect robots.txt
+    CRAWL_SCOPE: str = "subdomains"  # Crawl scope: 'host', 'subdomains', 'path'
+    STATIC_EXTENSIONS: List[str] = field(
+        default_factory=lambda: ["css", "js", "png", "jpg", "jpeg", "gif", "svg", "ico", "woff", "woff2", "ttf", "eot", "mp4", "webm", "mp3", "pdf", "zip", "tar", "gz"]
+    )  # Extensions to skip during crawl
     
     # Vulnerability Detection
-    BLIND_SQLI_THRESHOLD: float = Field(default=5.0, description="Threshold in seconds for time-based SQLi detection")
-    XSS_PAYLOAD_LIMIT: int = Field(default=5, description="Max XSS payloads per parameter for Content pages")
-    SQLI_TIME_THRESHOLD_AVG: float = Field(default=3.0, description="Average time delay (seconds) to suspect Blind SQLi")
+    BLIND_SQLI_THRESHOLD: float = 5.0  # Threshold in seconds for time-based SQLi detection
+    XSS_PAYLOAD_LIMIT: int = 5  # Max XSS payloads per parameter for Content pages
+    SQLI_TIME_THRESHOLD_AVG: float = 3.0  # Average time delay (seconds) to suspect Blind SQLi
+    CORS_FAIL_FAST: bool = False  # Cancel the remaining CORS probes once reflection with credentials is confirmed
 
     # Adaptive Rate Limiting & Safety
-    ADAPTIVE_RATE_LIMIT: bool = Field(default=True, description="Enable adaptive rate limiting")
-    MAX_REQUESTS_PER_MINUTE: int = Field(default=600, description="Max requests per minute per host")
-    ERROR_THRESHOLD: int = Field(default=10, description="Consecutive errors to trigger backoff")
-    LATENCY_THRESHOLD: float = Field(default=2.0, description="Latency threshold (seconds) to trigger backoff")
+    ADAPTIVE_RATE_LIMIT: bool = True  # Enable adaptive rate limiting
+    MAX_REQUESTS_PER_MINUTE: int = 600  # Max requests per minute per host
+    ERROR_THRESHOLD: int = 10  # Consecutive errors to trigger backoff
+    LATENCY_THRESHOLD: float = 2.0  # Latency threshold (seconds) to trigger backoff
+
+    # Scan execution
+    MAX_CONCURRENT_SCANS: int = 4  # Scans run at once; further scans wait in "queued"
+
+    # Reports
+    REPORT_RENDER_WORKERS: int = 2  # Processes rendering PDF reports (0 renders in a thread instead)
 
     # ==========================================================================
     # AI PROVIDER SETTINGS
     # ==========================================================================
     
     # Ollama (Local LLM)
-    OLLAMA_BASE_URL: str = Field(default="http://localhost:11434", description="Ollama Base URL")
-    OLLAMA_MODEL: str = Field(default="gpt-oss:20b", description="Ollama Model Name")
+    OLLAMA_BASE_URL: str = "http://localhost:11434"  # Ollama Base URL
+    OLLAMA_MODEL: str = "gpt-oss:20b"  # Ollama Model Name
+    OLLAMA_MAX_INFLIGHT: int = 2  # Max concurrent Ollama chat streams
+    OLLAMA_KEEP_ALIVE: str = "30m"  # How long Ollama keeps the model loaded after a request
     
     # Groq (Default cloud provider)
-    GROQ_API_KEY: str = Field(default="", description="Groq API Key")
-    GROQ_MODEL: str = Field(default="llama-3.3-70b-versatile", description="Groq Model Name")
+    GROQ_API_KEY: str = ""  # Groq API Key
+    GROQ_MODEL: str = "llama-3.3-70b-versatile"  # Groq Model Name
+    GROQ_MAX_INFLIGHT: int = 8  # Max concurrent Groq chat streams
+
+    # Circuit breaker (per provider)
+    AI_BREAKER_FAILURE_THRESHOLD: int = 5  # Consecutive AI provider failures before the circuit opens
+    AI_BREAKER_COOLDOWN: float = 60.0  # Seconds an open AI provider circuit waits before probing again
+    AI_ADAPTIVE_PROVIDER_ORDER: bool = False  # Try AI providers fastest-first instead of local-first
 
     @classmethod
     def load(cls) -> "Settings":
@@ -67,12 +87,17 @@ class Settings(BaseModel):
             DEFAULT_TIMEOUT=float(os.getenv("SCANNER_DEFAULT_TIMEOUT", 10.0)),
             MAX_RETRIES=int(os.getenv("SCANNER_MAX_RETRIES", 2)),
             USER_AGENT=os.getenv("SCANNER_USER_AGENT", "AuditAI-Security-Scanner/1.0"),
+            SHARE_HTTP_POOL=os.getenv("SCANNER_SHARE_HTTP_POOL", "true").lower() == "true",
+            HTTP2=os.getenv("SCANNER_HTTP2", "true").lower() == "true",
+            HTTP_MAX_CONNECTIONS=int(os.getenv("SCANNER_HTTP_MAX_CONNECTIONS", 100)),
+            HTTP_MAX_KEEPALIVE=int(os.getenv("SCANNER_HTTP_MAX_KEEPALIVE", 50)),
             
             # Port Scanning
             PORT_SCAN_TIMEOUT=float(os.getenv("SCANNER_PORT_SCAN_TIMEOUT", 1.0)),
             
             # Crawling
             MAX_CRAWL_URLS=int(os.getenv("SCANNER_MAX_CRAWL_URLS", 20)),
+            CRAWL_CONCURRENCY=int(os.getenv("SCANNER_CRAWL_CONCURRENCY", 8)),
             RATE_LIMIT_DELAY=float(os.getenv("SCANNER_RATE_LIMIT_DELAY", 0.3)),
             RESPECT_ROBOTS=os.getenv("SCANNER_RESPECT_ROBOTS", "false").lower() == "true",
             CRAWL_SCOPE=os.getenv("SCANNER_CRAWL_SCOPE", "subdomains"),
@@ -81,6 +106,7 @@ class Settings(BaseModel):
             BLIND_SQLI_THRESHOLD=float(os.getenv("SCANNER_BLIND_SQLI_THRESHOLD", 5.0)),
             XSS_PAYLOAD_LIMIT=int(os.getenv("SCANNER_XSS_PAYLOAD_LIMIT", 5)),
             SQLI_TIME_THRESHOLD_AVG=float(os.getenv("SCANNER_SQLI_TIME_THRESHOLD_AVG", 3.0)),
+            CORS_FAIL_FAST=os.getenv("SCANNER_CORS_FAIL_FAST", "false").lower() == "true",
             
             # Rate Limiting
             ADAPTIVE_RATE_LIMIT=os.getenv("SCANNER_ADAPTIVE_RATE_LIMIT", "true").lower() == "true",
@@ -88,12 +114,31 @@ class Settings(BaseModel):
             ERROR_THRESHOLD=int(os.getenv("SCANNER_ERROR_THRESHOLD", 10)),
             LATENCY_THRESHOLD=float(os.getenv("SCANNER_LATENCY_THRESHOLD", 2.0)),
             
+            # Scan execution
+            MAX_CONCURRENT_SCANS=int(os.getenv("SCANNER_MAX_CONCURRENT_SCANS", 4)),
+            
+            # Reports
+            REPORT_RENDER_WORKERS=int(os.getenv("SCANNER_REPORT_RENDER_WORKERS", 2)),
+            
             # AI Providers
             OLLAMA_BASE_URL=os.getenv("OLLAMA_BASE_URL", "http://localhost:11434"),
             OLLAMA_MODEL=os.getenv("OLLAMA_MODEL", "gpt-oss:20b"),
+            OLLAMA_MAX_INFLIGHT=int(os.getenv("OLLAMA_MAX_INFLIGHT", 2)),
+            OLLAMA_KEEP_ALIVE=os.getenv("OLLAMA_KEEP_ALIVE", "30m"),
             GROQ_API_KEY=os.getenv("GROQ_API_KEY", ""),
             GROQ_MODEL=os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile"),
+            GROQ_MAX_INFLIGHT=int(os.getenv("GROQ_MAX_INFLIGHT", 8)),
+            AI_BREAKER_FAILURE_THRESHOLD=int(os.getenv("AI_BREAKER_FAILURE_THRESHOLD", 5)),
+            AI_BREAKER_COOLDOWN=float(os.getenv("AI_BREAKER_COOLDOWN", 60.0)),
+            AI_ADAPTIVE_PROVIDER_ORDER=os.getenv("AI_ADAPTIVE_PROVIDER_ORDER", "false").lower() == "true",
         )
 
 
-settings = Settings.load()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Returns the process-wide settings, reading the environment once."""
+    return Settings.load()
+
+
+# Backward-compatible module attribute: `from .config import settings`
+settings = get_settings()
@@ -1,10 +1,56 @@
+import os
+import time
+import orjson
+from sqlalchemy import event, text
 from sqlmodel import SQLModel, create_engine, Session
 
-sqlite_file_name = "auditai.db"
+sqlite_file_name = os.getenv("SCANNER_DB_FILE", "auditai.db")  # tests point this at a temp file
 sqlite_url = f"sqlite:///{sqlite_file_name}"
 
 connect_args = {"check_same_thread": False}
-engine = create_engine(sqlite_url, echo=False, connect_args=connect_args)
+
+
+def _json_serializer(value) -> str:
+    # JSON columns (result_json, logs_json) are encoded/decoded with orjson
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+engine = create_engine(
+    sqlite_url,
+    echo=False,
+    connect_args=connect_args,
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
+)
+
+# Run PRAGMA optimize at most this often (seconds)
+OPTIMIZE_INTERVAL = 15 * 60
+_last_optimize = 0.0
+
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets SSE/listing readers run while a scan is writing its result
+    if sqlite_file_name == ":memory:":
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.close()
+
+
+def optimize_db(force: bool = False) -> bool:
+    """Runs PRAGMA optimize if the last run was more than OPTIMIZE_INTERVAL ago."""
+    global _last_optimize
+    now = time.monotonic()
+    if not force and now - _last_optimize < OPTIMIZE_INTERVAL:
+        return False
+    _last_optimize = now
+    with engine.connect() as connection:
+        connection.execute(text("PRAGMA optimize"))
+    return True
 
 def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
@@ -1,9 +1,22 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .routes import router
+from .routes import router, shutdown_render_pool
 from .ai.routes import router as ai_router
+from .ai.analyzer import analyzer
+from .scanner.http_client import close_shared_transport
 
-app = FastAPI(title="AuditAI Scanner")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Release pooled AI provider and scan connections and render workers on shutdown
+    await analyzer.aclose()
+    shutdown_render_pool()
+    await close_shared_transport()
+
+
+app = FastAPI(title="AuditAI Scanner", lifespan=lifespan)
 
 # Allow CORS for dev (Next.js is on 3000)
 app.add_middleware(
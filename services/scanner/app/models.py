@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import List, Optional, Dict, Any, Literal
 from datetime import datetime
 from sqlmodel import Field, SQLModel, JSON
@@ -17,12 +17,16 @@ class ScanRequest(BaseModel):
     authorized: bool = False  # Default to False to require explicit acknowledgement
 
 class ScanLog(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     timestamp: datetime
     level: str
     message: str
 
 class Finding(BaseModel):
     """Represents a security finding with credibility metadata."""
+    model_config = ConfigDict(from_attributes=True)
+
     title: str
     severity: str
     category: str
@@ -55,6 +59,14 @@ class ScanResult(BaseModel):
 class ScanResponse(BaseModel):
     scan_id: str
 
+class BatchScanItem(BaseModel):
+    """Per-target outcome of a batch scan request."""
+    target: str
+    allowed: bool
+    scan_id: Optional[str] = None
+    error_code: Optional[str] = None
+    message: Optional[str] = None
+
 class ScanSummary(BaseModel):
     """Summary of a scan for list views."""
     scan_id: str
@@ -13,12 +13,27 @@ Version: 1.1.0
 Last Updated: 2024-12-28
 """
 
-from urllib.parse import urlparse
+import re
 from typing import Optional
+from urllib.parse import urlparse
 from dataclasses import dataclass
 from enum import Enum
 
 
+# Longest target accepted (common browser/server URL limit)
+MAX_URL_LENGTH = 2048
+
+# Schemes a target may use
+_ALLOWED_SCHEMES = frozenset(("http", "https"))
+
+# Optional scheme, then the authority (userinfo@host:port) up to the path
+_URL_RE = re.compile(r"^(?:(?P<scheme>[^:/?#]*)://)?(?P<authority>[^/?#]*)")
+
+# Authorities the fast path does not decide: brackets (IPv6 literals or
+# malformed), whitespace/control characters and non-ASCII; urlparse does
+_UNCERTAIN_AUTHORITY_RE = re.compile(r"[\[\]\x00-\x20\x7f-\U0010ffff]")
+
+
 class PolicyError(Enum):
     """Error codes for policy violations."""
     MISSING_ACKNOWLEDGEMENT = "MISSING_ACKNOWLEDGEMENT"
@@ -26,7 +41,7 @@ class PolicyError(Enum):
     UNSUPPORTED_SCHEME = "UNSUPPORTED_SCHEME"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PolicyResult:
     """Result of a policy check."""
     allowed: bool
@@ -35,6 +50,17 @@ class PolicyResult:
     details: Optional[dict] = None
 
 
+# Shared results for checks whose outcome does not depend on the input
+# (PolicyResult is immutable; callers only read and serialize it)
+_OK_RESULT = PolicyResult(allowed=True)
+_ERR_NO_ACK = PolicyResult(
+    allowed=False,
+    error_code=PolicyError.MISSING_ACKNOWLEDGEMENT,
+    message="You must confirm authorization to scan the target. Set 'authorized: true' in request.",
+    details={"required_field": "authorized", "expected_value": True}
+)
+
+
 def validate_url(target: str) -> PolicyResult:
     """
     Validate that the target is a valid HTTP/HTTPS URL.
@@ -45,32 +71,45 @@ def validate_url(target: str) -> PolicyResult:
     Returns:
         PolicyResult indicating if URL is valid
     """
-    # Check for explicit non-http schemes BEFORE normalization
-    if "://" in target:
-        scheme_part = target.lower().split("://")[0]
-        if scheme_part not in ("http", "https"):
-            return PolicyResult(
-                allowed=False,
-                error_code=PolicyError.UNSUPPORTED_SCHEME,
-                message=f"Unsupported scheme '{scheme_part}'. Only http/https allowed",
-                details={"target": target, "scheme": scheme_part}
-            )
+    # Bound the work done on oversized input before any matching
+    if len(target) > MAX_URL_LENGTH:
+        return PolicyResult(
+            allowed=False,
+            error_code=PolicyError.INVALID_URL,
+            message=f"URL too long (max {MAX_URL_LENGTH} characters)",
+            details={"length": len(target)}
+        )
     
-    # Normalize: add scheme if missing
-    normalized = target if "://" in target else f"https://{target}"
+    match = _URL_RE.match(target)
     
-    try:
-        parsed = urlparse(normalized)
-    except Exception as e:
+    # Check for explicit non-http schemes (a missing scheme defaults to https)
+    scheme = match.group("scheme")
+    if scheme is not None and (scheme_part := scheme.lower()) not in _ALLOWED_SCHEMES:
         return PolicyResult(
             allowed=False,
-            error_code=PolicyError.INVALID_URL,
-            message=f"Invalid URL format: {e}",
-            details={"target": target}
+            error_code=PolicyError.UNSUPPORTED_SCHEME,
+            message=f"Unsupported scheme '{scheme_part}'. Only http/https allowed",
+            details={"target": target, "scheme": scheme_part}
         )
     
-    # Check we have a hostname
-    if not parsed.hostname:
+    # Check we have a hostname (same split as urlparse: after the last '@',
+    # before the port)
+    authority = match.group("authority")
+    if _UNCERTAIN_AUTHORITY_RE.search(authority):
+        normalized = target if scheme is not None else f"https://{target}"
+        try:
+            host = urlparse(normalized).hostname
+        except ValueError as e:
+            return PolicyResult(
+                allowed=False,
+                error_code=PolicyError.INVALID_URL,
+                message=f"Invalid URL format: {e}",
+                details={"target": target}
+            )
+    else:
+        host = authority.rpartition("@")[2].partition(":")[0]
+    
+    if not host:
         return PolicyResult(
             allowed=False,
             error_code=PolicyError.INVALID_URL,
@@ -78,7 +117,7 @@ def validate_url(target: str) -> PolicyResult:
             details={"target": target}
         )
     
-    return PolicyResult(allowed=True)
+    return _OK_RESULT
 
 
 def check_acknowledgement(authorized: bool) -> PolicyResult:
@@ -92,13 +131,8 @@ def check_acknowledgement(authorized: bool) -> PolicyResult:
         PolicyResult with allowed status
     """
     if not authorized:
-        return PolicyResult(
-            allowed=False,
-            error_code=PolicyError.MISSING_ACKNOWLEDGEMENT,
-            message="You must confirm authorization to scan the target. Set 'authorized: true' in request.",
-            details={"required_field": "authorized", "expected_value": True}
-        )
-    return PolicyResult(allowed=True)
+        return _ERR_NO_ACK
+    return _OK_RESULT
 
 
 def validate_scan_request(target: str, authorized: bool) -> PolicyResult:
@@ -117,17 +151,12 @@ def validate_scan_request(target: str, authorized: bool) -> PolicyResult:
     Returns:
         PolicyResult indicating if scan should proceed
     """
-    # Gate 1: Acknowledgement (must be true)
-    ack_result = check_acknowledgement(authorized)
-    if not ack_result.allowed:
-        return ack_result
-    
-    # Gate 2: Valid URL format
-    url_result = validate_url(target)
-    if not url_result.allowed:
-        return url_result
+    # Gate 1: Acknowledgement (must be true), checked inline
+    if not authorized:
+        return _ERR_NO_ACK
     
-    return PolicyResult(allowed=True)
+    # Gate 2: Valid URL format (returns the shared OK result when valid)
+    return validate_url(target)
 
 
 # Legacy compatibility function (deprecated)
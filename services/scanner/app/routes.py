@@ -1,10 +1,15 @@
 import asyncio
+import hashlib
 import uuid
 import logging
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Header
 from fastapi.responses import StreamingResponse, Response
-from .models import ScanRequest, ScanResponse, ScanResult, ScanLog, Finding, ScanSummary
+from .models import ScanRequest, ScanResponse, BatchScanItem, ScanResult, ScanLog, Finding, ScanSummary
 from . import store
 from .policy import validate_scan_request, PolicyError
 from .sse import event_generator
@@ -12,36 +17,175 @@ from .pdf import generate_pdf, generate_markdown, generate_ai_pdf
 from .ai.schema import build_ai_scan_view
 from .ai.validation import validate_ai_report
 from .ai.prompt_loader import load_prompt, PromptLoadError
+from .ai.circuit_breaker import CircuitOpenError
+from .ai.analyzer import analyzer
 from .config import settings
-import json
+from .database import optimize_db
+import orjson
 
 logger = logging.getLogger(__name__)
 
 # Prompt version constant - change this to use a different prompt version
 SECURITY_REPORT_PROMPT_NAME = "security_report_system_v1"
 
+# Most targets accepted by a single POST /scan/batch
+MAX_BATCH_SIZE = 20
+
 router = APIRouter()
 
+# Parsed results and rendered reports keyed by (scan_id, etag, kind); the etag
+# changes whenever the stored result does (e.g. once an AI analysis is attached)
+REPORT_CACHE_SIZE = 64
+_report_cache: "OrderedDict[Tuple[str, str, str], Any]" = OrderedDict()
+
+
+def _result_etag(result_json: dict) -> str:
+    return hashlib.sha256(orjson.dumps(result_json, option=orjson.OPT_SORT_KEYS)).hexdigest()[:32]
+
+
+def _content_etag(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()[:32]
+
+
+def _cache_headers(version: str) -> dict:
+    # Reports are private and change once an AI analysis is attached: the
+    # browser may keep them but must revalidate with the ETag
+    return {"ETag": f'"{version}"', "Cache-Control": "private, no-cache"}
+
+
+def _get_report(key: Tuple[str, str, str]) -> Any:
+    value = _report_cache.get(key)
+    if value is not None:
+        _report_cache.move_to_end(key)
+    return value
+
+
+def _put_report(key: Tuple[str, str, str], value: Any) -> Any:
+    _report_cache[key] = value
+    if len(_report_cache) > REPORT_CACHE_SIZE:
+        _report_cache.popitem(last=False)
+    return value
+
+
+def _cached_report(key: Tuple[str, str, str], build: Callable[[], Any]) -> Any:
+    value = _get_report(key)
+    if value is None:
+        value = _put_report(key, build())
+    return value
+
+
+def _parsed_result(scan_id: str, result_json: dict, etag: Optional[str] = None) -> ScanResult:
+    """Validated ScanResult for a stored result, parsed once per version."""
+    etag = etag or _result_etag(result_json)
+    return _cached_report((scan_id, etag, "result"), lambda: ScanResult(**result_json))
+
+
+def _stored_result(scan_id: str, content: bytes, etag: str) -> ScanResult:
+    """Validated ScanResult for a stored result text, parsed once per version."""
+    return _cached_report((scan_id, etag, "result"), lambda: ScanResult.model_validate_json(content))
+
+
+def _load_report_source(scan_id: str) -> Tuple[bytes, str]:
+    """
+    Stored result text of a completed scan and its ETag; the text is hashed
+    as stored, so revalidating a report never decodes or re-encodes it.
+    """
+    row = store.get_scan_result_raw(scan_id)
+    if not row:
+        raise HTTPException(status_code=404, detail="Scan not found")
+
+    status, result_text = row
+    if status != "completed" or result_text in (None, "", "null", "{}"):
+        raise HTTPException(status_code=400, detail="Report not ready")
+
+    content = result_text.encode()
+    return content, _content_etag(content)
+
+
+# reportlab layout is CPU-bound and holds the GIL, so PDFs render in worker
+# processes (created on first use) to use several cores and keep the loop free
+_render_pool: Optional[ProcessPoolExecutor] = None
+
+
+async def _render_report(func: Callable[..., bytes], *args: Any) -> bytes:
+    global _render_pool
+    workers = settings.REPORT_RENDER_WORKERS
+    if workers <= 0:
+        return await asyncio.to_thread(func, *args)
+    if _render_pool is None:
+        # spawn: forking the threaded server process could copy held locks
+        _render_pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    return await asyncio.get_running_loop().run_in_executor(_render_pool, func, *args)
+
+
+def shutdown_render_pool() -> None:
+    global _render_pool
+    if _render_pool is not None:
+        _render_pool.shutdown(cancel_futures=True)
+        _render_pool = None
+
+
+# Top-level result fields that override or supplement debug_info in the AI input
+_AI_INPUT_FIELDS = (
+    "target", "grade", "score", "scan_status",
+    "blocking_mechanism", "visibility_level", "findings",
+)
+
+
+# Per-scan user prompt; the system prompt is the loaded SECURITY_REPORT_PROMPT_NAME
+_USER_PROMPT_TEMPLATE = (
+    "Here is the scan result for {target}:\n"
+    "{ai_view_json}\n"
+    "\n"
+    "Analyze this data and provide the security report in the requested JSON format.\n"
+)
+
+
+def _build_user_prompt(target: Optional[str], ai_view: dict) -> str:
+    ai_view_json = orjson.dumps(ai_view, option=orjson.OPT_INDENT_2).decode()
+    return _USER_PROMPT_TEMPLATE.format(target=target, ai_view_json=ai_view_json)
+
+
+def _build_ai_input(raw_scan: dict) -> dict:
+    """Flattens a stored scan result into the input of build_ai_scan_view."""
+    debug_info = raw_scan.get("debug_info")
+    ai_input = dict(debug_info) if isinstance(debug_info, dict) else {}
+    for field in _AI_INPUT_FIELDS:
+        ai_input[field] = raw_scan.get(field)
+    return ai_input
+
 from .scanner.engine import ScanEngine
 from .scanner.models import ScanLogEntry
 
+# Bounds how many ScanEngines run at once in this process
+_scan_slots = asyncio.Semaphore(settings.MAX_CONCURRENT_SCANS)
+# target -> scan_id of the scan queued or running for it; set by the endpoints
+# when the scan row is created, cleared by run_scan_task when the scan ends
+_inflight_scans: Dict[str, str] = {}
+
 async def run_scan_task(scan_id: str, target: str):
+    """Runs a scan once a slot is free, then releases its in-flight target."""
+    try:
+        async with _scan_slots:
+            await _execute_scan(scan_id, target)
+    finally:
+        if _inflight_scans.get(target) == scan_id:
+            del _inflight_scans[target]
+
+async def _execute_scan(scan_id: str, target: str):
     """Runs the real scan using ScanEngine."""
     engine = ScanEngine()
     
-    # Initialize log buffer and callback for real-time updates
-    logs_buffer = []
-
+    # Callback for real-time updates: live logs are kept in memory (store.active_scans)
+    # and only written to the DB once, with the final result
     async def log_callback(entry: ScanLogEntry):
-        # Convert to dict
-        log_dict = {
+        store.append_log(scan_id, {
             "timestamp": entry.timestamp.isoformat(),
             "level": entry.level,
             "message": entry.message
-        }
-        logs_buffer.append(log_dict)
-        # Update active logs in store for SSE
-        store.append_log(scan_id, log_dict)
+        })
 
     # Run the scan
     try:
@@ -49,51 +193,37 @@ async def run_scan_task(scan_id: str, target: str):
 
         result = await engine.run_scan(target, log_callback)
 
-        # Convert dataclass result to Pydantic model dict
-        findings_dicts = [
-            {
-                "title": f.title,
-                "severity": f.severity,
-                "category": f.category,
-                "description": f.description,
-                "recommendation": f.recommendation,
-                "evidence": f.evidence,
-                "owasp_refs": f.owasp_refs
-            } for f in result.findings
-        ]
-
-        logs_dicts = [
-            {
-                "timestamp": l.timestamp,
-                "level": l.level,
-                "message": l.message
-            } for l in result.logs
-        ]
-
-        # Create ScanResult Pydantic model
-        scan_result = ScanResult(
-            scan_id=scan_id,
-            target=result.target,
-            status="done",
-            score=result.score,
-            grade=result.grade,
-            findings=findings_dicts,
-            logs=logs_dicts,
-            timestamp=result.scanned_at,
-            response_time_ms=result.response_time_ms,
-            debug_info=result.debug_info,
-            scan_status=result.scan_status,
-            blocking_mechanism=result.blocking_mechanism,
-            visibility_level=result.visibility_level
-        )
+        # Create ScanResult Pydantic model (nested dataclasses are read by attribute)
+        scan_result = ScanResult.model_validate({
+            "scan_id": scan_id,
+            "target": result.target,
+            "status": "done",
+            "score": result.score,
+            "grade": result.grade,
+            "findings": result.findings,
+            "logs": result.logs,
+            "timestamp": result.scanned_at,
+            "response_time_ms": result.response_time_ms,
+            "debug_info": result.debug_info,
+            "scan_status": result.scan_status,
+            "blocking_mechanism": result.blocking_mechanism,
+            "visibility_level": result.visibility_level
+        })
 
         # Save to DB
         store.save_scan_result(scan_id, scan_result)
 
+        # Refresh query planner stats now and then (no-op between intervals)
+        await asyncio.to_thread(optimize_db)
+
     except Exception as e:
-        print(f"Scan failed: {e}")
+        logger.exception("Scan %s failed: %s", scan_id, e)
         store.fail_scan(scan_id, str(e))
 
+async def run_scan_batch(scans: List[Tuple[str, str]]):
+    """Runs several (scan_id, target) scans concurrently."""
+    await asyncio.gather(*(run_scan_task(scan_id, target) for scan_id, target in scans))
+
 from fastapi.responses import JSONResponse
 
 @router.post("/scan", response_model=ScanResponse)
@@ -122,13 +252,76 @@ async def start_scan(request: ScanRequest, background_tasks: BackgroundTasks):
             }
         )
 
+    # The same target is already queued or running: share that scan
+    inflight_id = _inflight_scans.get(request.target)
+    if inflight_id:
+        return ScanResponse(scan_id=inflight_id)
+
     # Create scan in DB
     scan = store.create_scan(request.target)
+    # Registered before responding, so a second request for the target that
+    # arrives before the background task starts still shares this scan
+    _inflight_scans[request.target] = scan.id
 
     background_tasks.add_task(run_scan_task, scan.id, request.target)
 
     return ScanResponse(scan_id=scan.id)
 
+@router.post("/scan/batch", response_model=List[BatchScanItem])
+async def start_scan_batch(requests: List[ScanRequest], background_tasks: BackgroundTasks):
+    """
+    Start security scans against several targets at once.
+    
+    Each entry is validated like POST /scan; targets already in flight reuse
+    their scan, rows for the rest are created in one transaction and their
+    scans run concurrently (within MAX_CONCURRENT_SCANS).
+    
+    Returns:
+    - 200: One item per request, with scan_id or the policy error
+    - 400: Empty batch or more than MAX_BATCH_SIZE targets
+    """
+    if not requests or len(requests) > MAX_BATCH_SIZE:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "error_code": "INVALID_BATCH",
+                "message": f"Batch must contain between 1 and {MAX_BATCH_SIZE} targets",
+                "details": {"count": len(requests), "max": MAX_BATCH_SIZE}
+            }
+        )
+
+    items = []
+    new_targets = []
+    for request in requests:
+        policy_result = validate_scan_request(request.target, request.authorized)
+        if not policy_result.allowed:
+            items.append(BatchScanItem(
+                target=request.target,
+                allowed=False,
+                error_code=policy_result.error_code.value,
+                message=policy_result.message
+            ))
+            continue
+        # Targets already queued or running share that scan
+        item = BatchScanItem(target=request.target, allowed=True, scan_id=_inflight_scans.get(request.target))
+        if item.scan_id is None:
+            new_targets.append(request.target)
+        items.append(item)
+
+    if new_targets:
+        # One scan per distinct target, even if it is listed more than once
+        scans = store.create_scans_bulk(list(dict.fromkeys(new_targets)))
+        scan_ids = {scan.target: scan.id for scan in scans}
+        _inflight_scans.update(scan_ids)
+        for item in items:
+            if item.allowed and item.scan_id is None:
+                item.scan_id = scan_ids[item.target]
+        # Background tasks run one after another, so the batch is a single
+        # task that runs its scans concurrently
+        background_tasks.add_task(run_scan_batch, [(scan.id, scan.target) for scan in scans])
+
+    return items
+
 @router.get("/scan/{scan_id}/events")
 async def scan_events(scan_id: str):
     # We need to check if scan exists
@@ -148,59 +341,69 @@ async def scan_events(scan_id: str):
     )
 
 @router.get("/scan/{scan_id}")
-async def get_scan_result(scan_id: str):
-    scan = store.get_scan(scan_id)
-    if not scan:
+async def get_scan_result(scan_id: str, if_none_match: Optional[str] = Header(default=None)):
+    row = store.get_scan_result_raw(scan_id)
+    if not row:
         raise HTTPException(status_code=404, detail="Scan not found")
 
-    if scan.status != "completed":
-        return {"status": scan.status}
+    status, result_text = row
+    if status != "completed":
+        return {"status": status}
 
-    # Return the stored JSON result
-    return scan.result_json
+    # Return the stored JSON document as-is (no decode/re-encode round-trip)
+    content = (result_text or "null").encode()
+    cache_headers = _cache_headers(_content_etag(content))
+    if if_none_match == cache_headers["ETag"]:
+        return Response(status_code=304, headers=cache_headers)
+    return Response(content=content, media_type="application/json", headers=cache_headers)
 
 @router.get("/scan/{scan_id}/report.pdf")
-async def get_scan_pdf(scan_id: str):
-    scan = store.get_scan(scan_id)
-    if not scan:
-        raise HTTPException(status_code=404, detail="Scan not found")
-
-    if scan.status != "completed" or not scan.result_json:
-        raise HTTPException(status_code=400, detail="Report not ready")
+async def get_scan_pdf(scan_id: str, if_none_match: Optional[str] = Header(default=None)):
+    content, version = _load_report_source(scan_id)
+    cache_headers = _cache_headers(version)
+    if if_none_match == cache_headers["ETag"]:
+        return Response(status_code=304, headers=cache_headers)
+
+    cache_key = (scan_id, version, "pdf")
+    pdf_bytes = _get_report(cache_key)
+    if pdf_bytes is None:
+        # Generate PDF on the fly from stored result
+        try:
+            result_obj = _stored_result(scan_id, content, version)
+            pdf_bytes = await _render_report(generate_pdf, result_obj)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to generate PDF: {e}")
+        _put_report(cache_key, pdf_bytes)
 
-    # Generate PDF on the fly from stored result
-    # Reconstruct ScanResult object
-    try:
-        result_obj = ScanResult(**scan.result_json)
-        pdf_bytes = generate_pdf(result_obj)
-        return Response(content=pdf_bytes, media_type="application/pdf", headers={"Content-Disposition": f"attachment; filename=report_{scan_id}.pdf"})
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to generate PDF: {e}")
+    return Response(
+        content=pdf_bytes,
+        media_type="application/pdf",
+        headers={"Content-Disposition": f"attachment; filename=report_{scan_id}.pdf", **cache_headers}
+    )
 
 @router.get("/scan/{scan_id}/report.json")
-async def get_scan_json(scan_id: str):
-    scan = store.get_scan(scan_id)
-    if not scan:
-        raise HTTPException(status_code=404, detail="Scan not found")
+async def get_scan_json(scan_id: str, if_none_match: Optional[str] = Header(default=None)):
+    content, version = _load_report_source(scan_id)
+    cache_headers = _cache_headers(version)
+    if if_none_match == cache_headers["ETag"]:
+        return Response(status_code=304, headers=cache_headers)
 
-    if scan.status != "completed" or not scan.result_json:
-        raise HTTPException(status_code=400, detail="Report not ready")
-
-    return Response(content=json.dumps(scan.result_json, indent=2), media_type="application/json", headers={"Content-Disposition": f"attachment; filename=report_{scan_id}.json"})
+    # The stored document is the report; send it without re-encoding
+    return Response(content=content, media_type="application/json", headers={"Content-Disposition": f"attachment; filename=report_{scan_id}.json", **cache_headers})
 
 @router.get("/scan/{scan_id}/report.md")
-async def get_scan_markdown(scan_id: str):
-    scan = store.get_scan(scan_id)
-    if not scan:
-        raise HTTPException(status_code=404, detail="Scan not found")
-
-    if scan.status != "completed" or not scan.result_json:
-        raise HTTPException(status_code=400, detail="Report not ready")
+async def get_scan_markdown(scan_id: str, if_none_match: Optional[str] = Header(default=None)):
+    content, version = _load_report_source(scan_id)
+    cache_headers = _cache_headers(version)
+    if if_none_match == cache_headers["ETag"]:
+        return Response(status_code=304, headers=cache_headers)
 
     try:
-        result_obj = ScanResult(**scan.result_json)
-        md_content = generate_markdown(result_obj)
-        return Response(content=md_content, media_type="text/markdown", headers={"Content-Disposition": f"attachment; filename=report_{scan_id}.md"})
+        md_content = _cached_report(
+            (scan_id, version, "md"),
+            lambda: generate_markdown(_stored_result(scan_id, content, version))
+        )
+        return Response(content=md_content, media_type="text/markdown", headers={"Content-Disposition": f"attachment; filename=report_{scan_id}.md", **cache_headers})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate Markdown: {e}")
 
@@ -215,25 +418,8 @@ async def get_scan_ai_debug(scan_id: str):
 
     try:
         raw_scan = scan.result_json
-        if "debug_info" in raw_scan:
-             pass
-
         # Prepare data for AI view builder
-        debug_info = raw_scan.get("debug_info", {})
-        if not isinstance(debug_info, dict):
-            debug_info = {}
-
-        ai_input = debug_info.copy()
-
-        # Ensure top-level fields override or supplement debug_info
-        ai_input["target"] = raw_scan.get("target")
-        ai_input["grade"] = raw_scan.get("grade")
-        ai_input["score"] = raw_scan.get("score")
-        ai_input["scan_status"] = raw_scan.get("scan_status")
-        ai_input["blocking_mechanism"] = raw_scan.get("blocking_mechanism")
-        ai_input["visibility_level"] = raw_scan.get("visibility_level")
-        ai_input["findings"] = raw_scan.get("findings")
-
+        ai_input = _build_ai_input(raw_scan)
         ai_view = build_ai_scan_view(ai_input)
 
         return {
@@ -242,9 +428,7 @@ async def get_scan_ai_debug(scan_id: str):
             "ai_view": ai_view
         }
     except Exception as e:
-        print(f"ERROR in get_scan_ai_debug: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("get_scan_ai_debug failed for scan %s", scan_id)
         raise HTTPException(status_code=500, detail=f"Failed to generate AI view: {e}")
 
 @router.post("/scan/{scan_id}/ai-analysis")
@@ -259,20 +443,8 @@ async def generate_scan_ai_analysis(scan_id: str, provider: str = None):
     try:
         raw_scan = scan.result_json
 
-        # Prepare data for AI view builder (reuse logic from ai-debug)
-        debug_info = raw_scan.get("debug_info")
-        if not isinstance(debug_info, dict):
-            debug_info = {}
-
-        ai_input = debug_info.copy()
-        ai_input["target"] = raw_scan.get("target")
-        ai_input["grade"] = raw_scan.get("grade")
-        ai_input["score"] = raw_scan.get("score")
-        ai_input["scan_status"] = raw_scan.get("scan_status")
-        ai_input["blocking_mechanism"] = raw_scan.get("blocking_mechanism")
-        ai_input["visibility_level"] = raw_scan.get("visibility_level")
-        ai_input["findings"] = raw_scan.get("findings")
-
+        # Prepare data for AI view builder
+        ai_input = _build_ai_input(raw_scan)
         ai_view = build_ai_scan_view(ai_input)
 
         # Load versioned system prompt
@@ -286,14 +458,9 @@ async def generate_scan_ai_analysis(scan_id: str, provider: str = None):
             )
 
         # Construct User Prompt
-        user_prompt = f"""Here is the scan result for {ai_input.get('target')}:
-{json.dumps(ai_view, indent=2)}
-
-Analyze this data and provide the security report in the requested JSON format.
-"""
+        user_prompt = _build_user_prompt(ai_input.get("target"), ai_view)
 
         # Call AI Analyzer (returns an async generator)
-        from .ai.analyzer import analyzer
         response_generator = await analyzer.analyze(system_prompt, user_prompt, provider)
 
         # Resolve provider and model name in outer scope to avoid UnboundLocalError in closure
@@ -307,11 +474,13 @@ Analyze this data and provide the security report in the requested JSON format.
         model_name_str = f"{resolved_provider}:{resolved_model}"
 
         async def stream_and_persist():
-            full_response_text = ""
+            # Chunks are collected and joined once (repeated += re-copies the text)
+            response_parts = []
             try:
                 async for chunk in response_generator:
-                    full_response_text += chunk
+                    response_parts.append(chunk)
                     yield chunk
+                full_response_text = "".join(response_parts)
                 
                 # After streaming is done, parse and save
                 # Validate AI response against schema
@@ -334,24 +503,22 @@ Analyze this data and provide the security report in the requested JSON format.
                     try:
                         updated_result = ScanResult(**current_scan.result_json)
                         store.save_scan_result(scan_id, updated_result)
-                        import logging
-                        logging.getLogger(__name__).info(
+                        logger.info(
                             "Persisted AI analysis for scan %s (ai_valid=%s)",
                             scan_id, ai_valid
                         )
                     except Exception as e:
-                        import logging
-                        logging.getLogger(__name__).warning(
+                        logger.warning(
                             "Failed to persist AI analysis for scan %s: %s",
                             scan_id, str(e)
                         )
                     
             except asyncio.CancelledError:
-                print(f"Client disconnected during AI streaming for scan {scan_id}")
+                logger.info("Client disconnected during AI streaming for scan %s", scan_id)
                 # We can try to save partial result if needed, but usually better to just stop
                 raise
             except Exception as e:
-                print(f"Error during streaming: {e}")
+                logger.error("Error during AI streaming for scan %s: %s", scan_id, e)
                 yield f"\n\n[ERROR] Stream interrupted: {str(e)}"
 
         return StreamingResponse(
@@ -364,13 +531,13 @@ Analyze this data and provide the security report in the requested JSON format.
             }
         )
 
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except ValueError as e:
         # Likely missing API key or configuration
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        print(f"ERROR in generate_scan_ai_analysis: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("generate_scan_ai_analysis failed for scan %s", scan_id)
         error_msg = str(e)
         if "Connection refused" in error_msg or "ConnectError" in error_msg:
              raise HTTPException(status_code=503, detail="Could not connect to AI provider. Is Ollama running?")
@@ -381,8 +548,8 @@ Analyze this data and provide the security report in the requested JSON format.
 @router.get("/scans")
 async def list_scans(limit: int = 50, offset: int = 0):
     """List all scans with summary metadata."""
-    scans = store.list_scans(limit=limit, offset=offset)
-    return [
+    scans = store.list_scan_summaries(limit=limit, offset=offset)
+    return Response(content=orjson.dumps([
         {
             "scan_id": s.id,
             "target": s.target,
@@ -391,10 +558,10 @@ async def list_scans(limit: int = 50, offset: int = 0):
             "finished_at": s.finished_at.isoformat() if s.finished_at else None,
             "score": s.score,
             "grade": s.grade,
-            "findings_count": len(s.result_json.get("findings", [])) if s.result_json else 0
+            "findings_count": s.findings_count
         }
         for s in scans
-    ]
+    ]), media_type="application/json")
 
 
 @router.get("/scan/{scan_id}/ai-report.pdf")
@@ -414,8 +581,8 @@ async def get_scan_ai_report_pdf(scan_id: str, provider: str = None):
             ai_summary = raw_scan["ai_analysis"]
             
             # Generate PDF
-            result_obj = ScanResult(**scan.result_json)
-            pdf_bytes = generate_ai_pdf(result_obj, ai_summary)
+            result_obj = _parsed_result(scan_id, scan.result_json)
+            pdf_bytes = await _render_report(generate_ai_pdf, result_obj, ai_summary)
             
             return Response(
                 content=pdf_bytes, 
@@ -424,19 +591,7 @@ async def get_scan_ai_report_pdf(scan_id: str, provider: str = None):
             )
 
         # Prepare data for AI view builder
-        debug_info = raw_scan.get("debug_info")
-        if not isinstance(debug_info, dict):
-            debug_info = {}
-
-        ai_input = debug_info.copy()
-        ai_input["target"] = raw_scan.get("target")
-        ai_input["grade"] = raw_scan.get("grade")
-        ai_input["score"] = raw_scan.get("score")
-        ai_input["scan_status"] = raw_scan.get("scan_status")
-        ai_input["blocking_mechanism"] = raw_scan.get("blocking_mechanism")
-        ai_input["visibility_level"] = raw_scan.get("visibility_level")
-        ai_input["findings"] = raw_scan.get("findings")
-
+        ai_input = _build_ai_input(raw_scan)
         ai_view = build_ai_scan_view(ai_input)
 
         # Load versioned system prompt
@@ -450,19 +605,10 @@ async def get_scan_ai_report_pdf(scan_id: str, provider: str = None):
             )
 
         # Construct User Prompt
-        user_prompt = f"""Here is the scan result for {ai_input.get('target')}:
-{json.dumps(ai_view, indent=2)}
-
-Analyze this data and provide the security report in the requested JSON format.
-"""
+        user_prompt = _build_user_prompt(ai_input.get("target"), ai_view)
 
         # Call AI Analyzer
-        from .ai.analyzer import analyzer
-        response_generator = await analyzer.analyze(system_prompt, user_prompt, provider)
-        
-        response_text = ""
-        async for chunk in response_generator:
-            response_text += chunk
+        response_text = await analyzer.analyze(system_prompt, user_prompt, provider, stream=False)
 
         # Validate AI response against schema
         provider_name = provider or "ollama"
@@ -490,15 +636,14 @@ Analyze this data and provide the security report in the requested JSON format.
             updated_result = ScanResult(**scan.result_json)
             store.save_scan_result(scan_id, updated_result)
         except Exception as e:
-            import logging
-            logging.getLogger(__name__).warning(
+            logger.warning(
                 "Failed to save AI analysis to DB for scan %s: %s",
                 scan_id, str(e)
             )
 
         # Generate PDF
         result_obj = ScanResult(**scan.result_json)
-        pdf_bytes = generate_ai_pdf(result_obj, ai_summary)
+        pdf_bytes = await _render_report(generate_ai_pdf, result_obj, ai_summary)
         
         return Response(
             content=pdf_bytes, 
@@ -506,12 +651,12 @@ Analyze this data and provide the security report in the requested JSON format.
             headers={"Content-Disposition": f"attachment; filename=ai_report_{scan_id}.pdf"}
         )
 
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        print(f"ERROR in get_scan_ai_report_pdf: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("get_scan_ai_report_pdf failed for scan %s", scan_id)
         error_msg = str(e)
         if "Connection refused" in error_msg or "ConnectError" in error_msg:
              raise HTTPException(status_code=503, detail="Could not connect to AI provider. Is Ollama running?")
@@ -1,10 +1,71 @@
 from typing import List, Dict, Any
 from httpx import Response
 from http.cookies import SimpleCookie
-from .models import Finding
+from urllib.parse import urlparse
+from .models import Finding, RequestRecord
 from ..constants import Severity, Category
 
-def analyze_cookies(history: List[Dict[str, Any]]) -> tuple[List[Dict[str, Any]], Dict[str, Any], List[Finding]]:
+def _parse_set_cookie(cookie_header: str, final_url: str, processed_cookies: List[Dict[str, Any]], session_keywords: List[str]) -> None:
+    """
+    Parses one Set-Cookie header into processed_cookies, replacing an earlier
+    cookie with the same (name, domain, path).
+    """
+    # SimpleCookie.load() can handle "name=value; Path=/..."
+    try:
+        parser = SimpleCookie()
+        parser.load(cookie_header)
+        
+        for name, morsel in parser.items():
+            # Parse attributes
+            # morsel keys: key, value, coded_value, legal_chars, id, ...
+            # attributes are in morsel keys like 'path', 'domain', 'secure', 'httponly', 'samesite', 'expires', 'max-age'
+            
+            # Note: SimpleCookie keys are lowercase in the internal dict (morsel), e.g. morsel['secure']
+            
+            # Domain fallback: use the host of the URL the response came from
+            host = urlparse(final_url).hostname if final_url else "unknown"
+            
+            cookie_obj = {
+                "name": name,
+                "value": morsel.value[:50] + "..." if len(morsel.value) > 50 else morsel.value, # Truncate
+                "domain": morsel['domain'] or host, 
+                "path": morsel['path'] or "/",
+                "secure": bool(morsel['secure']),
+                "httponly": bool(morsel['httponly']),
+                "samesite": morsel['samesite'] if morsel['samesite'] else None,
+                "expires": morsel['expires'] if morsel['expires'] else None
+            }
+                
+            # Classification
+            lower_name = name.lower()
+            if any(k in lower_name for k in session_keywords):
+                cookie_obj["type"] = "session_guess"
+            else:
+                cookie_obj["type"] = "generic"
+                
+            # Deduplication key
+            key = (cookie_obj["name"], cookie_obj["domain"], cookie_obj["path"])
+            
+            # We might want to update if it exists, or just append?
+            # Let's append if not seen, to capture distinct cookies.
+            # If we see the same cookie updated, maybe we want the latest state?
+            # Let's just keep unique keys.
+            
+            found = False
+            for i, existing in enumerate(processed_cookies):
+                if (existing["name"], existing["domain"], existing["path"]) == key:
+                    processed_cookies[i] = cookie_obj # Update with latest
+                    found = True
+                    break
+            if not found:
+                processed_cookies.append(cookie_obj)
+                    
+    except Exception:
+        # Failed to parse a cookie header
+        pass
+
+
+def analyze_cookies(history: List[RequestRecord]) -> tuple[List[Dict[str, Any]], Dict[str, Any], List[Finding]]:
     """
     Analyzes cookies from the HTTP history (Set-Cookie headers).
     Returns:
@@ -20,85 +81,9 @@ def analyze_cookies(history: List[Dict[str, Any]]) -> tuple[List[Dict[str, Any]]
     SESSION_KEYWORDS = ["session", "sid", "auth", "token", "jwt", "login", "sso"]
     
     for entry in history:
-        # History entries are dicts with "response_headers"
-        headers = entry.get("response_headers", {})
-        
-        # Look for Set-Cookie (case-insensitive search in dict keys)
-        # Since it's a dict, we might only get one value if multiple headers existed.
-        cookie_header = None
-        for k, v in headers.items():
-            if k.lower() == "set-cookie":
-                cookie_header = v
-                break
-        
-        if not cookie_header:
-            continue
-            
-        # cookie_header is a string (or list if we changed HttpClient, but currently string)
-        # If multiple Set-Cookie headers were present, HttpClient (dict conversion) likely kept only the last one.
-        # We process what we have.
-        
-        # SimpleCookie.load() can handle "name=value; Path=/..."
-        # It can also handle multiple cookies separated by specific delimiters if passed correctly, 
-        # but Set-Cookie values are usually distinct headers. 
-        # If we have a single string, we treat it as one Set-Cookie line.
-        
-        try:
-            parser = SimpleCookie()
-            parser.load(cookie_header)
-            
-            for name, morsel in parser.items():
-                # Parse attributes
-                # morsel keys: key, value, coded_value, legal_chars, id, ...
-                # attributes are in morsel keys like 'path', 'domain', 'secure', 'httponly', 'samesite', 'expires', 'max-age'
-                
-                # Note: SimpleCookie keys are lowercase in the internal dict (morsel), e.g. morsel['secure']
-                
-                # Domain fallback: use the host from the URL in the history entry
-                # entry["url"] might be the requested URL. entry["final_url"] is better.
-                host = "unknown"
-                if "final_url" in entry:
-                    from urllib.parse import urlparse
-                    host = urlparse(entry["final_url"]).hostname
-                
-                cookie_obj = {
-                    "name": name,
-                    "value": morsel.value[:50] + "..." if len(morsel.value) > 50 else morsel.value, # Truncate
-                    "domain": morsel['domain'] or host, 
-                    "path": morsel['path'] or "/",
-                    "secure": bool(morsel['secure']),
-                    "httponly": bool(morsel['httponly']),
-                    "samesite": morsel['samesite'] if morsel['samesite'] else None,
-                    "expires": morsel['expires'] if morsel['expires'] else None
-                }
-                    
-                # Classification
-                lower_name = name.lower()
-                if any(k in lower_name for k in SESSION_KEYWORDS):
-                    cookie_obj["type"] = "session_guess"
-                else:
-                    cookie_obj["type"] = "generic"
-                    
-                # Deduplication key
-                key = (cookie_obj["name"], cookie_obj["domain"], cookie_obj["path"])
-                
-                # We might want to update if it exists, or just append?
-                # Let's append if not seen, to capture distinct cookies.
-                # If we see the same cookie updated, maybe we want the latest state?
-                # Let's just keep unique keys.
-                
-                found = False
-                for i, existing in enumerate(processed_cookies):
-                    if (existing["name"], existing["domain"], existing["path"]) == key:
-                        processed_cookies[i] = cookie_obj # Update with latest
-                        found = True
-                        break
-                if not found:
-                    processed_cookies.append(cookie_obj)
-                        
-        except Exception:
-            # Failed to parse a cookie header
-            continue
+        # Each Set-Cookie header the response carried, kept separately by HttpClient
+        for cookie_header in entry.set_cookies:
+            _parse_set_cookie(cookie_header, entry.final_url, processed_cookies, SESSION_KEYWORDS)
 
     # Analysis & Findings
     issues_list = []
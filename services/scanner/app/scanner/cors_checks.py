@@ -1,8 +1,80 @@
+import asyncio
+import httpx
 from typing import List, Dict, Any, Tuple
 from .models import Finding
 from .http_client import HttpClient
 from ..constants import Severity, Category
-from .utils.repro_curl import build_cors_repro_curl
+from ..config import settings
+from .utils.repro_curl import build_cors_repro_curl, build_repro_curl
+
+# Header names in the lowercase form httpx.Headers stores them in
+_ACAO = "access-control-allow-origin"
+_ACAC = "access-control-allow-credentials"
+_ACAM = "access-control-allow-methods"
+_ACAH = "access-control-allow-headers"
+_ACMA = "access-control-max-age"
+
+# Static text of every CORS finding; '{origin}' is filled in per probe
+_FINDING_TEMPLATES: Dict[str, Dict[str, str]] = {
+    "wildcard_credentials": {
+        "title": "Dangerous CORS: Wildcard Origin with Credentials",
+        "description": "The server allows access from any origin ('*') while also allowing credentials. This is a critical security risk if authentication cookies are used.",
+        "recommendation": "Restrict 'Access-Control-Allow-Origin' to a whitelist of trusted domains.",
+    },
+    "wildcard_public": {
+        "title": "Permissive CORS: Wildcard Origin",
+        "description": "The server allows access from any origin ('*'). No cookies or credentials detected, so this is likely a public API or static content. Risk is low.",
+        "recommendation": "Ensure this is intended for a public API. Otherwise, restrict origins.",
+    },
+    "wildcard": {
+        "title": "Permissive CORS: Wildcard Origin",
+        "description": "The server allows access from any origin ('*'). This is acceptable for public APIs but risky for internal services.",
+        "recommendation": "Ensure this is intended for a public API. Otherwise, restrict origins.",
+    },
+    "origin_reflection": {
+        "title": "CORS Misconfiguration: Origin Reflection",
+        "description": "The server reflects the arbitrary origin '{origin}' in 'Access-Control-Allow-Origin'.",
+        "recommendation": "Validate the 'Origin' header against a whitelist before reflecting it.",
+    },
+    "origin_reflection_credentials": {
+        "title": "Dangerous CORS: Origin Reflection with Credentials",
+        "description": "The server reflects the arbitrary origin '{origin}' in 'Access-Control-Allow-Origin'. It also allows credentials, which is a critical risk.",
+        "recommendation": "Validate the 'Origin' header against a whitelist before reflecting it.",
+    },
+    "null_origin_credentials": {
+        "title": "Dangerous CORS: Null Origin with Credentials",
+        "description": "The server allows the 'null' origin with credentials. This can be exploited via sandboxed iframes.",
+        "recommendation": "Do not allow 'null' origin with credentials.",
+    },
+    "preflight_origin": {
+        "title": "CORS Misconfiguration: Preflight Accepts Arbitrary Origin",
+        "description": "The preflight (OPTIONS) response allows the arbitrary origin '{origin}'.",
+        "recommendation": "Validate the 'Origin' header against a whitelist before answering preflight requests.",
+    },
+    "preflight_origin_credentials": {
+        "title": "CORS Misconfiguration: Preflight Accepts Arbitrary Origin",
+        "description": "The preflight (OPTIONS) response allows the arbitrary origin '{origin}' with credentials.",
+        "recommendation": "Validate the 'Origin' header against a whitelist before answering preflight requests.",
+    },
+}
+
+def _cors_finding(key: str, origin: str = "", **fields) -> Finding:
+    """Builds a CORS Finding from its template plus the per-probe fields."""
+    template = _FINDING_TEMPLATES[key]
+    return Finding(
+        title=template["title"],
+        category=Category.CORS,
+        description=template["description"].format(origin=origin),
+        recommendation=template["recommendation"],
+        **fields
+    )
+
+def _reflects_with_credentials(probe_task: asyncio.Task, origin: str) -> bool:
+    if probe_task.cancelled() or probe_task.exception() or not probe_task.result():
+        return False
+    probe_headers = probe_task.result().headers
+    resp_creds = probe_headers.get(_ACAC)
+    return probe_headers.get(_ACAO) == origin and bool(resp_creds and resp_creds.lower() == "true")
 
 async def check_cors(target_url: str, initial_headers: Dict[str, str], http_client: HttpClient, log_callback, cookies_present: bool = False) -> Tuple[List[Finding], Dict[str, Any]]:
     """
@@ -10,12 +82,14 @@ async def check_cors(target_url: str, initial_headers: Dict[str, str], http_clie
     Returns a list of findings and a dictionary with raw CORS info.
     """
     findings = []
-    headers_lower = {k.lower(): v for k, v in initial_headers.items()}
+    # The engine passes the response's httpx.Headers (already case-insensitive)
+    if not isinstance(initial_headers, httpx.Headers):
+        initial_headers = httpx.Headers(initial_headers)
     
     cors_info = {
-        "allow_origin": headers_lower.get("access-control-allow-origin"),
-        "allow_credentials": headers_lower.get("access-control-allow-credentials"),
-        "vary": headers_lower.get("vary"),
+        "allow_origin": initial_headers.get(_ACAO),
+        "allow_credentials": initial_headers.get(_ACAC),
+        "vary": initial_headers.get("vary"),
         "probes": [],
         "notes": []
     }
@@ -46,12 +120,9 @@ async def check_cors(target_url: str, initial_headers: Dict[str, str], http_clie
     if allow_origin == "*" and credentials_true:
         severity = Severity.HIGH if cookies_present else Severity.MEDIUM
         repro_curl = build_cors_repro_curl(target_url, "https://attacker.example.com")
-        findings.append(Finding(
-            title="Dangerous CORS: Wildcard Origin with Credentials",
+        findings.append(_cors_finding(
+            "wildcard_credentials",
             severity=severity,
-            category=Category.CORS,
-            description="The server allows access from any origin ('*') while also allowing credentials. This is a critical security risk if authentication cookies are used.",
-            recommendation="Restrict 'Access-Control-Allow-Origin' to a whitelist of trusted domains.",
             evidence=f"Access-Control-Allow-Origin: *\nAccess-Control-Allow-Credentials: true\nContext: Cookies Present={cookies_present}",
             confidence="high",  # Wildcard + credentials = high confidence
             repro_curl=repro_curl
@@ -59,38 +130,72 @@ async def check_cors(target_url: str, initial_headers: Dict[str, str], http_clie
         cors_info["notes"].append("Passive: Wildcard + Credentials detected.")
         
     elif allow_origin == "*":
-        severity = Severity.INFO
-        desc = "The server allows access from any origin ('*')."
-        
         if not cookies_present and not credentials_true:
-            desc += " No cookies or credentials detected, so this is likely a public API or static content. Risk is low."
+            key, severity = "wildcard_public", Severity.INFO
         else:
-            severity = Severity.LOW
-            desc += " This is acceptable for public APIs but risky for internal services."
+            key, severity = "wildcard", Severity.LOW
 
-        findings.append(Finding(
-            title="Permissive CORS: Wildcard Origin",
+        findings.append(_cors_finding(
+            key,
             severity=severity,
-            category=Category.CORS,
-            description=desc,
-            recommendation="Ensure this is intended for a public API. Otherwise, restrict origins.",
             evidence=f"Access-Control-Allow-Origin: *\nContext: Cookies Present={cookies_present}, Credentials Allowed={credentials_true}",
             confidence="medium"  # Wildcard without creds = medium confidence (could be intentional)
         ))
         cors_info["notes"].append("Passive: Wildcard detected.")
 
     # 2. Active Probing
-    # Probe 1: Evil Origin
+    # Probe 1 (evil origin), probe 2 (null origin, good for local file
+    # attacks) and the preflight are independent, so all are in flight together
     evil_origin = "https://evil.example.com"
+    null_origin = "null"
     if log_callback:
         await log_callback("INFO", f"Probing CORS with Origin: {evil_origin}")
+        await log_callback("INFO", f"Probing CORS with Origin: {null_origin}")
+        await log_callback("INFO", f"Sending CORS preflight with Origin: {evil_origin}")
         
-    probe_headers = {"Origin": evil_origin}
-    response = await http_client.get(target_url, headers=probe_headers)
+    probe_tasks = [
+        asyncio.create_task(http_client.get(target_url, headers={"Origin": evil_origin})),
+        asyncio.create_task(http_client.get(target_url, headers={"Origin": null_origin})),
+        asyncio.create_task(http_client.options(target_url, headers={
+            "Origin": evil_origin,
+            "Access-Control-Request-Method": "GET",
+        })),
+    ]
+    if settings.CORS_FAIL_FAST:
+        # Reflection with credentials is already the worst outcome; the other
+        # probes (usually still waiting on the rate limiter) are not needed
+        try:
+            await asyncio.wait(probe_tasks[:1])
+        except asyncio.CancelledError:
+            for probe_task in probe_tasks:
+                probe_task.cancel()
+            raise
+        if _reflects_with_credentials(probe_tasks[0], evil_origin):
+            for probe_task in probe_tasks[1:]:
+                probe_task.cancel()
+    
+    probe_responses = await asyncio.gather(*probe_tasks, return_exceptions=True)
+    if any(probe_task.cancelled() for probe_task in probe_tasks):
+        cors_info["notes"].append("Active: Remaining probes skipped after reflection with credentials.")
+        probe_responses = [None if probe_task.cancelled() else probe_response
+                           for probe_task, probe_response in zip(probe_tasks, probe_responses)]
+    response, response_null, response_preflight = probe_responses
+    # A failed GET probe fails the check, as before; gather has let the others finish
+    for probe_response in (response, response_null):
+        if isinstance(probe_response, BaseException):
+            raise probe_response
+    # The preflight is extra evidence only; servers often reject OPTIONS outright
+    if isinstance(response_preflight, BaseException):
+        cors_info["notes"].append(f"Active: Preflight failed ({type(response_preflight).__name__}).")
+        response_preflight = None
+    
+    reflection_found = False
     
+    # Probe 1: Evil Origin
     if response:
-        resp_origin = response.headers.get("Access-Control-Allow-Origin")
-        resp_creds = response.headers.get("Access-Control-Allow-Credentials")
+        probe_headers = response.headers
+        resp_origin = probe_headers.get(_ACAO)
+        resp_creds = probe_headers.get(_ACAC)
         
         probe_result = {
             "sent_origin": evil_origin,
@@ -101,37 +206,27 @@ async def check_cors(target_url: str, initial_headers: Dict[str, str], http_clie
         cors_info["probes"].append(probe_result)
         
         if resp_origin == evil_origin:
-            severity = Severity.MEDIUM
-            title = "CORS Misconfiguration: Origin Reflection"
-            desc = f"The server reflects the arbitrary origin '{evil_origin}' in 'Access-Control-Allow-Origin'."
-            
+            reflection_found = True
+            key, severity = "origin_reflection", Severity.MEDIUM
             if resp_creds and resp_creds.lower() == "true":
-                severity = Severity.HIGH
-                title = "Dangerous CORS: Origin Reflection with Credentials"
-                desc += " It also allows credentials, which is a critical risk."
+                key, severity = "origin_reflection_credentials", Severity.HIGH
             
             repro_curl = build_cors_repro_curl(target_url, evil_origin)
-            findings.append(Finding(
-                title=title,
+            findings.append(_cors_finding(
+                key,
+                evil_origin,
                 severity=severity,
-                category=Category.CORS,
-                description=desc,
-                recommendation="Validate the 'Origin' header against a whitelist before reflecting it.",
                 evidence=f"Sent Origin: {evil_origin}\nReceived ACAO: {resp_origin}\nACAC: {resp_creds}",
                 confidence="high",  # Origin reflection confirmed = high confidence
                 repro_curl=repro_curl
             ))
             cors_info["notes"].append(f"Active: Reflection detected for {evil_origin}")
             
-    # Probe 2: Null Origin (optional, but good for local file attacks)
-    null_origin = "null"
-    if log_callback:
-        await log_callback("INFO", f"Probing CORS with Origin: {null_origin}")
-        
-    response_null = await http_client.get(target_url, headers={"Origin": null_origin})
+    # Probe 2: Null Origin
     if response_null:
-        resp_origin = response_null.headers.get("Access-Control-Allow-Origin")
-        resp_creds = response_null.headers.get("Access-Control-Allow-Credentials")
+        probe_headers = response_null.headers
+        resp_origin = probe_headers.get(_ACAO)
+        resp_creds = probe_headers.get(_ACAC)
         
         probe_result = {
             "sent_origin": null_origin,
@@ -143,16 +238,49 @@ async def check_cors(target_url: str, initial_headers: Dict[str, str], http_clie
         
         if resp_origin == null_origin and resp_creds and resp_creds.lower() == "true":
             repro_curl = build_cors_repro_curl(target_url, null_origin)
-            findings.append(Finding(
-                title="Dangerous CORS: Null Origin with Credentials",
+            findings.append(_cors_finding(
+                "null_origin_credentials",
                 severity=Severity.HIGH,
-                category=Category.CORS,
-                description="The server allows the 'null' origin with credentials. This can be exploited via sandboxed iframes.",
-                recommendation="Do not allow 'null' origin with credentials.",
                 evidence=f"Sent Origin: null\nReceived ACAO: null\nACAC: true",
                 confidence="high",  # Null origin with credentials = high confidence
                 repro_curl=repro_curl
             ))
             cors_info["notes"].append("Active: Null origin allowed with credentials.")
 
+    # Probe 3: Preflight (some servers only emit CORS headers on OPTIONS)
+    if response_preflight:
+        probe_headers = response_preflight.headers
+        resp_origin = probe_headers.get(_ACAO)
+        resp_creds = probe_headers.get(_ACAC)
+        resp_methods = probe_headers.get(_ACAM)
+        creds_allowed = bool(resp_creds and resp_creds.lower() == "true")
+        
+        cors_info["preflight"] = {
+            "sent_origin": evil_origin,
+            "received_origin": resp_origin,
+            "received_credentials": resp_creds,
+            "allow_methods": resp_methods,
+            "allow_headers": probe_headers.get(_ACAH),
+            "max_age": probe_headers.get(_ACMA),
+            "status": response_preflight.status_code
+        }
+        
+        if resp_origin == evil_origin and not reflection_found:
+            key, severity = "preflight_origin", Severity.MEDIUM
+            if creds_allowed:
+                key, severity = "preflight_origin_credentials", Severity.HIGH
+            findings.append(_cors_finding(
+                key,
+                evil_origin,
+                severity=severity,
+                evidence=f"OPTIONS Origin: {evil_origin}\nReceived ACAO: {resp_origin}\nACAC: {resp_creds}\nACAM: {resp_methods}",
+                confidence="medium",  # Preflight only; the actual request was not reflected
+                repro_curl=build_repro_curl("OPTIONS", target_url, headers={"Origin": evil_origin})
+            ))
+            cors_info["notes"].append(f"Active: Preflight allowed {evil_origin}")
+        
+        if creds_allowed and resp_methods and resp_methods.strip() == "*":
+            # Browsers treat '*' literally when credentials are allowed
+            cors_info["notes"].append("Active: Preflight combines wildcard methods with credentials.")
+
     return findings, cors_info
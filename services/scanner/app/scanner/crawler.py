@@ -1,141 +1,325 @@
 import asyncio
+import heapq
+import re
+import time
+from functools import lru_cache
+from html import unescape
 from html.parser import HTMLParser
 from urllib.parse import urljoin, urlparse
-from typing import List, Set, Dict, Any
+from typing import Callable, List, Set, Dict, Any, Optional, Tuple
 from .http_client import HttpClient
 from ..config import settings
 
+try:
+    from lxml import etree as lxml_etree
+    from lxml import html as lxml_html
+except ImportError:  # lxml is optional; fall back to the stdlib parser
+    lxml_html = None
+
+ROBOTS_TTL = 600.0  # seconds a fetched robots.txt is reused for the same origin
+
+# (scheme, netloc) -> (monotonic timestamp, robots matcher or None); failed
+# fetches are not cached. One lock per origin being fetched so concurrent
+# crawls fetch once; it is removed when that fetch finishes.
+_robots_cache: Dict[Tuple[str, str], Tuple[float, Optional[Callable[[str], bool]]]] = {}
+_robots_locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+
+def clear_robots_cache() -> None:
+    _robots_cache.clear()
+    _robots_locks.clear()
+
+# One pass over robots.txt picks out the lines we act on (comments end a value)
+_ROBOTS_LINE_RE = re.compile(r"^[ \t]*(user-agent|allow|disallow)[ \t]*:[ \t]*([^\s#]*)", re.I | re.M)
+
+def _robots_rule_pattern(rule: str) -> str:
+    # '*' matches any run of characters and a trailing '$' anchors the end
+    anchored = rule.endswith("$")
+    pattern = re.escape(rule.rstrip("$")).replace(r"\*", ".*")
+    return pattern + "$" if anchored else pattern
+
+def parse_robots(text: str, user_agent: str) -> Optional[Callable[[str], bool]]:
+    """
+    Returns a predicate telling whether a path (with query) is disallowed for
+    user_agent, or None when nothing is. Rules come from the group naming our
+    product token, else from the '*' group; rules before any User-agent line
+    count as '*'. Among matching rules the longest wins, Allow on ties.
+    """
+    token = user_agent.split("/", 1)[0].strip().lower()
+    groups: Dict[str, List[Tuple[str, str]]] = {}
+    agents: List[str] = []
+    in_rules = False
+    for field_name, value in _ROBOTS_LINE_RE.findall(text):
+        field_name = field_name.lower()
+        if field_name == "user-agent":
+            if in_rules:
+                agents, in_rules = [], False
+            agents.append(value.lower())
+            groups.setdefault(value.lower(), [])
+        else:
+            in_rules = True
+            for agent in agents or ["*"]:
+                groups.setdefault(agent, []).append((field_name, value))
+
+    rules = groups.get(token, groups.get("*", []))
+    disallows = [value for field_name, value in rules if field_name == "disallow" and value]
+    allows = [value for field_name, value in rules if field_name == "allow" and value]
+    if not disallows:
+        return None
+
+    if not allows:
+        if not any("*" in rule or "$" in rule for rule in disallows):
+            # Plain prefixes: str.startswith with a tuple tests every prefix in C
+            prefixes = tuple(disallows)
+            return lambda path: path.startswith(prefixes)
+        disallow_re = re.compile("|".join(_robots_rule_pattern(rule) for rule in disallows))
+        return lambda path: disallow_re.match(path) is not None
+
+    # Allow overrides need precedence: check the longest (then Allow) rule first
+    ordered = sorted(
+        [(len(rule), True, re.compile(_robots_rule_pattern(rule))) for rule in allows]
+        + [(len(rule), False, re.compile(_robots_rule_pattern(rule))) for rule in disallows],
+        key=lambda entry: (-entry[0], not entry[1])
+    )
+    def blocked(path: str) -> bool:
+        for _, allowed, rule_re in ordered:
+            if rule_re.match(path):
+                return not allowed
+        return False
+    return blocked
+
+URL_CACHE_SIZE = 8192  # parsed/joined URLs kept across crawls
+
+# Pages repeat the same links (nav, CDN hosts) and rescans of a target see the
+# same ones again; both functions are pure and return immutable values.
+_urljoin_cached = lru_cache(maxsize=URL_CACHE_SIZE)(urljoin)
+_urlparse_cached = lru_cache(maxsize=URL_CACHE_SIZE)(urlparse)
+
+LINK_TAGS = ('a', 'link', 'script', 'img', 'iframe')
+LINK_ATTRS = ('href', 'src')
+
 class LinkParser(HTMLParser):
     def __init__(self):
         super().__init__()
         self.links = set()
 
     def handle_starttag(self, tag, attrs):
-        if tag in ['a', 'link', 'script', 'img', 'iframe']:
+        if tag in LINK_TAGS:
             for attr, value in attrs:
-                if attr in ['href', 'src']:
+                if attr in LINK_ATTRS:
                     if value:
                         self.links.add(value)
 
+# Without lxml, link tags and their href/src values are found by two C-backed
+# regex scans instead of HTMLParser's per-tag Python callbacks
+_LINK_TAG_RE = re.compile(r"<(?:a|link|script|img|iframe)(?=[\s/>])([^>]*)", re.I)
+_LINK_ATTR_RE = re.compile(r"""(?<![^\s/])(?:href|src)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""", re.I)
+REGEX_FALLBACK_MIN_SIZE = 10_000  # bigger pages with no regex hits get HTMLParser
+
+def _extract_links_regex(html_text: str) -> Set[str]:
+    return {
+        unescape(value)
+        for attrs in _LINK_TAG_RE.findall(html_text)
+        for match in _LINK_ATTR_RE.findall(attrs)
+        if (value := match[0] or match[1] or match[2])
+    }
+
+def extract_links(html_text: str) -> Set[str]:
+    """
+    Returns the href/src values of link-bearing tags, parsed with lxml (C)
+    when available and with a regex scan otherwise. LinkParser is the last
+    resort when the regex finds nothing on a sizeable page.
+    """
+    if lxml_html is not None and html_text.strip():
+        try:
+            doc = lxml_html.fromstring(html_text)
+        except (ValueError, lxml_etree.ParserError):
+            pass
+        else:
+            return {
+                value
+                for element in doc.iter(*LINK_TAGS)
+                for attr in LINK_ATTRS
+                if (value := element.get(attr))
+            }
+    links = _extract_links_regex(html_text)
+    if links or len(html_text) < REGEX_FALLBACK_MIN_SIZE:
+        return links
+    parser = LinkParser()
+    parser.feed(html_text)
+    return parser.links
+
 from .scope import ScopeManager, EndpointClass
 
 class SimpleCrawler:
-    def __init__(self, http_client: HttpClient, log_callback=None):
+    def __init__(self, http_client: HttpClient, log_callback=None, scope_manager: Optional[ScopeManager] = None):
         self.http_client = http_client
         self.log_callback = log_callback
-        self.scope_manager = ScopeManager()
+        # Callers that already hold a ScopeManager (the engine) pass it in
+        self.scope_manager = scope_manager or ScopeManager()
+
+    def _make_scope_predicate(self, crawl_scope: str, start_url: str, start_parsed) -> Callable[[str, Any], bool]:
+        """
+        Returns the in-scope test for one crawl. CRAWL_SCOPE is fixed for the
+        whole crawl, so the mode is resolved here rather than once per link.
+        """
+        base_domain = start_parsed.netloc
+        base_path = start_parsed.path
+
+        if crawl_scope == "host":
+            def in_scope(full_url, parsed):
+                return parsed.netloc == base_domain
+        elif crawl_scope == "path":
+            def in_scope(full_url, parsed):
+                return parsed.netloc == base_domain and parsed.path.startswith(base_path)
+        else:
+            # Default / subdomains: use ScopeManager to check registrable domain
+            is_in_scope = self.scope_manager.is_in_scope
+            def in_scope(full_url, parsed):
+                return is_in_scope(full_url, start_url)
+        return in_scope
+
+    async def _get_robots_matcher(self, start_parsed) -> Optional[Callable[[str], bool]]:
+        """
+        Returns the origin's robots.txt matcher (see parse_robots), or None if
+        it disallows nothing or could not be fetched.
+        """
+        key = (start_parsed.scheme, start_parsed.netloc)
+        cached = _robots_cache.get(key)
+        if cached and time.monotonic() - cached[0] < ROBOTS_TTL:
+            return cached[1]
+
+        lock = _robots_locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                # Another crawl may have fetched it while we waited
+                cached = _robots_cache.get(key)
+                if cached and time.monotonic() - cached[0] < ROBOTS_TTL:
+                    return cached[1]
+
+                try:
+                    robots_url = f"{start_parsed.scheme}://{start_parsed.netloc}/robots.txt"
+                    if self.log_callback:
+                        await self.log_callback("INFO", f"Checking robots.txt at {robots_url}")
+                
+                    resp = await self.http_client.get(robots_url)
+                    matcher = None
+                    if resp and resp.status_code == 200:
+                        matcher = parse_robots(resp.text, settings.USER_AGENT)
+                except Exception as e:
+                    if self.log_callback:
+                        await self.log_callback("WARNING", f"Failed to check robots.txt: {e}")
+                    return None
+
+                now = time.monotonic()
+                # Drop expired origins so the cache only holds recent crawls
+                for expired in [k for k, (ts, _) in _robots_cache.items() if now - ts >= ROBOTS_TTL]:
+                    del _robots_cache[expired]
+                _robots_cache[key] = (now, matcher)
+                return matcher
+        finally:
+            # The lock only serializes fetches already in progress: crawls that
+            # arrive later hit the cache (or create a fresh lock), so the dict
+            # never outlives the fetch or the event loop it ran on
+            if _robots_locks.get(key) is lock:
+                del _robots_locks[key]
 
     async def crawl_generator(self, start_url: str, initial_html: str = None, max_urls: int = settings.MAX_CRAWL_URLS):
         """
         Yields discovered assets as they are found.
         """
-        visited_urls = set()
         start_parsed = urlparse(start_url)
         
         if self.log_callback:
             await self.log_callback("INFO", f"Starting streaming crawl on {start_url}")
 
         # Robots.txt check
-        allowed_by_robots = True
-        if settings.RESPECT_ROBOTS:
-            try:
-                robots_url = f"{start_parsed.scheme}://{start_parsed.netloc}/robots.txt"
-                if self.log_callback:
-                    await self.log_callback("INFO", f"Checking robots.txt at {robots_url}")
-                
-                resp = await self.http_client.get(robots_url)
-                if resp and resp.status_code == 200:
-                    disallowed_paths = []
-                    for line in resp.text.splitlines():
-                        if line.strip().lower().startswith("disallow:"):
-                            path = line.split(":", 1)[1].strip()
-                            if path:
-                                disallowed_paths.append(path)
-            except Exception as e:
-                if self.log_callback:
-                    await self.log_callback("WARNING", f"Failed to check robots.txt: {e}")
+        robots_blocks = await self._get_robots_matcher(start_parsed) if settings.RESPECT_ROBOTS else None
 
         # 1. Parse Links
-        parser = LinkParser()
+        links = set()
         if initial_html:
-            parser.feed(initial_html)
+            links = extract_links(initial_html)
         else:
             resp = await self.http_client.get(start_url)
             if resp:
-                parser.feed(resp.text)
+                links = extract_links(resp.text)
         
         # 2. Filter & Normalize
-        candidates = set()
-        for link in parser.links:
-            full_url = urljoin(start_url, link)
-            parsed = urlparse(full_url)
-            
-            # Smart Scoping using ScopeManager
-            # We respect the CRAWL_SCOPE setting but use ScopeManager for domain logic
-            in_scope = False
-            
-            if settings.CRAWL_SCOPE == "host":
-                if parsed.netloc == start_parsed.netloc:
-                    in_scope = True
-            elif settings.CRAWL_SCOPE == "path":
-                if parsed.netloc == start_parsed.netloc and parsed.path.startswith(start_parsed.path):
-                    in_scope = True
-            else:
-                # Default / subdomains: use ScopeManager to check registrable domain
-                if self.scope_manager.is_in_scope(full_url, start_url):
-                    in_scope = True
+        # Smart Scoping: we respect the CRAWL_SCOPE setting but use
+        # ScopeManager for domain logic; the mode is resolved once per crawl
+        in_scope = self._make_scope_predicate(settings.CRAWL_SCOPE, start_url, start_parsed)
+        static_extensions = frozenset(ext.lower() for ext in settings.STATIC_EXTENSIONS)
+        
+        def candidate_url(link: str) -> Optional[str]:
+            """Returns the link's URL without fragment, or None if it is filtered out."""
+            full_url = _urljoin_cached(start_url, link)
+            parsed = _urlparse_cached(full_url)
             
-            if not in_scope:
-                continue
-
-            # Static Asset Filtering
-            clean_url = full_url.split('#')[0]
-            ext = clean_url.split('.')[-1].lower() if '.' in clean_url.split('/')[-1] else ""
-            if ext in settings.STATIC_EXTENSIONS:
-                continue
+            if not in_scope(full_url, parsed):
+                return None
+
+            # Static Asset Filtering (partition/rfind build no intermediate lists)
+            clean_url = full_url.partition('#')[0]
+            if static_extensions:
+                last_segment = clean_url.rpartition('/')[2]
+                dot = last_segment.rfind('.')
+                if dot >= 0 and last_segment[dot + 1:].lower() in static_extensions:
+                    return None
                 
-            # Robots check
-            if settings.RESPECT_ROBOTS and 'disallowed_paths' in locals():
-                blocked = False
-                for dp in disallowed_paths:
-                    if parsed.path.startswith(dp):
-                        blocked = True
-                        break
-                if blocked:
-                    continue
-
-            if clean_url != start_url and clean_url not in visited_urls:
-                candidates.add(clean_url)
-
-        # 3. Probe Candidates
-        sorted_candidates = sorted(list(candidates))[:max_urls]
+            # Robots check (rules match the path plus query)
+            if robots_blocks is not None and robots_blocks(
+                f"{parsed.path or '/'}?{parsed.query}" if parsed.query else parsed.path or "/"
+            ):
+                return None
+            return clean_url
+
+        candidates = {url for url in map(candidate_url, links) if url and url != start_url}
+
+        # 3. Probe Candidates (only the first max_urls in sorted order are needed)
+        sorted_candidates = heapq.nsmallest(max_urls, candidates)
         
-        for url in sorted_candidates:
-            if self.log_callback:
-                await self.log_callback("INFO", f"Discovered asset: {url}")
-            
-            status_code = None
-            content_type = None
-            
-            # Try HEAD first
-            resp = await self.http_client.head(url)
-            if not resp or resp.status_code == 405:
-                resp = await self.http_client.get(url)
-            
-            if resp:
-                status_code = resp.status_code
-                content_type = resp.headers.get("Content-Type")
+        # Probes run concurrently (bounded; HttpClient still spaces request
+        # starts) but assets are yielded in sorted order so reports are stable
+        probe_slots = asyncio.Semaphore(max(1, settings.CRAWL_CONCURRENCY))
+        
+        async def probe(url: str) -> Dict[str, Any]:
+            async with probe_slots:
+                if self.log_callback:
+                    await self.log_callback("INFO", f"Discovered asset: {url}")
+                
+                status_code = None
+                content_type = None
+                
+                # Try HEAD first
+                resp = await self.http_client.head(url)
+                if not resp or resp.status_code == 405:
+                    resp = await self.http_client.get(url)
+                
+                if resp:
+                    status_code = resp.status_code
+                    content_type = resp.headers.get("Content-Type")
             
             # Classify endpoint
             classification = self.scope_manager.classify_endpoint(url, content_type=content_type)
             
-            asset = {
+            return {
                 "url": url,
                 "status_code": status_code,
                 "content_type": content_type,
                 "classification": classification
             }
-            yield asset
+        
+        probes = [asyncio.create_task(probe(url)) for url in sorted_candidates]
+        try:
+            for pending_probe in probes:
+                yield await pending_probe
+        finally:
+            # Failed probe or consumer stopped early: do not leave requests running
+            for pending_probe in probes:
+                if not pending_probe.done():
+                    pending_probe.cancel()
+                elif not pending_probe.cancelled():
+                    pending_probe.exception()  # mark as retrieved
 
     async def crawl(self, start_url: str, initial_html: str = None, max_urls: int = settings.MAX_CRAWL_URLS) -> List[Dict[str, Any]]:
         """
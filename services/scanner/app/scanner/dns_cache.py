@@ -0,0 +1,28 @@
+import asyncio
+import socket
+import time
+from typing import Dict, Tuple
+
+DNS_TTL = 900.0  # seconds a successful resolution is reused
+
+# hostname -> (monotonic timestamp, ip address). Failures are never cached.
+_dns_cache: Dict[str, Tuple[float, str]] = {}
+
+async def resolve_host(hostname: str, port: int) -> str:
+    """
+    Resolves a hostname to its first address without blocking the event loop.
+    Successful lookups are cached for DNS_TTL seconds so rescans of the same
+    target skip the DNS round trip.
+    """
+    cached = _dns_cache.get(hostname)
+    if cached and time.monotonic() - cached[0] < DNS_TTL:
+        return cached[1]
+
+    loop = asyncio.get_running_loop()
+    ip_info = await loop.run_in_executor(None, socket.getaddrinfo, hostname, port)
+    ip_addr = ip_info[0][4][0]
+    _dns_cache[hostname] = (time.monotonic(), ip_addr)
+    return ip_addr
+
+def clear_dns_cache() -> None:
+    _dns_cache.clear()
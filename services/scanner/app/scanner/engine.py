@@ -6,6 +6,7 @@ import httpx
 
 from .models import ScanResult, ScanLogEntry, Finding
 from .normalizer import normalize_target
+from .dns_cache import resolve_host
 from .http_client import HttpClient
 from .tls_checks import check_tls
 from .header_checks import check_security_headers
@@ -64,9 +65,7 @@ class ScanEngine:
             
             async def task_dns():
                 try:
-                    loop = asyncio.get_running_loop()
-                    ip_info = await loop.run_in_executor(None, socket.getaddrinfo, target_info.hostname, target_info.port)
-                    return ip_info[0][4][0]
+                    return await resolve_host(target_info.hostname, target_info.port)
                 except Exception as e:
                     await log("ERROR", f"DNS resolution failed: {e}")
                     raise e
@@ -236,7 +235,7 @@ class ScanEngine:
                 if "text/html" in content_type:
                     await log("INFO", "HTML content detected, starting streaming crawler & vuln pipeline...")
                     from .crawler import SimpleCrawler
-                    crawler = SimpleCrawler(self.http_client, log)
+                    crawler = SimpleCrawler(self.http_client, log, scope_manager=self.scope_manager)
                     
                     tasks = []
                     tasks.append(asyncio.create_task(process_url(target_info.full_url)))
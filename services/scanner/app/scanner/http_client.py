@@ -1,16 +1,48 @@
 import httpx
 import asyncio
 import time
-from typing import Optional, List, Dict, Any, Callable, Awaitable
+from typing import Optional, List, Callable, Awaitable, Tuple
 from ..config import Settings
+from .models import RequestRecord
+
+# Connection pool shared by every HttpClient on the running event loop, so
+# concurrent and back-to-back scans reuse connections and TLS sessions.
+# Pools are bound to their loop; a new loop (e.g. a new CLI run) gets its own.
+_shared_transport: Optional[Tuple[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport]] = None
+
+def get_shared_transport(config: Settings) -> httpx.AsyncHTTPTransport:
+    global _shared_transport
+    loop = asyncio.get_running_loop()
+    if _shared_transport is None or _shared_transport[0] is not loop:
+        transport = httpx.AsyncHTTPTransport(
+            verify=False,
+            http2=config.HTTP2,
+            limits=httpx.Limits(
+                max_connections=config.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=config.HTTP_MAX_KEEPALIVE
+            )
+        )
+        _shared_transport = (loop, transport)
+    return _shared_transport[1]
+
+async def close_shared_transport() -> None:
+    global _shared_transport
+    if _shared_transport is not None:
+        loop, transport = _shared_transport
+        _shared_transport = None
+        if loop is asyncio.get_running_loop():
+            await transport.aclose()
 
 class HttpClient:
     def __init__(self, config: Settings, log_callback: Callable[[str, str], Awaitable[None]] = None):
         self.config = config
         self.log_callback = log_callback
         self.client: Optional[httpx.AsyncClient] = None
-        self.history: List[Dict[str, Any]] = []
+        self.history: List[RequestRecord] = []
         self.last_request_time = 0.0
+        # Send slots are reserved under this lock so concurrent callers are spaced out
+        self._rate_lock = asyncio.Lock()
+        self._next_slot_at = 0.0  # time.monotonic() before which no request may start
         
         # Adaptive Rate Limiting
         self.consecutive_errors = 0
@@ -18,42 +50,60 @@ class HttpClient:
         self.request_timestamps = [] # For sliding window
 
     async def __aenter__(self):
-        self.client = httpx.AsyncClient(
-            verify=False,
-            follow_redirects=True,
-            timeout=self.config.DEFAULT_TIMEOUT,
-            headers={"User-Agent": self.config.USER_AGENT},
-            limits=httpx.Limits(max_keepalive_connections=10, max_connections=20)
-        )
+        if self.config.SHARE_HTTP_POOL:
+            # Own client (cookies, history) on top of the shared pool
+            self.client = httpx.AsyncClient(
+                transport=get_shared_transport(self.config),
+                follow_redirects=True,
+                timeout=self.config.DEFAULT_TIMEOUT,
+                headers={"User-Agent": self.config.USER_AGENT}
+            )
+        else:
+            self.client = httpx.AsyncClient(
+                verify=False,
+                http2=self.config.HTTP2,
+                follow_redirects=True,
+                timeout=self.config.DEFAULT_TIMEOUT,
+                headers={"User-Agent": self.config.USER_AGENT},
+                limits=httpx.Limits(max_keepalive_connections=10, max_connections=20)
+            )
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if self.client:
-            await self.client.aclose()
+            # Closing a client closes its transport; the shared pool stays open
+            if not self.config.SHARE_HTTP_POOL:
+                await self.client.aclose()
             self.client = None
 
     async def _wait_for_rate_limit(self):
-        now = time.time()
-        
-        # 1. Basic Delay
-        elapsed = now - self.last_request_time
-        if elapsed < self.current_delay:
-            await asyncio.sleep(self.current_delay - elapsed)
-            
-        # 2. Adaptive: Requests per minute
-        if self.config.ADAPTIVE_RATE_LIMIT:
-            # Clean old timestamps (older than 60s)
-            self.request_timestamps = [t for t in self.request_timestamps if now - t < 60]
+        async with self._rate_lock:
+            now = time.monotonic()
             
-            if len(self.request_timestamps) >= self.config.MAX_REQUESTS_PER_MINUTE:
-                # Wait until oldest expires
-                if self.request_timestamps:
+            # 1. Basic Delay (between request starts)
+            wait_time = self._next_slot_at - now
+            if wait_time > 0:
+                await asyncio.sleep(wait_time)
+                now = time.monotonic()
+                
+            # 2. Adaptive: Requests per minute
+            if self.config.ADAPTIVE_RATE_LIMIT:
+                # Clean old timestamps (older than 60s)
+                self.request_timestamps = [t for t in self.request_timestamps if now - t < 60]
+                
+                if len(self.request_timestamps) >= self.config.MAX_REQUESTS_PER_MINUTE:
+                    # Wait until oldest expires
                     oldest = self.request_timestamps[0]
                     wait_time = 60 - (now - oldest)
                     if wait_time > 0:
                         if self.log_callback:
                             await self.log_callback("WARNING", f"Rate limit reached ({self.config.MAX_REQUESTS_PER_MINUTE} rpm). Slowing down for {wait_time:.2f}s.")
                         await asyncio.sleep(wait_time)
+                        now = time.monotonic()
+                
+                self.request_timestamps.append(now)
+            
+            self._next_slot_at = now + self.current_delay
 
     async def request(self, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
         if not self.client:
@@ -62,20 +112,21 @@ class HttpClient:
         await self._wait_for_rate_limit()
 
         try:
-            start_time = time.time()
+            start_time = time.monotonic()
             response = await self.client.request(method, url, **kwargs)
-            latency = time.time() - start_time
+            latency = time.monotonic() - start_time
             
             self.last_request_time = time.time()
-            self.request_timestamps.append(self.last_request_time)
             
-            self.history.append({
-                "timestamp": self.last_request_time,
-                "method": method,
-                "url": url,
-                "status": response.status_code,
-                "latency": latency
-            })
+            self.history.append(RequestRecord(
+                timestamp=self.last_request_time,
+                method=method,
+                url=url,
+                status=response.status_code,
+                latency=latency,
+                final_url=str(response.url),
+                set_cookies=tuple(response.headers.get_list("set-cookie"))
+            ))
             
             # Adaptive Logic
             if self.config.ADAPTIVE_RATE_LIMIT:
@@ -114,3 +165,6 @@ class HttpClient:
 
     async def head(self, url: str, **kwargs) -> Optional[httpx.Response]:
         return await self.request("HEAD", url, **kwargs)
+
+    async def options(self, url: str, **kwargs) -> Optional[httpx.Response]:
+        return await self.request("OPTIONS", url, **kwargs)
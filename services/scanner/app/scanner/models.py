@@ -1,6 +1,6 @@
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Optional, Union, Literal
+from typing import List, Optional, Tuple, Union, Literal
 
 from ..constants import Severity, Category, LogLevel, ScanStatus, VisibilityLevel
 
@@ -62,6 +62,24 @@ class ScanLogEntry:
             self.level = LogLevel(self.level.upper())
 
 
+@dataclass(slots=True)
+class RequestRecord:
+    """
+    One request made by HttpClient (see HttpClient.history).
+    
+    Slotted, so long scans keep one small object per request instead of a
+    dict; orjson and pydantic serialize it like a dict of its fields.
+    analyze_cookies reads the Set-Cookie values recorded here.
+    """
+    timestamp: float  # time.time() when the response arrived
+    method: str
+    url: str
+    status: int
+    latency: float  # seconds
+    final_url: str = ""  # URL the response came from (after redirects)
+    set_cookies: Tuple[str, ...] = ()  # Set-Cookie header values, one per header
+
+
 @dataclass
 class ScanResult:
     target: str
@@ -1,6 +1,7 @@
 from enum import Enum
 from urllib.parse import urlparse, parse_qs
 import tldextract
+from functools import lru_cache
 from typing import List, Set, Dict, Optional
 
 class EndpointClass(str, Enum):
@@ -11,10 +12,18 @@ class EndpointClass(str, Enum):
     REDIRECTOR = "REDIRECTOR"
     UNKNOWN = "UNKNOWN"
 
+@lru_cache(maxsize=1)
+def get_tld_extractor() -> tldextract.TLDExtract:
+    """
+    Process-wide extractor. TLDExtract loads the public suffix list on first
+    use, so sharing it means that happens once rather than once per scan.
+    """
+    # Use default cache dir or disable if needed. Default is usually fine.
+    return tldextract.TLDExtract()
+
 class ScopeManager:
     def __init__(self):
-        # Use default cache dir or disable if needed. Default is usually fine.
-        self.extract = tldextract.TLDExtract()
+        self.extract = get_tld_extractor()
 
     def get_registrable_domain(self, url: str) -> str:
         """
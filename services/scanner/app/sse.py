@@ -1,8 +1,19 @@
 import asyncio
-import json
+import orjson
 from typing import AsyncGenerator
 from .models import ScanLog
 
+# While a scan is live, streams wake on new logs; after this long without any
+# signal a keepalive comment is sent so proxies do not drop the idle stream.
+LIVE_WAIT_TIMEOUT = 15.0
+KEEPALIVE_EVENT = ": keepalive\n\n"
+# Poll interval when the scan is not tracked in memory (e.g. queued elsewhere)
+POLL_INTERVAL = 0.5
+
+def _sse_event(event: str, data) -> str:
+    # Format: event: <name>\ndata: {...}\n\n (orjson output has no newlines)
+    return f"event: {event}\ndata: {orjson.dumps(data).decode()}\n\n"
+
 async def event_generator(scan_id: str, store) -> AsyncGenerator[str, None]:
     """
     Yields SSE events for a given scan_id.
@@ -17,32 +28,30 @@ async def event_generator(scan_id: str, store) -> AsyncGenerator[str, None]:
     sent_logs_count = 0
     
     while True:
-        # Check for new logs
-        # Try to get live logs first
-        current_logs = store.get_live_logs(scan_id)
-        
-        # If no live logs, maybe scan is done and logs are in DB
-        if not current_logs:
-            scan = store.get_scan(scan_id)
-            if scan and scan.logs_json:
-                current_logs = scan.logs_json
+        # Live scan: push new in-memory logs, then wait for the next one
+        if store.is_scan_live(scan_id):
+            # Grab the signal before reading so an append in between is not missed
+            signal = store.log_signal(scan_id)
+            current_logs = store.get_live_logs(scan_id)
+            if len(current_logs) > sent_logs_count:
+                for log in current_logs[sent_logs_count:]:
+                    yield _sse_event("log", log)
+                sent_logs_count = len(current_logs)
+            try:
+                await asyncio.wait_for(signal.wait(), timeout=LIVE_WAIT_TIMEOUT)
+            except asyncio.TimeoutError:
+                yield KEEPALIVE_EVENT
+            continue
         
-        if len(current_logs) > sent_logs_count:
-            for log in current_logs[sent_logs_count:]:
-                # Format: event: log\ndata: {...}\n\n
-                yield f"event: log\ndata: {json.dumps(log)}\n\n"
-            sent_logs_count = len(current_logs)
-        
-        # Check if done
+        # Not live: the scan is finished (logs are in the DB) or not started here
         scan = store.get_scan(scan_id)
         if scan and scan.status in ["completed", "failed", "done"]:
-            # Send any remaining logs if we switched from live to DB
             if scan.logs_json and len(scan.logs_json) > sent_logs_count:
                 for log in scan.logs_json[sent_logs_count:]:
-                    yield f"event: log\ndata: {json.dumps(log)}\n\n"
+                    yield _sse_event("log", log)
             
             status = "done" if scan.status == "completed" else scan.status
-            yield f"event: done\ndata: {json.dumps({'scan_id': scan_id, 'status': status})}\n\n"
+            yield _sse_event("done", {"scan_id": scan_id, "status": status})
             break
             
-        await asyncio.sleep(0.1)
+        await asyncio.sleep(POLL_INTERVAL)
@@ -1,6 +1,8 @@
-from typing import List, Optional, Dict, Any
+import asyncio
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
-from sqlmodel import Session, select
+from sqlalchemy import String, type_coerce
+from sqlmodel import Session, select, func, update
 from .database import engine
 from .models import Scan, ScanResult, ScanLog, Finding
 
@@ -12,6 +14,30 @@ create_db_and_tables()
 # scan_id -> list of log dicts
 active_scans: Dict[str, List[Dict[str, Any]]] = {}
 
+# scan_id -> event set (and replaced) whenever new logs arrive or the scan ends,
+# so SSE streams wait for changes instead of polling
+_log_signals: Dict[str, asyncio.Event] = {}
+
+def _notify_log_waiters(scan_id: str):
+    signal = _log_signals.pop(scan_id, None)
+    if signal:
+        signal.set()
+
+def log_signal(scan_id: str) -> asyncio.Event:
+    """Returns the event that fires on the next log entry (or end) of a live scan."""
+    if scan_id not in active_scans:
+        # Nothing more will be signalled for this scan
+        done = asyncio.Event()
+        done.set()
+        return done
+    signal = _log_signals.get(scan_id)
+    if signal is None:
+        signal = _log_signals[scan_id] = asyncio.Event()
+    return signal
+
+def is_scan_live(scan_id: str) -> bool:
+    return scan_id in active_scans
+
 def create_scan(target: str) -> Scan:
     with Session(engine) as session:
         scan = Scan(target=target, status="queued")
@@ -22,15 +48,54 @@ def create_scan(target: str) -> Scan:
         active_scans[scan.id] = []
         return scan
 
+def create_scans_bulk(targets: List[str]) -> List[Scan]:
+    """Creates one queued scan per target in a single transaction."""
+    with Session(engine) as session:
+        scans = [Scan(target=target, status="queued") for target in targets]
+        session.add_all(scans)
+        session.commit()
+        for scan in scans:
+            session.refresh(scan)
+            active_scans[scan.id] = []
+        return scans
+
 def get_scan(scan_id: str) -> Optional[Scan]:
     with Session(engine) as session:
         return session.get(Scan, scan_id)
 
+def get_scan_result_raw(scan_id: str) -> Optional[Tuple[str, Optional[str]]]:
+    """
+    Returns (status, result JSON text) without decoding result_json, so the
+    stored document can be sent as-is.
+    """
+    statement = select(Scan.status, type_coerce(Scan.result_json, String)).where(Scan.id == scan_id)
+    with Session(engine) as session:
+        row = session.exec(statement).first()
+    return tuple(row) if row else None
+
 def list_scans(limit: int = 100, offset: int = 0) -> List[Scan]:
     with Session(engine) as session:
         statement = select(Scan).order_by(Scan.started_at.desc()).offset(offset).limit(limit)
         return session.exec(statement).all()
 
+def list_scan_summaries(limit: int = 100, offset: int = 0) -> List[Any]:
+    """
+    Lists scans without loading result_json/logs_json; the findings count is
+    computed by SQLite (JSON1) instead of decoding each result blob.
+    """
+    findings_count = func.coalesce(func.json_array_length(Scan.result_json, "$.findings"), 0)
+    statement = (
+        select(
+            Scan.id, Scan.target, Scan.status, Scan.started_at, Scan.finished_at,
+            Scan.score, Scan.grade, findings_count.label("findings_count"),
+        )
+        .order_by(Scan.started_at.desc())
+        .offset(offset)
+        .limit(limit)
+    )
+    with Session(engine) as session:
+        return session.exec(statement).all()
+
 def update_scan_status(scan_id: str, status: str):
     with Session(engine) as session:
         scan = session.get(Scan, scan_id)
@@ -42,29 +107,38 @@ def update_scan_status(scan_id: str, status: str):
 def append_log(scan_id: str, log_entry: Dict[str, Any]):
     if scan_id in active_scans:
         active_scans[scan_id].append(log_entry)
+        _notify_log_waiters(scan_id)
 
 def get_live_logs(scan_id: str) -> List[Dict[str, Any]]:
     return active_scans.get(scan_id, [])
 
 def save_scan_result(scan_id: str, result: ScanResult):
+    # Convert Pydantic models to dicts for JSON storage; logs_json reuses the
+    # already-dumped log entries instead of dumping them a second time
+    result_json = result.model_dump(mode='json')
+    # Status, result, logs and grade land in one UPDATE (no prior SELECT), so
+    # readers never see a completed scan without its result
+    statement = (
+        update(Scan)
+        .where(Scan.id == scan_id)
+        .values(
+            status="completed",
+            finished_at=datetime.utcnow(),
+            score=result.score,
+            grade=result.grade,
+            result_json=result_json,
+            logs_json=result_json["logs"],
+        )
+    )
     with Session(engine) as session:
-        scan = session.get(Scan, scan_id)
-        if scan:
-            scan.status = "completed"
-            scan.finished_at = datetime.utcnow()
-            scan.score = result.score
-            scan.grade = result.grade
-            
-            # Convert Pydantic models to dicts for JSON storage
-            scan.result_json = result.model_dump(mode='json')
-            scan.logs_json = [log.model_dump(mode='json') for log in result.logs]
-            
-            session.add(scan)
-            session.commit()
-            
-            # Cleanup active logs
-            if scan_id in active_scans:
-                del active_scans[scan_id]
+        updated = session.exec(statement).rowcount
+        session.commit()
+    
+    if updated:
+        # Cleanup active logs
+        if scan_id in active_scans:
+            del active_scans[scan_id]
+        _notify_log_waiters(scan_id)
 
 def fail_scan(scan_id: str, error_message: str):
     with Session(engine) as session:
@@ -78,3 +152,4 @@ def fail_scan(scan_id: str, error_message: str):
             # Cleanup active logs
             if scan_id in active_scans:
                 del active_scans[scan_id]
+            _notify_log_waiters(scan_id)
@@ -1,8 +1,20 @@
+import os
+import shutil
+import tempfile
 import pytest
 import asyncio
 from datetime import datetime
 from typing import Dict, Any
 
+# Tests get their own SQLite file instead of the tracked services/scanner/auditai.db
+# (WAL mode is persistent and leaves -wal/-shm files next to the database).
+# Set before any test module imports app.database.
+_TEST_DB_DIR = tempfile.mkdtemp(prefix="auditai-tests-")
+os.environ["SCANNER_DB_FILE"] = os.path.join(_TEST_DB_DIR, "auditai.db")
+
+def pytest_unconfigure(config):
+    shutil.rmtree(_TEST_DB_DIR, ignore_errors=True)
+
 @pytest.fixture
 def sample_scan_results() -> Dict[str, Any]:
     """Sample scan results for testing"""
@@ -9,8 +9,10 @@ Tests cover:
 - Invalid scheme -> 400 Bad Request
 """
 
+import orjson
 import pytest
 from fastapi.testclient import TestClient
+from types import SimpleNamespace
 from unittest.mock import patch
 
 from app.main import app
@@ -22,6 +24,49 @@ def client():
     return TestClient(app)
 
 
+@pytest.fixture(autouse=True)
+def no_inflight_scans():
+    """Scans started with run_scan_task patched out are never released."""
+    from app import routes
+    routes._inflight_scans.clear()
+    yield
+    routes._inflight_scans.clear()
+
+
+@pytest.fixture
+def completed_scan():
+    """Factory for stub completed scans, as returned by store.get_scan."""
+    def make(scan_id, **result):
+        return SimpleNamespace(status="completed", result_json={
+            "scan_id": scan_id, "target": "https://example.com", "status": "done",
+            "score": 90, "grade": "A", "findings": [], "logs": [],
+            "timestamp": "2024-01-01T00:00:00", **result,
+        })
+    return make
+
+
+def stored_row(scan):
+    """store.get_scan_result_raw stand-in serving a stub scan's current result."""
+    return lambda scan_id: (scan.status, orjson.dumps(scan.result_json).decode())
+
+
+@pytest.fixture
+def created_scans():
+    """Ids of scans a test creates; their rows and live logs are removed afterwards."""
+    from app import store
+    from app.models import Scan
+    from sqlmodel import Session
+    scan_ids = set()
+    yield scan_ids
+    with Session(store.engine) as session:
+        for scan_id in scan_ids:
+            scan = session.get(Scan, scan_id)
+            if scan is not None:
+                session.delete(scan)
+            store.active_scans.pop(scan_id, None)
+        session.commit()
+
+
 class TestScanEndpointAuthorization:
     """Integration tests for /scan endpoint authorization enforcement."""
     
@@ -118,6 +163,57 @@ class TestScanEndpointAuthorization:
         assert data["error_code"] == "UNSUPPORTED_SCHEME"
 
 
+class TestScanConcurrency:
+    """Tests for in-flight deduplication and the concurrent scan limit."""
+    
+    @patch('app.routes.run_scan_task')
+    def test_in_flight_target_returns_existing_scan(self, mock_scan_task, client):
+        with patch.dict("app.routes._inflight_scans", {"https://busy.example.com": "busy-scan"}):
+            response = client.post(
+                "/scan",
+                json={"target": "https://busy.example.com", "authorized": True}
+            )
+        
+        assert response.json() == {"scan_id": "busy-scan"}
+        mock_scan_task.assert_not_called()
+    
+    @patch('app.routes.run_scan_task')
+    def test_back_to_back_requests_share_one_scan(self, mock_scan_task, client, created_scans):
+        """
+        The second POST arrives before the first scan's task has run (patched
+        out here) and must still get the first scan instead of a new one.
+        """
+        body = {"target": "https://twice-in-a-row.example.com", "authorized": True}
+        first = client.post("/scan", json=body).json()
+        second = client.post("/scan", json=body).json()
+        created_scans.update((first["scan_id"], second["scan_id"]))
+        
+        assert second == first
+        mock_scan_task.assert_called_once_with(first["scan_id"], body["target"])
+    
+    @pytest.mark.asyncio
+    async def test_scans_beyond_the_limit_wait_for_a_slot(self):
+        import asyncio
+        from app import routes
+        
+        running = 0
+        peak = 0
+        
+        async def fake_scan(scan_id, target):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+        
+        with patch("app.routes._scan_slots", asyncio.Semaphore(2)), \
+             patch("app.routes._execute_scan", side_effect=fake_scan):
+            await routes.run_scan_batch([(str(i), f"https://{i}.example.com") for i in range(5)])
+        
+        assert peak == 2
+        assert routes._inflight_scans == {}
+
+
 class TestScanEndpointErrorResponses:
     """Tests for structured error response format."""
     
@@ -152,3 +248,272 @@ class TestScanEndpointErrorResponses:
         )
         data = response.json()
         assert data["error_code"] in valid_error_codes
+
+
+class TestReportPdfCaching:
+    """Integration tests for /scan/{id}/report.pdf caching."""
+    
+    def test_pdf_is_rendered_once_and_revalidated_by_etag(self, client, completed_scan):
+        """
+        Repeat downloads are served from memory; a matching ETag gets 304.
+        """
+        scan = completed_scan("pdf-cache")
+        
+        # Mocks cannot be sent to worker processes; render in a thread
+        with patch("app.routes.store.get_scan_result_raw", side_effect=stored_row(scan)), \
+             patch("app.routes.settings.REPORT_RENDER_WORKERS", 0), \
+             patch("app.routes.generate_pdf", return_value=b"%PDF-test") as mock_pdf:
+            first = client.get("/scan/pdf-cache/report.pdf")
+            second = client.get("/scan/pdf-cache/report.pdf")
+            revalidated = client.get(
+                "/scan/pdf-cache/report.pdf",
+                headers={"If-None-Match": first.headers["etag"]}
+            )
+        
+        assert first.status_code == 200 and second.content == b"%PDF-test"
+        assert mock_pdf.call_count == 1
+        assert revalidated.status_code == 304
+    
+    def test_pdf_renders_in_worker_process(self, client, completed_scan):
+        """
+        With render workers enabled the real PDF is built in a separate process.
+        """
+        from app import routes
+        scan = completed_scan("pdf-worker")
+        
+        try:
+            with patch("app.routes.store.get_scan_result_raw", side_effect=stored_row(scan)), \
+                 patch("app.routes.settings.REPORT_RENDER_WORKERS", 1):
+                response = client.get("/scan/pdf-worker/report.pdf")
+            assert response.status_code == 200
+            assert response.content.startswith(b"%PDF")
+            assert routes._render_pool is not None
+        finally:
+            routes.shutdown_render_pool()
+
+
+class TestScanListing:
+    """Integration tests for the /scans listing."""
+    
+    def test_findings_count_is_computed_without_loading_results(self, client, created_scans):
+        """
+        GET /scans reports the number of findings stored in result_json.
+        """
+        from app import store
+        from app.models import Scan
+        from sqlmodel import Session
+        
+        scan = store.create_scan("https://listing.example.com")
+        created_scans.add(scan.id)
+        with Session(store.engine) as session:
+            row = session.get(Scan, scan.id)
+            row.result_json = {"findings": [{"title": "a"}, {"title": "b"}]}
+            session.add(row)
+            session.commit()
+        
+        response = client.get("/scans", params={"limit": 500})
+        listed = {item["scan_id"]: item for item in response.json()}
+        assert listed[scan.id]["findings_count"] == 2
+
+
+class TestBatchScan:
+    """Integration tests for POST /scan/batch."""
+    
+    @patch('app.routes.run_scan_batch')
+    def test_batch_starts_valid_targets_and_reports_rejected(self, mock_scan_batch, client, created_scans):
+        """
+        Valid entries get a scan_id and a task; invalid ones carry their policy error.
+        """
+        response = client.post("/scan/batch", json=[
+            {"target": "https://a.example.com", "authorized": True},
+            {"target": "ftp://b.example.com", "authorized": True},
+            {"target": "https://c.example.com", "authorized": False},
+            {"target": "https://d.example.com", "authorized": True},
+        ])
+        
+        assert response.status_code == 200
+        items = response.json()
+        created_scans.update(item["scan_id"] for item in items if item["scan_id"])
+        
+        assert [item["allowed"] for item in items] == [True, False, False, True]
+        assert items[1]["error_code"] == "UNSUPPORTED_SCHEME"
+        assert items[2]["error_code"] == "MISSING_ACKNOWLEDGEMENT"
+        assert items[1]["scan_id"] is None
+        
+        mock_scan_batch.assert_called_once_with([
+            (items[0]["scan_id"], "https://a.example.com"),
+            (items[3]["scan_id"], "https://d.example.com"),
+        ])
+    
+    @patch('app.routes.run_scan_task')
+    @patch('app.routes.run_scan_batch')
+    def test_single_scan_after_batch_shares_batch_scan(self, mock_scan_batch, mock_scan_task, client, created_scans):
+        """
+        A target queued by a batch is in flight as soon as the batch responds.
+        """
+        body = {"target": "https://batched.example.com", "authorized": True}
+        batch_id = client.post("/scan/batch", json=[body]).json()[0]["scan_id"]
+        single = client.post("/scan", json=body).json()
+        created_scans.update((batch_id, single["scan_id"]))
+        
+        assert single == {"scan_id": batch_id}
+        mock_scan_task.assert_not_called()
+    
+    @patch('app.routes.run_scan_batch')
+    def test_batch_reuses_in_flight_and_repeated_targets(self, mock_scan_batch, client, created_scans):
+        """
+        A target already scanning keeps its scan; a repeated target gets one scan.
+        """
+        with patch.dict("app.routes._inflight_scans", {"https://busy.example.com": "busy-scan"}):
+            response = client.post("/scan/batch", json=[
+                {"target": "https://busy.example.com", "authorized": True},
+                {"target": "https://twice.example.com", "authorized": True},
+                {"target": "https://twice.example.com", "authorized": True},
+            ])
+        
+        items = response.json()
+        created_scans.update(item["scan_id"] for item in items[1:])
+        
+        assert items[0]["scan_id"] == "busy-scan"
+        assert items[1]["scan_id"] == items[2]["scan_id"]
+        mock_scan_batch.assert_called_once_with([(items[1]["scan_id"], "https://twice.example.com")])
+    
+    def test_oversized_batch_returns_400(self, client):
+        from app.routes import MAX_BATCH_SIZE
+        
+        target = {"target": "https://example.com", "authorized": True}
+        response = client.post("/scan/batch", json=[target] * (MAX_BATCH_SIZE + 1))
+        
+        assert response.status_code == 400
+        assert response.json()["error_code"] == "INVALID_BATCH"
+    
+    @pytest.mark.asyncio
+    async def test_run_scan_batch_runs_scans_concurrently(self):
+        import asyncio
+        from app import routes
+        
+        running = []
+        both_started = asyncio.Event()
+        
+        async def fake_scan(scan_id, target):
+            running.append(scan_id)
+            if len(running) == 2:
+                both_started.set()
+            await asyncio.wait_for(both_started.wait(), timeout=1)
+        
+        with patch("app.routes.run_scan_task", side_effect=fake_scan):
+            await routes.run_scan_batch([("1", "https://a.example.com"), ("2", "https://b.example.com")])
+        
+        assert running == ["1", "2"]
+
+
+class TestReportMarkdownCaching:
+    """Integration tests for /scan/{id}/report.md caching."""
+    
+    def test_markdown_is_rendered_once_per_result_version(self, client, completed_scan):
+        """
+        The stored result is parsed and rendered once until it changes.
+        """
+        scan = completed_scan("md-cache")
+        
+        with patch("app.routes.store.get_scan_result_raw", side_effect=stored_row(scan)), \
+             patch("app.routes.generate_markdown", return_value="# Report") as mock_md:
+            client.get("/scan/md-cache/report.md")
+            second = client.get("/scan/md-cache/report.md")
+            scan.result_json = {**scan.result_json, "score": 80}
+            client.get("/scan/md-cache/report.md")
+        
+        assert second.text == "# Report"
+        assert mock_md.call_count == 2
+        assert mock_md.call_args.args[0].score == 80
+    
+    def test_json_and_markdown_reports_revalidate_by_etag(self, client, completed_scan):
+        """
+        report.json and report.md answer a matching If-None-Match with 304.
+        """
+        scan = completed_scan("etag")
+        
+        with patch("app.routes.store.get_scan_result_raw", side_effect=stored_row(scan)), \
+             patch("app.routes.generate_markdown", return_value="# Report"):
+            for path in ("/scan/etag/report.json", "/scan/etag/report.md"):
+                first = client.get(path)
+                assert first.headers["cache-control"] == "private, no-cache"
+                revalidated = client.get(path, headers={"If-None-Match": first.headers["etag"]})
+                assert revalidated.status_code == 304
+    
+    def test_json_report_is_the_stored_document(self, client, created_scans):
+        """
+        report.json sends the stored text with the same ETag as GET /scan/{id}.
+        """
+        from app import store
+        from app.models import Scan
+        from sqlmodel import Session
+        
+        scan = store.create_scan("https://report.example.com")
+        created_scans.add(scan.id)
+        assert client.get(f"/scan/{scan.id}/report.json").status_code == 400
+        
+        with Session(store.engine) as session:
+            row = session.get(Scan, scan.id)
+            row.status = "completed"
+            row.result_json = {"score": 90, "target": "https://report.example.com"}
+            session.add(row)
+            session.commit()
+        
+        report = client.get(f"/scan/{scan.id}/report.json")
+        assert report.content == client.get(f"/scan/{scan.id}").content
+        assert report.headers["etag"] == client.get(f"/scan/{scan.id}").headers["etag"]
+        assert client.get("/scan/missing-scan/report.json").status_code == 404
+
+
+class TestAiDebugView:
+    """Integration tests for /scan/{id}/ai-debug."""
+    
+    def test_top_level_fields_override_debug_info(self, client, completed_scan):
+        """
+        The AI input merges debug_info with the top-level result fields.
+        """
+        scan = completed_scan(
+            "ai-debug", grade="B", score=75,
+            debug_info={"grade": "stale", "headers": {"server": "nginx"}},
+        )
+        
+        with patch("app.routes.store.get_scan", return_value=scan), \
+             patch("app.routes.build_ai_scan_view", side_effect=lambda ai_input: ai_input):
+            response = client.get("/scan/ai-debug/ai-debug")
+        
+        ai_view = response.json()["ai_view"]
+        assert ai_view["grade"] == "B"
+        assert ai_view["headers"] == {"server": "nginx"}
+        assert scan.result_json["debug_info"]["grade"] == "stale"
+
+
+class TestScanResult:
+    """Integration tests for GET /scan/{id}."""
+    
+    def test_completed_result_is_returned_as_stored(self, client, created_scans):
+        """
+        The stored result document is returned without re-encoding.
+        """
+        from app import store
+        from app.models import Scan
+        from sqlmodel import Session
+        
+        scan = store.create_scan("https://result.example.com")
+        created_scans.add(scan.id)
+        assert client.get(f"/scan/{scan.id}").json() == {"status": "queued"}
+        
+        with Session(store.engine) as session:
+            row = session.get(Scan, scan.id)
+            row.status = "completed"
+            row.result_json = {"score": 90, "target": "https://result.example.com"}
+            session.add(row)
+            session.commit()
+        
+        response = client.get(f"/scan/{scan.id}")
+        assert response.status_code == 200
+        assert response.json() == {"score": 90, "target": "https://result.example.com"}
+        assert client.get("/scan/missing-scan").status_code == 404
+        
+        revalidated = client.get(f"/scan/{scan.id}", headers={"If-None-Match": response.headers["etag"]})
+        assert revalidated.status_code == 304 and revalidated.content == b""
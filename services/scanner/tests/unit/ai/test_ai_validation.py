@@ -11,7 +11,8 @@ These tests verify:
 
 import pytest
 from app.ai.models import AIReport, AIKeyVulnerability, AIGlobalScore, AISiteMap, AIInfrastructure
-from app.ai.validation import validate_ai_report, FALLBACK_REPORT
+from unittest.mock import patch
+from app.ai.validation import validate_ai_report, clear_validation_cache, FALLBACK_REPORT
 from pydantic import ValidationError
 
 
@@ -107,6 +108,28 @@ class TestAIReportValidation:
         assert is_valid is False
         assert "indisponible" in result["executive_summary"]
     
+    def test_error_type_distinguishes_bad_json_from_bad_schema(self, caplog):
+        """Broken JSON and schema violations are logged under different error types."""
+        validate_ai_report('{"global_score": }', scan_id="test-004b")
+        validate_ai_report('{"global_score": {"letter": "A", "numeric": 90}}', scan_id="test-004c")
+        
+        messages = [r.getMessage() for r in caplog.records]
+        assert any("test-004b" in m and "JSON_PARSE_ERROR" in m for m in messages)
+        assert any("test-004c" in m and "SCHEMA_VALIDATION_ERROR" in m for m in messages)
+    
+    def test_repeated_text_is_served_from_cache(self):
+        """The same raw text is validated once; callers still get independent dicts."""
+        raw = '{"global_score": {"letter": "B", "numeric": 80}, "overall_risk_level": "faible", "executive_summary": "Bon niveau de sécurité global."}'
+        clear_validation_cache()
+        first, _ = validate_ai_report(raw, scan_id="test-cache", model_name="m1")
+        
+        with patch.object(AIReport, "model_validate_json", side_effect=AssertionError("revalidated")):
+            second, is_valid = validate_ai_report(raw, scan_id="test-cache", model_name="m2")
+        
+        assert is_valid is True
+        assert first["model_name"] == "m1" and second["model_name"] == "m2"
+        assert first["global_score"] is not second["global_score"]
+    
     def test_markdown_wrapped_json_parses_correctly(self):
         """JSON wrapped in markdown code blocks should still parse."""
         wrapped_json = '''
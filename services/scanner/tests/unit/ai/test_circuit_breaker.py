@@ -0,0 +1,62 @@
+"""
+Circuit Breaker Unit Tests
+==========================
+Tests for the per-provider AI circuit breaker.
+"""
+
+import pytest
+
+from app.ai.circuit_breaker import AsyncCircuitBreaker, CircuitOpenError, CircuitState
+
+
+async def _ok_stream():
+    yield "ok"
+
+
+async def _failing_stream():
+    raise RuntimeError("provider down")
+    yield  # pragma: no cover
+
+
+async def _consume(stream):
+    return [chunk async for chunk in stream]
+
+
+@pytest.mark.asyncio
+async def test_opens_after_threshold_and_fails_fast():
+    breaker = AsyncCircuitBreaker("test", failure_threshold=2, cooldown=60.0)
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await _consume(await breaker.guard_stream(_failing_stream()))
+
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.is_open()
+    with pytest.raises(CircuitOpenError):
+        await breaker.guard_stream(_ok_stream())
+
+
+@pytest.mark.asyncio
+async def test_half_open_probe_closes_on_success():
+    breaker = AsyncCircuitBreaker("test", failure_threshold=1, cooldown=0.0)
+
+    with pytest.raises(RuntimeError):
+        await _consume(await breaker.guard_stream(_failing_stream()))
+    assert breaker.state == CircuitState.OPEN
+
+    chunks = await _consume(await breaker.guard_stream(_ok_stream()))
+
+    assert chunks == ["ok"]
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.failure_count == 0
+
+
+@pytest.mark.asyncio
+async def test_half_open_allows_single_probe():
+    breaker = AsyncCircuitBreaker("test", failure_threshold=1, cooldown=0.0)
+    with pytest.raises(RuntimeError):
+        await breaker.call(_failing_stream().__anext__)
+
+    await breaker.acquire()  # probe in flight
+    with pytest.raises(CircuitOpenError):
+        await breaker.acquire()
@@ -0,0 +1,188 @@
+"""
+AI Client Unit Tests
+====================
+Tests for provider HTTP clients (no real network access).
+"""
+
+import httpx
+import orjson
+import pytest
+
+from app.ai.clients import OllamaClient, GroqClient, LatencyTracker, build_chat_body, iter_ndjson_lines
+from app.ai.response_cache import RESPONSE_CACHE, ResponseCache
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    RESPONSE_CACHE.clear()
+    yield
+    RESPONSE_CACHE.clear()
+
+
+@pytest.mark.asyncio
+async def test_ollama_availability_is_cached(httpx_mock):
+    """A second probe within the TTL must not hit the network."""
+    httpx_mock.add_response(url="http://ollama.test/api/tags", status_code=200)
+    client = OllamaClient(model="m", base_url="http://ollama.test")
+
+    assert await client.is_available_async() is True
+    assert await client.is_available_async() is True
+    assert len(httpx_mock.get_requests()) == 1
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_ollama_chat_streams_ndjson(httpx_mock):
+    body = (
+        b'{"message": {"content": "Hel"}, "done": false}\n'
+        b'{"message": {"content": "lo"}, "done": false}\n'
+        b'{"message": {"content": ""}, "done": true}\n'
+    )
+    httpx_mock.add_response(url="http://ollama.test/api/chat", content=body)
+    client = OllamaClient(model="m", base_url="http://ollama.test")
+
+    chunks = [chunk async for chunk in client.chat("sys", "user")]
+
+    assert "".join(chunks) == "Hello"
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_groq_chat_streams_sse(httpx_mock):
+    body = (
+        b'data: {"choices": [{"delta": {"content": "Hel"}}]}\n\n'
+        b'data: {"choices": [{"delta": {"content": "lo"}}]}\n\n'
+        b'data: [DONE]\n\n'
+    )
+    httpx_mock.add_response(url="https://api.groq.com/openai/v1/chat/completions", content=body)
+    client = GroqClient(model="m", api_key="key")
+
+    chunks = [chunk async for chunk in client.chat("sys", "user")]
+
+    assert "".join(chunks) == "Hello"
+    await client.aclose()
+
+
+def test_latency_tracker_adapts_read_timeout():
+    tracker = LatencyTracker()
+    assert tracker.timeout(120.0).read == 120.0  # warming up
+
+    for _ in range(LatencyTracker.MIN_SAMPLES):
+        tracker.record(10.0)
+
+    timeout = tracker.timeout(120.0)
+    assert timeout.read == pytest.approx(15.0)
+    assert timeout.connect == 2.0
+
+
+@pytest.mark.asyncio
+async def test_chat_holds_bulkhead_slot_until_stream_ends(httpx_mock):
+    httpx_mock.add_response(
+        url="http://ollama.test/api/chat",
+        content=b'{"message": {"content": "a"}, "done": false}\n{"done": true}\n',
+    )
+    client = OllamaClient(model="m", base_url="http://ollama.test", max_inflight=1)
+
+    stream = client.chat("sys", "user")
+    assert await stream.__anext__() == "a"
+    assert client.get_metrics()["inflight"] == 1
+    assert client._sem.locked()
+
+    await stream.aclose()
+    assert client.get_metrics()["inflight"] == 0
+    assert not client._sem.locked()
+    await client.aclose()
+
+
+def test_build_chat_body_is_valid_json():
+    body = build_chat_body("m", 'sys "quoted"', "user\nprompt")
+
+    assert orjson.loads(body) == {
+        "model": "m",
+        "messages": [
+            {"role": "system", "content": 'sys "quoted"'},
+            {"role": "user", "content": "user\nprompt"},
+        ],
+        "stream": True,
+    }
+    assert orjson.loads(build_chat_body("m", "s", "u", stream=False, keep_alive="30m"))["keep_alive"] == "30m"
+
+
+@pytest.mark.asyncio
+async def test_iter_ndjson_lines_handles_split_and_packed_records():
+    async def _chunks():
+        for chunk in (b'{"a": 1}\n{"b"', b': 2}\n\n{"c": 3}\n{"d', b'": 4}'):
+            yield chunk
+
+    lines = [line async for line in iter_ndjson_lines(_chunks())]
+
+    assert lines == [b'{"a": 1}', b'{"b": 2}', b'{"c": 3}', b'{"d": 4}']
+
+
+@pytest.mark.asyncio
+async def test_groq_chat_nonstream_returns_full_content(httpx_mock):
+    httpx_mock.add_response(
+        url="https://api.groq.com/openai/v1/chat/completions",
+        json={"choices": [{"message": {"content": "Hello"}}]},
+    )
+    client = GroqClient(model="m", api_key="key")
+
+    assert await client.chat_nonstream("sys", "user") == "Hello"
+    assert orjson.loads(httpx_mock.get_requests()[0].content)["stream"] is False
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_repeated_chat_is_served_from_cache(httpx_mock):
+    body = b'{"message": {"content": "Hello"}, "done": true}\n'
+    httpx_mock.add_response(url="http://ollama.test/api/chat", content=body)
+    client = OllamaClient(model="m", base_url="http://ollama.test")
+
+    first = [chunk async for chunk in client.chat("sys", "user")]
+    second = [chunk async for chunk in client.chat("sys", "user")]
+
+    assert first == second == ["Hello"]
+    assert len(httpx_mock.get_requests()) == 1
+    assert RESPONSE_CACHE.stats()["hits"] == 1
+    await client.aclose()
+
+
+def test_response_cache_evicts_oldest_and_expires():
+    cache = ResponseCache(max_entries=2, ttl=60)
+    for key in ("a", "b", "c"):
+        cache.set(key, key.upper())
+
+    assert cache.get("a") is None
+    assert cache.get("c") == "C"
+
+    cache.ttl = 0
+    assert cache.get("c") is None
+
+
+@pytest.mark.asyncio
+async def test_ollama_retries_server_errors_but_not_client_errors(httpx_mock, monkeypatch):
+    monkeypatch.setattr("app.ai.clients.retry_delay", lambda attempt: 0)
+    httpx_mock.add_response(url="http://ollama.test/api/chat", status_code=503)
+    httpx_mock.add_response(url="http://ollama.test/api/chat", content=b'{"message": {"content": "ok"}, "done": true}\n')
+    client = OllamaClient(model="m", base_url="http://ollama.test")
+
+    assert [chunk async for chunk in client.chat("sys", "retry")] == ["ok"]
+
+    httpx_mock.add_response(url="http://ollama.test/api/chat", status_code=404)
+    with pytest.raises(httpx.HTTPStatusError):
+        [chunk async for chunk in client.chat("sys", "missing model")]
+    assert len(httpx_mock.get_requests()) == 3
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_chat_batch_returns_results_in_prompt_order(httpx_mock):
+    def reply(request):
+        prompt = orjson.loads(request.content)["messages"][1]["content"]
+        return httpx.Response(200, json={"message": {"content": prompt.upper()}})
+
+    httpx_mock.add_callback(reply, url="http://ollama.test/api/chat", is_reusable=True)
+    client = OllamaClient(model="m", base_url="http://ollama.test")
+
+    assert await client.chat_batch("sys", ["a", "b", "c"]) == ["A", "B", "C"]
+    await client.aclose()
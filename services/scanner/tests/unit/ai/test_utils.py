@@ -0,0 +1,30 @@
+"""
+AI Utils Unit Tests
+===================
+Tests for extracting JSON from raw AI responses.
+"""
+
+import pytest
+
+from app.ai.utils import parse_ai_json
+
+
+def test_parses_fenced_json_with_surrounding_text():
+    text = 'Here is the report:\n```json\n{"a": {"b": 1}}\n```\nHope this helps.'
+    assert parse_ai_json(text) == {"a": {"b": 1}}
+
+
+def test_parses_bare_fence_and_plain_json():
+    assert parse_ai_json('```\n{"a": 1}\n```') == {"a": 1}
+    assert parse_ai_json('Sure! {"a": 1} Done.') == {"a": 1}
+
+
+def test_invalid_json_raises_value_error():
+    with pytest.raises(ValueError):
+        parse_ai_json('```json\n{"a": }\n```')
+    with pytest.raises(ValueError):
+        parse_ai_json("no json here")
+
+
+def test_accepts_utf8_bytes():
+    assert parse_ai_json('```json\n{"résumé": "élevé"}\n```'.encode("utf-8")) == {"résumé": "élevé"}
@@ -9,6 +9,18 @@ from unittest.mock import MagicMock, patch, AsyncMock
 from app.ai.analyzer import AiAnalyzer
 
 
+def _stream(*chunks):
+    """Builds a fake provider chat() that streams the given chunks."""
+    async def _gen(*args, **kwargs):
+        for chunk in chunks:
+            yield chunk
+    return MagicMock(side_effect=_gen)
+
+
+async def _collect(stream):
+    return "".join([chunk async for chunk in stream])
+
+
 @pytest.fixture
 def mock_ollama():
     with patch("app.ai.analyzer.OllamaClient") as mock:
@@ -28,18 +40,19 @@ def test_analyzer_initialization(mock_ollama, mock_groq):
     assert analyzer.groq_client is not None
 
 
-def test_get_status(mock_ollama, mock_groq):
+@pytest.mark.asyncio
+async def test_get_status(mock_ollama, mock_groq):
     """Verify status reporting for all providers."""
-    mock_ollama.return_value.is_available.return_value = True
+    mock_ollama.return_value.is_available_async = AsyncMock(return_value=True)
     mock_ollama.return_value.model = "gpt-oss:20b"
     mock_ollama.return_value.base_url = "http://localhost:11434"
     
-    mock_groq.return_value.is_available.return_value = True
+    mock_groq.return_value.is_available_async = AsyncMock(return_value=True)
     mock_groq.return_value.model = "llama-3.3-70b-versatile"
     mock_groq.return_value.api_key = "test-key"
     
     analyzer = AiAnalyzer()
-    status = analyzer.get_status()
+    status = await analyzer.get_status()
     
     assert status["ollama"]["available"] == True
     assert status["groq"]["available"] == True
@@ -48,10 +61,10 @@ def test_get_status(mock_ollama, mock_groq):
 @pytest.mark.asyncio
 async def test_analyze_explicit_ollama(mock_ollama, mock_groq):
     """Verify explicit provider selection (Ollama)."""
-    mock_ollama.return_value.chat = AsyncMock(return_value="Ollama Response")
+    mock_ollama.return_value.chat = _stream("Ollama ", "Response")
     
     analyzer = AiAnalyzer()
-    response = await (await analyzer.analyze("sys", "user", provider="ollama"))
+    response = await _collect(await analyzer.analyze("sys", "user", provider="ollama"))
     
     assert response == "Ollama Response"
     mock_ollama.return_value.chat.assert_called_once()
@@ -61,10 +74,10 @@ async def test_analyze_explicit_ollama(mock_ollama, mock_groq):
 @pytest.mark.asyncio
 async def test_analyze_explicit_groq(mock_ollama, mock_groq):
     """Verify explicit provider selection (Groq)."""
-    mock_groq.return_value.chat = AsyncMock(return_value="Groq Response")
+    mock_groq.return_value.chat = _stream("Groq ", "Response")
     
     analyzer = AiAnalyzer()
-    response = await (await analyzer.analyze("sys", "user", provider="groq"))
+    response = await _collect(await analyzer.analyze("sys", "user", provider="groq"))
     
     assert response == "Groq Response"
     mock_groq.return_value.chat.assert_called_once()
@@ -74,12 +87,12 @@ async def test_analyze_explicit_groq(mock_ollama, mock_groq):
 @pytest.mark.asyncio
 async def test_analyze_fallback_to_groq(mock_ollama, mock_groq):
     """Verify fallback to Groq when Ollama is unavailable."""
-    mock_ollama.return_value.is_available.return_value = False
-    mock_groq.return_value.is_available.return_value = True
-    mock_groq.return_value.chat = AsyncMock(return_value="Groq Response")
+    mock_ollama.return_value.is_available_async = AsyncMock(return_value=False)
+    mock_groq.return_value.is_available_async = AsyncMock(return_value=True)
+    mock_groq.return_value.chat = _stream("Groq ", "Response")
     
     analyzer = AiAnalyzer()
-    response = await (await analyzer.analyze("sys", "user"))
+    response = await _collect(await analyzer.analyze("sys", "user"))
     
     assert response == "Groq Response"
     mock_groq.return_value.chat.assert_called_once()
@@ -88,10 +101,65 @@ async def test_analyze_fallback_to_groq(mock_ollama, mock_groq):
 @pytest.mark.asyncio
 async def test_analyze_no_provider_raises(mock_ollama, mock_groq):
     """Verify ValueError when no provider is available."""
-    mock_ollama.return_value.is_available.return_value = False
-    mock_groq.return_value.is_available.return_value = False
+    mock_ollama.return_value.is_available_async = AsyncMock(return_value=False)
+    mock_groq.return_value.is_available_async = AsyncMock(return_value=False)
     
     analyzer = AiAnalyzer()
     
     with pytest.raises(ValueError, match="No AI provider available"):
         await analyzer.analyze("sys", "user")
+
+
+@pytest.mark.asyncio
+async def test_analyze_skips_provider_with_open_circuit(mock_ollama, mock_groq):
+    """Verify auto-selection skips a provider whose circuit is open."""
+    mock_ollama.return_value.is_available_async = AsyncMock(return_value=True)
+    mock_groq.return_value.is_available_async = AsyncMock(return_value=True)
+    mock_groq.return_value.chat = _stream("Groq ", "Response")
+
+    analyzer = AiAnalyzer()
+    analyzer.breakers["ollama"].is_open = MagicMock(return_value=True)
+    response = await _collect(await analyzer.analyze("sys", "user"))
+
+    assert response == "Groq Response"
+    mock_ollama.return_value.chat.assert_not_called()
+    assert "groq" in analyzer._latency
+
+
+@pytest.mark.asyncio
+async def test_analyze_batch_returns_results_in_order(mock_ollama, mock_groq):
+    """Verify batch analysis drains each stream and keeps item order."""
+    async def _echo(system_prompt, user_prompt):
+        return f"{system_prompt}:{user_prompt}"
+    mock_groq.return_value.chat_nonstream = AsyncMock(side_effect=_echo)
+
+    analyzer = AiAnalyzer()
+    results = await analyzer.analyze_batch([("s1", "u1"), ("s2", "u2")], provider="groq", max_concurrency=1)
+
+    assert results == ["s1:u1", "s2:u2"]
+
+
+@pytest.mark.asyncio
+async def test_analyze_race_keeps_first_provider_to_stream(mock_ollama, mock_groq):
+    """Verify the fastest provider wins and the slower stream is closed."""
+    import asyncio
+
+    closed = []
+
+    async def _slow(*args):
+        try:
+            await asyncio.sleep(10)
+            yield "Ollama"
+        finally:
+            closed.append("ollama")
+
+    mock_ollama.return_value.is_available_async = AsyncMock(return_value=True)
+    mock_ollama.return_value.chat = MagicMock(side_effect=_slow)
+    mock_groq.return_value.is_available_async = AsyncMock(return_value=True)
+    mock_groq.return_value.chat = _stream("Groq ", "Response")
+
+    analyzer = AiAnalyzer()
+    response = await _collect(await analyzer.analyze_race("sys", "user"))
+
+    assert response == "Groq Response"
+    assert closed == ["ollama"]
@@ -0,0 +1,108 @@
+import asyncio
+import httpx
+import pytest
+from unittest.mock import patch
+from app.scanner.cors_checks import check_cors
+from app.constants import Severity
+
+class ReflectingClient:
+    """Fake HttpClient that reflects Origin and records concurrent requests"""
+    def __init__(self):
+        self.inflight = 0
+        self.peak = 0
+
+    async def get(self, url, headers=None):
+        self.inflight += 1
+        self.peak = max(self.peak, self.inflight)
+        await asyncio.sleep(0.01)
+        self.inflight -= 1
+        return httpx.Response(200, headers={
+            "Access-Control-Allow-Origin": headers["Origin"],
+            "Access-Control-Allow-Credentials": "true",
+        })
+
+    async def options(self, url, headers=None):
+        return await self.get(url, headers=headers)
+
+@pytest.mark.asyncio
+async def test_cors_probes_run_concurrently_and_keep_order():
+    """All active probes are in flight together; results keep evil-then-null order"""
+    client = ReflectingClient()
+    findings, cors_info = await check_cors("https://example.com", {}, client, None)
+
+    assert client.peak == 3
+    assert [p["sent_origin"] for p in cors_info["probes"]] == ["https://evil.example.com", "null"]
+    assert [f.title for f in findings] == [
+        "Dangerous CORS: Origin Reflection with Credentials",
+        "Dangerous CORS: Null Origin with Credentials",
+    ]
+    # Reflection was already reported from the GET probe
+    assert cors_info["preflight"]["received_origin"] == "https://evil.example.com"
+
+class PreflightOnlyClient:
+    """Fake HttpClient whose server only answers CORS on OPTIONS"""
+    async def get(self, url, headers=None):
+        return httpx.Response(200)
+
+    async def options(self, url, headers=None):
+        assert headers["Access-Control-Request-Method"] == "GET"
+        return httpx.Response(204, headers={
+            "Access-Control-Allow-Origin": headers["Origin"],
+            "Access-Control-Allow-Methods": "GET, POST",
+            "Access-Control-Max-Age": "600",
+        })
+
+@pytest.mark.asyncio
+async def test_cors_preflight_reflection_is_reported():
+    findings, cors_info = await check_cors("https://example.com", {}, PreflightOnlyClient(), None)
+
+    assert [f.title for f in findings] == ["CORS Misconfiguration: Preflight Accepts Arbitrary Origin"]
+    assert findings[0].repro_curl.startswith("curl -X OPTIONS")
+    assert cors_info["preflight"]["allow_methods"] == "GET, POST"
+    assert cors_info["preflight"]["max_age"] == "600"
+
+@pytest.mark.asyncio
+async def test_cors_preflight_failure_does_not_fail_check():
+    class Client(PreflightOnlyClient):
+        async def options(self, url, headers=None):
+            raise httpx.ConnectError("refused")
+
+    findings, cors_info = await check_cors("https://example.com", {}, Client(), None)
+
+    assert findings == []
+    assert "preflight" not in cors_info
+    assert cors_info["notes"] == ["Active: Preflight failed (ConnectError)."]
+
+@pytest.mark.asyncio
+async def test_cors_passive_wildcard_findings_use_templates():
+    headers = {"Access-Control-Allow-Origin": "*"}
+    findings, _ = await check_cors("https://example.com", headers, PreflightOnlyClient(), None)
+    public = findings[0]
+    assert public.title == "Permissive CORS: Wildcard Origin"
+    assert public.severity == Severity.INFO
+    assert public.description.endswith("likely a public API or static content. Risk is low.")
+
+    findings, _ = await check_cors("https://example.com", headers, PreflightOnlyClient(), None, cookies_present=True)
+    assert findings[0].severity == Severity.LOW
+    assert findings[0].description.endswith("risky for internal services.")
+
+@pytest.mark.asyncio
+async def test_cors_fail_fast_cancels_remaining_probes():
+    """With CORS_FAIL_FAST, reflection with credentials skips the other probes"""
+    class SlowFollowUpClient(ReflectingClient):
+        async def get(self, url, headers=None):
+            if headers["Origin"] == "null":
+                await asyncio.sleep(10)
+            return await super().get(url, headers=headers)
+
+        async def options(self, url, headers=None):
+            await asyncio.sleep(10)
+
+    with patch("app.scanner.cors_checks.settings.CORS_FAIL_FAST", True):
+        findings, cors_info = await asyncio.wait_for(
+            check_cors("https://example.com", {}, SlowFollowUpClient(), None), timeout=1
+        )
+
+    assert [f.title for f in findings] == ["Dangerous CORS: Origin Reflection with Credentials"]
+    assert [p["sent_origin"] for p in cors_info["probes"]] == ["https://evil.example.com"]
+    assert "Active: Remaining probes skipped after reflection with credentials." in cors_info["notes"]
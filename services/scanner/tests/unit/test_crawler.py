@@ -1,6 +1,12 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
-from app.scanner.crawler import SimpleCrawler, LinkParser
+from app.scanner.crawler import SimpleCrawler, LinkParser, extract_links, clear_robots_cache, parse_robots
+
+@pytest.fixture(autouse=True)
+def empty_robots_cache():
+    clear_robots_cache()
+    yield
+    clear_robots_cache()
 
 def test_link_parser():
     """Verify LinkParser extracts links correctly"""
@@ -21,6 +27,42 @@ def test_link_parser():
     assert "/script.js" in parser.links
     assert "http://external.com" in parser.links
 
+def test_extract_links_matches_link_parser():
+    """Verify extract_links returns the same links as LinkParser"""
+    html = """
+    <html><head><link href="/style.css"></head>
+    <body>
+        <a href="/page1?a=1&amp;b=2">Page 1</a>
+        <a>No href</a>
+        <iframe src="/frame"></iframe>
+        <div href="/ignored"></div>
+    </body></html>
+    """
+    parser = LinkParser()
+    parser.feed(html)
+
+    assert extract_links(html) == parser.links == {"/style.css", "/page1?a=1&b=2", "/frame"}
+    assert extract_links("") == set()
+
+def test_extract_links_without_lxml_matches_link_parser():
+    """Verify the regex fallback used without lxml agrees with LinkParser"""
+    html = """
+    <html><head><link rel=stylesheet href=/style.css><script src='/app.js'></script></head>
+    <body>
+        <a href="/page1?a=1&amp;b=2">Page 1</a>
+        <a class="x" data-href="/not-a-link">No href</a>
+        <abbr href="/ignored"></abbr>
+        <IMG SRC="/logo.png"/><iframe src="/frame" ></iframe>
+    </body></html>
+    """
+    parser = LinkParser()
+    parser.feed(html)
+
+    with patch("app.scanner.crawler.lxml_html", None):
+        assert extract_links(html) == parser.links == {
+            "/style.css", "/app.js", "/page1?a=1&b=2", "/logo.png", "/frame"
+        }
+
 @pytest.mark.asyncio
 async def test_crawler_generator():
     """Verify crawler generator yields assets"""
@@ -100,3 +142,135 @@ async def test_crawler_robots_txt():
         print(f"DEBUG: Assets found: {[a['url'] for a in assets]}")
         assert len(assets) == 1
         assert assets[0]["url"] == "http://example.com/public"
+
+@pytest.mark.asyncio
+async def test_crawler_probes_candidates_concurrently_in_sorted_order():
+    """Verify candidate probes overlap but assets keep sorted order"""
+    import asyncio
+    inflight = 0
+    peak = 0
+    
+    async def head(url):
+        nonlocal inflight, peak
+        inflight += 1
+        peak = max(peak, inflight)
+        # Later URLs answer first
+        await asyncio.sleep(0.03 if url.endswith("a") else 0.01)
+        inflight -= 1
+        return MagicMock(status_code=200, headers={"Content-Type": "text/html"})
+    
+    mock_client = AsyncMock()
+    mock_client.head.side_effect = head
+    crawler = SimpleCrawler(mock_client)
+    
+    initial_html = '<a href="/c">C</a><a href="/a">A</a><a href="/b">B</a>'
+    assets = [asset async for asset in crawler.crawl_generator("http://example.com", initial_html)]
+    
+    assert [asset["url"] for asset in assets] == [
+        "http://example.com/a", "http://example.com/b", "http://example.com/c"
+    ]
+    assert peak == 3
+
+@pytest.mark.asyncio
+async def test_robots_txt_is_fetched_once_per_origin():
+    """Verify a second crawl of the same origin reuses the cached robots.txt"""
+    mock_robots = MagicMock(status_code=200, text="Disallow: /private\nDisallow: /admin")
+    mock_client = AsyncMock()
+    mock_client.get.return_value = mock_robots
+    mock_client.head.return_value = MagicMock(status_code=200, headers={})
+    
+    initial_html = '<a href="/admin/x">A</a><a href="/private">P</a><a href="/open">O</a>'
+    with patch("app.config.settings.RESPECT_ROBOTS", True):
+        for _ in range(2):
+            crawler = SimpleCrawler(mock_client)
+            assets = [asset async for asset in crawler.crawl_generator("http://example.com", initial_html)]
+            assert [asset["url"] for asset in assets] == ["http://example.com/open"]
+    
+    assert mock_client.get.call_count == 1
+
+def test_scope_predicate_modes():
+    """Verify each CRAWL_SCOPE mode builds the matching in-scope test"""
+    from urllib.parse import urlparse
+    crawler = SimpleCrawler(AsyncMock())
+    start_url = "http://example.com/app/"
+    start_parsed = urlparse(start_url)
+    urls = ["http://example.com/app/x", "http://example.com/other", "http://api.example.com/app/x", "http://evil.com/app/x"]
+    
+    def allowed(scope):
+        in_scope = crawler._make_scope_predicate(scope, start_url, start_parsed)
+        return [url for url in urls if in_scope(url, urlparse(url))]
+    
+    assert allowed("host") == urls[:2]
+    assert allowed("path") == urls[:1]
+    assert allowed("subdomains") == urls[:3]
+
+@pytest.mark.asyncio
+async def test_crawler_skips_static_extensions():
+    """Verify links to static assets are dropped before probing"""
+    mock_client = AsyncMock()
+    mock_client.head.return_value = MagicMock(status_code=200, headers={})
+    crawler = SimpleCrawler(mock_client)
+    
+    initial_html = (
+        '<a href="/style.CSS#top">S</a><a href="/logo.png">L</a>'
+        '<a href="/v1.2/page">P</a><a href="/app.js?v=1.2">J</a><a href="/docs">D</a>'
+    )
+    assets = [asset async for asset in crawler.crawl_generator("http://example.com", initial_html)]
+    
+    assert [asset["url"] for asset in assets] == [
+        "http://example.com/app.js?v=1.2", "http://example.com/docs", "http://example.com/v1.2/page"
+    ]
+
+def test_parse_robots_groups_wildcards_and_allow():
+    """Verify agent groups, '*'/'$' patterns and longest-match Allow overrides"""
+    robots = """
+    User-agent: Googlebot
+    Disallow: /
+
+    User-agent: *
+    Disallow: /private  # staff only
+    Disallow: /*.pdf$
+    Allow: /private/public
+    """
+    blocked = parse_robots(robots, "AuditAI-Security-Scanner/1.0")
+    assert blocked("/private/x")
+    assert not blocked("/private/public/page")
+    assert blocked("/docs/file.pdf")
+    assert not blocked("/docs/file.pdf?download=1")
+    assert not blocked("/open")
+
+    # A group naming our product token wins over '*'
+    own_group = parse_robots("User-agent: auditai-security-scanner\nDisallow: /mine\nUser-agent: *\nDisallow: /", "AuditAI-Security-Scanner/1.0")
+    assert own_group("/mine/x") and not own_group("/other")
+
+    assert parse_robots("User-agent: *\nDisallow:\n", "AuditAI-Security-Scanner/1.0") is None
+
+@pytest.mark.asyncio
+async def test_crawler_keeps_first_max_urls_in_sorted_order():
+    """Verify max_urls keeps the lowest-sorting candidates"""
+    mock_client = AsyncMock()
+    mock_client.head.return_value = MagicMock(status_code=200, headers={})
+    crawler = SimpleCrawler(mock_client)
+    
+    initial_html = '<a href="/d">D</a><a href="/b#x">B</a><a href="/c">C</a><a href="/b">B</a><a href="/">Home</a>'
+    assets = [asset async for asset in crawler.crawl_generator("http://example.com/", initial_html, max_urls=2)]
+    
+    assert [asset["url"] for asset in assets] == ["http://example.com/b", "http://example.com/c"]
+
+@pytest.mark.asyncio
+async def test_robots_locks_and_expired_entries_are_dropped():
+    """Verify the per-origin locks do not outlive their fetch and stale origins are evicted"""
+    from app.scanner import crawler as crawler_module
+    mock_client = AsyncMock()
+    mock_client.get.return_value = MagicMock(status_code=200, text="Disallow: /private")
+    mock_client.head.return_value = MagicMock(status_code=200, headers={})
+    
+    with patch("app.config.settings.RESPECT_ROBOTS", True):
+        await SimpleCrawler(mock_client).crawl("http://old.example.com", "<a href='/a'>A</a>")
+        assert crawler_module._robots_locks == {}
+        
+        with patch("app.scanner.crawler.ROBOTS_TTL", 0):
+            await SimpleCrawler(mock_client).crawl("http://new.example.com", "<a href='/a'>A</a>")
+    
+    assert crawler_module._robots_locks == {}
+    assert list(crawler_module._robots_cache) == [("http", "new.example.com")]
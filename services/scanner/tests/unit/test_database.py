@@ -0,0 +1,16 @@
+from sqlalchemy import text
+from app import database
+
+
+def test_connections_use_wal_journal():
+    """Verify every pooled connection is switched to WAL on open"""
+    with database.engine.connect() as connection:
+        mode = connection.execute(text("PRAGMA journal_mode")).scalar()
+    assert mode.lower() == "wal"
+
+
+def test_optimize_is_throttled(monkeypatch):
+    """Verify PRAGMA optimize runs at most once per interval"""
+    monkeypatch.setattr(database, "_last_optimize", 0.0)
+    assert database.optimize_db(force=True) is True
+    assert database.optimize_db() is False
@@ -0,0 +1,68 @@
+import asyncio
+import time
+import httpx
+import orjson
+import pytest
+from app.config import Settings
+from app.scanner.http_client import HttpClient, close_shared_transport
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_spaced_by_rate_limit_delay():
+    """Concurrent callers each reserve their own slot instead of all skipping the delay"""
+    config = Settings(RATE_LIMIT_DELAY=0.05, ADAPTIVE_RATE_LIMIT=False)
+    started = []
+
+    def handler(request):
+        started.append(time.monotonic())
+        return httpx.Response(200)
+
+    client = HttpClient(config)
+    client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    try:
+        await asyncio.gather(*(client.get("https://example.com") for _ in range(3)))
+    finally:
+        await client.client.aclose()
+
+    gaps = [b - a for a, b in zip(started, started[1:])]
+    assert len(gaps) == 2
+    assert all(gap >= 0.045 for gap in gaps)
+
+@pytest.mark.asyncio
+async def test_scans_share_the_connection_pool_but_not_cookies():
+    """Each HttpClient has its own cookie jar on top of one shared transport"""
+    config = Settings(SHARE_HTTP_POOL=True)
+    try:
+        async with HttpClient(config) as first, HttpClient(config) as second:
+            assert first.client._transport is second.client._transport
+            first.client.cookies.set("session", "a")
+            assert "session" not in second.client.cookies
+            transport = first.client._transport
+
+        # Leaving a scan keeps the shared pool open for the next one
+        async with HttpClient(config) as third:
+            assert third.client._transport is transport
+    finally:
+        await close_shared_transport()
+
+@pytest.mark.asyncio
+async def test_history_records_serialize_with_the_same_keys():
+    """History holds slotted RequestRecords that still dump as the old dicts"""
+    config = Settings(RATE_LIMIT_DELAY=0, ADAPTIVE_RATE_LIMIT=False)
+    client = HttpClient(config)
+    client.client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(204)))
+    try:
+        await client.head("https://example.com/a")
+    finally:
+        await client.client.aclose()
+
+    record = orjson.loads(orjson.dumps(client.history))[0]
+    assert set(record) == {"timestamp", "method", "url", "status", "latency", "final_url", "set_cookies"}
+    assert (record["method"], record["url"], record["status"]) == ("HEAD", "https://example.com/a", 204)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("http2", [True, False])
+async def test_per_scan_client_honours_http2_setting(http2):
+    """Without the shared pool, each scan's own client still follows HTTP2"""
+    config = Settings(SHARE_HTTP_POOL=False, HTTP2=http2)
+    async with HttpClient(config) as client:
+        assert client.client._transport._pool._http2 is http2
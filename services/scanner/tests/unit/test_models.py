@@ -37,3 +37,22 @@ def test_scan_result_model():
     assert result.scan_status == "ok"
     assert result.visibility_level == "good"
     assert result.blocking_mechanism is None
+
+def test_report_model_reads_scanner_dataclasses():
+    """Verify the API ScanResult validates scanner dataclasses by attribute"""
+    from app.models import ScanResult as ReportResult
+
+    now = datetime.utcnow()
+    report = ReportResult.model_validate({
+        "scan_id": "cli-scan",
+        "target": "http://example.com",
+        "status": "done",
+        "score": 90,
+        "grade": "A",
+        "findings": [Finding(title="T", severity="high", category="xss", description="D",
+                             recommendation="R", owasp_refs=["A03:2021-Injection"])],
+        "logs": [ScanLogEntry(timestamp=now, level="INFO", message="Test")],
+        "timestamp": now,
+    })
+    assert report.findings[0].owasp_refs == ["A03:2021-Injection"]
+    assert report.logs[0].message == "Test"
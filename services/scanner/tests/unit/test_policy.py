@@ -79,6 +79,37 @@ class TestValidateUrl:
         result = validate_url("file:///etc/passwd")
         assert not result.allowed
         assert result.error_code == PolicyError.UNSUPPORTED_SCHEME
+    
+    def test_url_in_query_is_not_a_scheme(self):
+        """A URL inside the query string should not be taken as the scheme."""
+        result = validate_url("example.com/?next=ftp://other.com")
+        assert result.allowed
+    
+    def test_oversized_url_rejected(self):
+        """URLs longer than the limit should be rejected without parsing."""
+        result = validate_url("https://example.com/" + "a" * 5000)
+        assert not result.allowed
+        assert result.error_code == PolicyError.INVALID_URL
+        assert result.details == {"length": 5020}
+    
+    def test_missing_hostname_rejected(self):
+        """URLs without a hostname should be rejected."""
+        for target in ("https://", "https://:8080", "http://[::1"):
+            result = validate_url(target)
+            assert not result.allowed
+            assert result.error_code == PolicyError.INVALID_URL
+    
+    def test_malformed_authority_rejected(self):
+        """Stray brackets and bad IPv6 literals in the authority are invalid."""
+        for target in ("http://ho[st", "http://host]", "http://host:80[", "http://[notip]/", "http://[]/", "http://user@/"):
+            result = validate_url(target)
+            assert not result.allowed, target
+            assert result.error_code == PolicyError.INVALID_URL
+    
+    def test_unusual_but_valid_authorities_allowed(self):
+        """IPv6 literals, userinfo and brackets after the host are accepted."""
+        for target in ("http://[::1]:8080/", "https://user:pw@example.com", "https://example.com/[path]"):
+            assert validate_url(target).allowed, target
 
 
 class TestCheckAcknowledgement:
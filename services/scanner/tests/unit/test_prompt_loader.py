@@ -49,39 +49,26 @@ class TestLoadPrompt:
         # Second call
         content2 = load_prompt("security_report_system_v1")
         
-        # Should be the exact same object due to LRU cache
+        # Should be the exact same object from the preloaded dict
         assert content1 is content2
     
-    def test_cache_info_shows_hits(self):
-        """Test that caching is working by checking cache stats."""
-        clear_cache()
-        
-        # First call - should be a miss
-        load_prompt("security_report_system_v1")
-        cache_info = load_prompt.cache_info()
-        assert cache_info.hits == 0
-        assert cache_info.misses == 1
-        
-        # Second call - should be a hit
-        load_prompt("security_report_system_v1")
-        cache_info = load_prompt.cache_info()
-        assert cache_info.hits == 1
-        assert cache_info.misses == 1
+    def test_prompts_are_preloaded(self):
+        """Test that prompt files are read without touching disk on lookup."""
+        with patch("pathlib.Path.read_text", side_effect=AssertionError("disk read")):
+            assert load_prompt("security_report_system_v1")
     
-    def test_clear_cache_resets_state(self):
-        """Test that clear_cache() resets the cache."""
-        load_prompt("security_report_system_v1")
+    def test_clear_cache_reloads_prompts(self, tmp_path):
+        """Test that clear_cache() rescans the prompts directory."""
+        (tmp_path / "fresh_prompt.txt").write_text("fresh", encoding="utf-8")
         
-        # Get cache info before clear
-        cache_info_before = load_prompt.cache_info()
-        assert cache_info_before.currsize > 0
+        with patch("app.ai.prompt_loader.PROMPTS_DIR", tmp_path):
+            clear_cache()
+            with patch("pathlib.Path.read_text", side_effect=AssertionError("disk read")):
+                assert load_prompt("fresh_prompt") == "fresh"
         
-        # Clear the cache
         clear_cache()
-        
-        # Cache should be empty now
-        cache_info_after = load_prompt.cache_info()
-        assert cache_info_after.currsize == 0
+        with pytest.raises(PromptLoadError):
+            load_prompt("fresh_prompt")
 
 
 class TestGetPromptPath:
@@ -5,6 +5,13 @@ from app.scanner.engine import ScanEngine
 from app.scanner.models import ScanResult, ScanLogEntry, Finding
 from app.scanner.scope import EndpointClass
 from app.constants import ScanStatus
+from app.scanner.dns_cache import resolve_host, clear_dns_cache
+
+@pytest.fixture(autouse=True)
+def fresh_dns_cache():
+    clear_dns_cache()
+    yield
+    clear_dns_cache()
 
 @pytest.fixture
 def scan_engine():
@@ -141,3 +148,64 @@ async def test_scan_success_flow_v2(scan_engine):
              assert result.grade == "A"
              assert result.score == 100
              assert result.scan_status == ScanStatus.OK
+
+
+@pytest.mark.asyncio
+async def test_dns_resolution_is_cached_on_success_only():
+    """Verify successful lookups are reused and failures are not cached"""
+    with patch("socket.getaddrinfo", side_effect=OSError("DNS Error")):
+        with pytest.raises(OSError):
+            await resolve_host("example.com", 80)
+
+    with patch("socket.getaddrinfo", return_value=[(0, 0, 0, 0, ("127.0.0.1", 80))]) as mock_dns:
+        assert await resolve_host("example.com", 80) == "127.0.0.1"
+        assert await resolve_host("example.com", 80) == "127.0.0.1"
+        assert mock_dns.call_count == 1
+
+@pytest.fixture
+def stub_server():
+    """Local HTTP server that answers every request with a small page setting two cookies"""
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def _respond(self, body=b""):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Set-Cookie", "sessionid=abc; Path=/; HttpOnly")
+            self.send_header("Set-Cookie", "theme=dark; Path=/")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            self._respond(b'<html><body><a href="/about">About</a></body></html>')
+
+        def do_HEAD(self):
+            self._respond()
+
+        def do_OPTIONS(self):
+            self._respond()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+@pytest.mark.asyncio
+async def test_full_scan_against_stub_server(scan_engine, stub_server):
+    """Run a whole scan end to end; cookies set by the target reach the cookie analysis"""
+    with patch("app.config.settings.RATE_LIMIT_DELAY", 0), \
+         patch("app.config.settings.SCAN_PORTS", []):
+        result = await asyncio.wait_for(scan_engine.run_scan(stub_server), timeout=60)
+
+    assert result.scan_status != ScanStatus.FAILED
+    assert not any(f.title == "Scan Failed" for f in result.findings)
+    cookie_names = {cookie["name"] for cookie in result.debug_info["cookies"]}
+    assert cookie_names == {"sessionid", "theme"}
+    assert any(f.title == "Insecure Session Cookie: sessionid" for f in result.findings)
@@ -0,0 +1,44 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from app import store
+from app.sse import event_generator
+
+@pytest.mark.asyncio
+async def test_live_logs_are_pushed_without_polling(monkeypatch):
+    """Verify SSE wakes on new live logs and finishes from the DB record"""
+    scan_id = "sse-test"
+    record = SimpleNamespace(status="running", logs_json=[])
+    monkeypatch.setattr(store, "get_scan", lambda _id: record)
+    monkeypatch.setitem(store.active_scans, scan_id, [])
+
+    events = event_generator(scan_id, store)
+    pending = asyncio.ensure_future(events.__anext__())
+    await asyncio.sleep(0)
+    assert not pending.done()
+
+    store.append_log(scan_id, {"level": "INFO", "message": "first"})
+    first = await asyncio.wait_for(pending, timeout=1.0)
+    assert first == 'event: log\ndata: {"level":"INFO","message":"first"}\n\n'
+
+    # Scan ends: logs move to the DB record and the live entry is dropped
+    record.status = "completed"
+    record.logs_json = [{"level": "INFO", "message": "first"}, {"level": "INFO", "message": "last"}]
+    del store.active_scans[scan_id]
+    store._notify_log_waiters(scan_id)
+
+    rest = [event async for event in events]
+    assert '"message":"last"' in rest[0]
+    assert rest[-1].startswith("event: done")
+
+@pytest.mark.asyncio
+async def test_idle_live_stream_sends_keepalive(monkeypatch):
+    """Verify an idle live stream emits an SSE comment instead of staying silent"""
+    scan_id = "sse-keepalive"
+    monkeypatch.setattr(store, "get_scan", lambda _id: SimpleNamespace(status="running", logs_json=[]))
+    monkeypatch.setitem(store.active_scans, scan_id, [])
+    monkeypatch.setattr("app.sse.LIVE_WAIT_TIMEOUT", 0.01)
+
+    events = event_generator(scan_id, store)
+    assert await asyncio.wait_for(events.__anext__(), timeout=1.0) == ": keepalive\n\n"
+    await events.aclose()
@@ -0,0 +1,26 @@
+from sqlmodel import Session
+from app import store
+from app.models import Scan, ScanResult
+
+
+def test_save_scan_result_completes_scan_in_one_update():
+    """Verify status, score, result and logs are stored together and live logs released"""
+    scan = store.create_scan("https://store.example.com")
+    result = ScanResult(
+        scan_id=scan.id, target="https://store.example.com", status="done",
+        score=50, grade="C", findings=[], timestamp="2024-01-01T00:00:00",
+        logs=[{"timestamp": "2024-01-01T00:00:00", "level": "INFO", "message": "hi"}],
+    )
+    try:
+        store.save_scan_result(scan.id, result)
+
+        saved = store.get_scan(scan.id)
+        assert (saved.status, saved.score, saved.grade) == ("completed", 50, "C")
+        assert saved.finished_at is not None
+        assert saved.result_json["grade"] == "C"
+        assert saved.logs_json[0]["message"] == "hi"
+        assert not store.is_scan_live(scan.id)
+    finally:
+        with Session(store.engine) as session:
+            session.delete(session.get(Scan, scan.id))
+            session.commit()